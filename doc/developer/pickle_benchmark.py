@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+
+"""
+Benchmark of the pickling of a :class:`~nngt.Network` (size and round-trip
+time) with the compact representation used by ``Graph.__reduce__``, compared
+to the pickling of the internal structures of the "nngt" backend (edge
+``OrderedDict``, ``lil_matrix``, list-based attributes and degrees), which is
+what the default pickling of the object would contain.
+
+Usage: ``python pickle_benchmark.py [num_neurons] [avg_deg]``
+"""
+
+import pickle
+import sys
+import time
+
+import nngt
+
+
+def timed(func, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.time()
+        res   = func()
+        best  = min(best, time.time() - start)
+    return best, res
+
+
+def internal_state(net):
+    return {
+        "nodes": net._nodes,
+        "edges": net._edges,
+        "adj_mat": net._adj_mat,
+        "out_deg": net._out_deg,
+        "in_deg": net._in_deg,
+        "eattr": dict(net._eattr.prop),
+        "nattr": dict(net._nattr.prop),
+        "population": net.population,
+    }
+
+
+if __name__ == "__main__":
+    num_neurons = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    avg_deg     = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    protocol    = pickle.HIGHEST_PROTOCOL
+
+    pop = nngt.NeuralPop.exc_and_inhib(num_neurons, iratio=0.2)
+    net = nngt.Network(population=pop)
+    nngt.generation.connect_nodes(
+        net, range(num_neurons), range(num_neurons), "erdos_renyi",
+        avg_deg=avg_deg)
+
+    print("Network with {} nodes and {} edges, pickle protocol {}".format(
+        net.node_nb(), net.edge_nb(), protocol))
+
+    # internal structures
+    if nngt.get_config("backend") == "nngt":
+        state = internal_state(net)
+        t_dump, data = timed(lambda: pickle.dumps(state, protocol))
+        t_load, _    = timed(lambda: pickle.loads(data))
+        print("internal structures: {:8.1f} MB, dump {:.3f} s, "
+              "load {:.3f} s".format(len(data) / 1e6, t_dump, t_load))
+
+    # compact representation
+    t_dump, data = timed(lambda: pickle.dumps(net, protocol))
+    t_load, _    = timed(lambda: pickle.loads(data))
+    print("compact arrays:      {:8.1f} MB, dump {:.3f} s, "
+          "load {:.3f} s (graph rebuilt)".format(len(data) / 1e6, t_dump,
+                                                 t_load))
+
+    # out-of-band buffers
+    if protocol >= 5:
+        buffers = []
+        t_dump, data = timed(
+            lambda: pickle.dumps(net, 5, buffer_callback=buffers.append),
+            repeat=1)
+        size = len(data) + sum(len(b.raw()) for b in buffers)
+        print("out-of-band buffers: {:8.1f} MB ({} buffers), "
+              "dump {:.3f} s".format(size / 1e6, len(buffers), t_dump))
@@ -91,10 +91,13 @@ __version__ = '1.0.a'
 
 # IMPORTANT: configuration MUST COME FIRST
 _config = {
+    'cache_folder': "~/.nngt/cache",
+    'cache_max_size': 1000,
     'color_lib': 'matplotlib',
     'db_folder': "~/.nngt/database",
     'db_to_file': False,
     'db_url': "mysql:///nngt_db",
+    'generation_cache': False,
     'graph': object,
     'backend': "nngt",
     'library': None,
@@ -224,7 +227,7 @@ if not _libs:
 
 # import some tools into main namespace
 
-from .lib.io_tools import load_from_file, save_to_file
+from .lib.io_tools import load_from_file, load_subgraph, save_to_file
 from .lib.rng_tools import seed
 from .lib.test_functions import on_master_process, num_mpi_processes
 
@@ -255,6 +258,7 @@ __all__ = [
     "GroupProperty",
     "lib",
     "load_from_file",
+    "load_subgraph",
     "Network",
     "NeuralGroup",
     "NeuralPop",
@@ -21,6 +21,7 @@
 """ Tools for graph analysis using the graph libraries """
 
 import numpy as np
+import scipy.sparse as ssp
 import scipy.sparse.linalg as spl
 
 import nngt
@@ -266,7 +267,7 @@ def transitivity(graph):
 
 def num_iedges(graph):
     ''' Returns the number of inhibitory connections. '''
-    num_einhib = len(graph["type"].a < 0)
+    num_einhib = np.sum(graph.get_edge_types() < 0)
     return float(num_einhib)/graph.edge_nb()
 
 
@@ -353,16 +354,15 @@ def spectral_radius(graph, typed=True, weighted=True):
     -------
     the spectral radius as a float.
     '''
-    weights = None
-    if typed and "type" in graph.eproperties.keys():
-        weights = graph.eproperties["type"].copy()
-    if weighted and "weight" in graph.eproperties.keys():
-        if weights is not None:
-            weights = np.multiply(weights,
-                                  graph.eproperties["weight"])
-        else:
-            weights = graph.eproperties["weight"].copy()
-    mat_adj = nngt.analyze_graph["adjacency"](graph,weights)
+    num_nodes = graph.node_nb()
+    edges     = graph.edges_array
+    weights   = np.ones(len(edges))
+    if typed:
+        weights *= graph.get_edge_types()
+    if weighted and graph.is_weighted():
+        weights *= graph.get_weights()
+    mat_adj = ssp.coo_matrix((weights, (edges[:, 0], edges[:, 1])),
+                             shape=(num_nodes, num_nodes)).tocsr()
     eigenval = [0]
     try:
         eigenval = spl.eigs(mat_adj,return_eigenvectors=False)
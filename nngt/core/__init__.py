@@ -32,6 +32,8 @@ from .ig_graph import _IGraph
 from .nx_graph import _NxGraph
 from .base_graph import BaseGraph
 from .graph_datastruct import Connections
+from .graph_view import GraphView
+from .shared_graph import MappedGraph, SharedGraph, SharedGraphHandle
 
 
 _graphlib = {
@@ -49,5 +51,9 @@ GraphObject = _graphlib[nngt._config["backend"]]
 
 __all__ = [
     "Connections",
-    "GraphObject"
+    "GraphObject",
+    "GraphView",
+    "MappedGraph",
+    "SharedGraph",
+    "SharedGraphHandle"
 ]
@@ -22,16 +22,18 @@
 
 from collections import OrderedDict
 from copy import deepcopy
+from itertools import islice
 from abc import ABCMeta, abstractmethod, abstractproperty
 from six import add_metaclass
 from weakref import ref
 
 import numpy as np
-from scipy.sparse import coo_matrix, csr_matrix, lil_matrix
+from scipy.sparse import coo_matrix, csr_matrix, diags, lil_matrix
 
 import nngt
 from nngt.lib import InvalidArgument, BWEIGHT, nonstring_container, is_integer
-from nngt.lib.graph_helpers import _get_edge_attr, _get_syn_param
+from nngt.lib.graph_helpers import (_get_edge_attr, _get_syn_param,
+                                    _deep_sizeof, _missing_reciprocals)
 from nngt.lib.io_tools import _np_dtype
 
 
@@ -44,6 +46,12 @@ class BaseProperty(dict):
     def __init__(self, parent):
         self.parent = ref(parent)
         self._num_values_set = {}
+        # computed attributes: {name: (function, cache)}
+        self._computed = OrderedDict()
+        self._cache    = {}
+        self._version  = 0
+        # writes recorded for the incremental saves: {key: {name: rows}}
+        self._trackers = {}
         
     def value_type(self, key=None):
         if key is not None:
@@ -51,6 +59,45 @@ class BaseProperty(dict):
         else:
             return {k:super(BaseProperty, self).__getitem__(k) for k in self}
 
+    def clear(self):
+        super(BaseProperty, self).clear()
+        self._computed.clear()
+        self._cache.clear()
+        # the rows themselves are removed
+        for writes in self._trackers.values():
+            writes[None] = None
+
+    def _copy(self, parent):
+        '''
+        Return a copy of the attribute container for graph `parent`, with
+        the same value types and computed attributes (the caches are not
+        copied).
+        '''
+        new = self.__class__(parent)
+        super(BaseProperty, new).update(self.value_type())
+        new._num_values_set = self._num_values_set.copy()
+        new._computed       = self._computed.copy()
+        return new
+
+    def _dtype(self, name):
+        ''' Numpy dtype of attribute `name`, following the graph policy '''
+        value_type = super(BaseProperty, self).__getitem__(name)
+        if value_type in ("double", "float", "real"):
+            return self.parent()._attr_dtype
+        return _np_dtype(value_type)
+
+    def _memory(self, name, num_values, deep=False):
+        '''
+        Memory used by attribute `name` in bytes. The default is the size of
+        the `num_values` values as an array with the dtype of the attribute;
+        backends override it with the size of their actual storage when
+        `deep` is True.
+        '''
+        if name in self._computed:
+            cached = self._cache.get(name, None)
+            return 0 if cached is None else cached[1].nbytes
+        return num_values*np.dtype(self._dtype(name)).itemsize
+
     # redefine dict values/items to use the __getitem__ that will be
     # overwritten by the child classes
 
@@ -66,6 +113,114 @@ class BaseProperty(dict):
     def iteritems(self):
         return ( (k, self[k]) for k in self )
 
+    # computed attributes
+
+    def new_computed_attribute(self, name, value_type, func, cache=False):
+        '''
+        Register an edge attribute whose values are not stored but computed
+        on access.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        name : str
+            Name of the attribute.
+        value_type : str
+            Type of the attribute, among 'int', 'double', 'string'.
+        func : callable
+            Function with signature ``func(graph, edges)`` returning the
+            values of the attribute as an array, where `edges` is either
+            ``None`` (all edges, in the order of
+            :func:`~nngt.Graph.edges_array`) or an array of shape (E, 2).
+        cache : bool, optional (default: False)
+            Whether the values for all edges should be kept until the graph
+            or its attributes are modified.
+        '''
+        if name in self and name not in self._computed:
+            raise InvalidArgument("A stored attribute named '" + name +
+                                  "' already exists.")
+        super(BaseProperty, self).__setitem__(name, value_type)
+        self._computed[name] = (func, cache)
+        self._cache.pop(name, None)
+
+    def is_computed(self, name):
+        ''' Whether attribute `name` is a computed attribute. '''
+        return name in self._computed
+
+    def _stored_keys(self):
+        return [k for k in self.keys() if k not in self._computed]
+
+    def _stored_slice(self, edges):
+        ''' Values of the stored attributes for the `edges` slice. '''
+        return {k: self[k][edges] for k in self._stored_keys()}
+
+    def _track(self, key):
+        '''
+        Start a new record of the writes to the stored attributes for `key`
+        (a file saved incrementally), discarding the previous one.
+        '''
+        self._trackers[key] = {}
+
+    def _writes(self, key):
+        '''
+        Writes recorded for `key` since the last call to :func:`_track`, as
+        a dict ``{name: rows}`` where `rows` is None if all the values of
+        attribute `name` were written, else a list of slices and arrays of
+        row ids; the ``None`` key is present if the rows were removed.
+        Returns None if the writes are not recorded for `key`.
+        '''
+        return self._trackers.get(key, None)
+
+    def _written(self, name, ids=None):
+        '''
+        Record that the values of attribute `name` were written for the rows
+        `ids` (a slice or row ids, default: all rows).
+        '''
+        if not self._trackers:
+            return
+        if ids is not None and not isinstance(ids, slice):
+            ids = np.array(ids, dtype=np.int64).ravel()
+        for writes in self._trackers.values():
+            rows = writes.get(name, [])
+            if ids is None or rows is None:
+                writes[name] = None
+            else:
+                rows.append(ids)
+                writes[name] = rows
+
+    def _invalidate(self):
+        ''' Signal that the values of the computed attributes changed. '''
+        self._version += 1
+        self._cache.clear()
+
+    def _get_computed(self, name, edges=None):
+        '''
+        Evaluate computed attribute `name` for all edges (if `edges` is None)
+        or for a slice, a list of edge ids, or an (E, 2) array of edges.
+        '''
+        func, cache = self._computed[name]
+        graph = self.parent()
+        dtype = self._dtype(name)
+        if edges is None:
+            token = (graph.edge_nb(), self._version)
+            if cache and self._cache.get(name, (None,))[0] == token:
+                return self._cache[name][1].copy()
+            values = np.asarray(func(graph, None), dtype=dtype)
+            if cache:
+                self._cache[name] = (token, values.copy())
+            return values
+        if isinstance(edges, slice):
+            edges = graph.edges_array[edges]
+        else:
+            edges = np.asarray(edges)
+            if edges.ndim < 2:
+                edges = graph.edges_array[edges.astype(int)]
+        return np.asarray(func(graph, edges), dtype=dtype)
+
+    def _computed_items(self, edges):
+        return {k: self._get_computed(k, edges) for k in self._computed}
+
 
 # --------- #
 # GraphInterface #
@@ -79,18 +234,19 @@ class GraphInterface(nngt._config["graph"]):
 
     nattr_class = None
     eattr_class = None
+
+    # dtype policy (overwritten by the Graph constructor)
+    _index_dtype = np.dtype(int)
+    _attr_dtype  = np.dtype(float)
     
     @classmethod
     def to_graph_object(cls, obj, weighted=True, directed=True):
+        # the library graphs index their edges themselves
         obj.__class__ = cls
-        edges = nngt.analyze_graph["get_edges"](obj)
         obj._nattr = cls.nattr_class(obj)
         obj._eattr = cls.eattr_class(obj)
-        obj._edges = OrderedDict()
         obj._directed = directed
         obj._weighted = weighted
-        for i, edge in enumerate(edges):
-            obj._edges[tuple(edge)] = i
         return obj
     
     #-------------------------------------------------------------------------#
@@ -101,6 +257,50 @@ class GraphInterface(nngt._config["graph"]):
     def edges_array(self):
         pass
 
+    def _edges_from(self, first_eid):
+        '''
+        Edges of ids `first_eid` and above, as an (E, 2) array. Backends
+        override it to avoid building the whole edge array.
+        '''
+        return np.asarray(self.edges_array).reshape(-1, 2)[first_eid:]
+
+    def _memory_edges(self, deep=False):
+        '''
+        Memory used by the edges and by the structure giving the edge ids, in
+        bytes. The default is the size of the compact array representations;
+        backends override it with their actual storage when `deep` is True.
+        '''
+        itemsize = self._index_dtype.itemsize
+        return 2*itemsize*self.edge_nb(), itemsize*self.edge_nb()
+
+    # sorted keys of the edges and matching ids, built on demand by _edge_ids
+    _edge_index = None
+
+    def _edge_ids(self, edges):
+        '''
+        Ids of an array of edges, found by a binary search among the sorted
+        ``source*N + target`` keys of the existing edges. The keys are cached
+        until edges or nodes are added.
+        '''
+        edges     = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        num_nodes = self.node_nb()
+        token     = (self.edge_nb(), num_nodes)
+        if self._edge_index is None or self._edge_index[0] != token:
+            known = self.edges_array.astype(np.int64)
+            keys  = known[:, 0]*num_nodes + known[:, 1]
+            order = np.argsort(keys, kind="mergesort")
+            self._edge_index = (token, keys[order], order)
+        _, keys, order = self._edge_index
+        query = edges[:, 0]*num_nodes + edges[:, 1]
+        pos   = np.searchsorted(keys, query)
+        found = pos < len(keys)
+        found[found] = keys[pos[found]] == query[found]
+        if not np.all(found):
+            missing = tuple(int(n) for n in edges[~found][0])
+            raise InvalidArgument(
+                "Edge {} is not in the graph.".format(missing))
+        return order[pos]
+
     @property
     def nproperties(self):
         return self._nattr
@@ -143,12 +343,12 @@ class GraphInterface(nngt._config["graph"]):
         '''
         weights = "weight" if weights is True else weights
         mat = nngt.analyze_graph["adjacency"](self, weights)
-        if types and 'type' in self.nodes_attributes:
-            tarray = np.where(self.nodes_attributes['type'] < 0)[0]
-            if np.any(tarray):
-                mat[tarray] *= -1.
-        elif types and 'type' in self.edges_attributes:
-            raise NotImplementedError()
+        if types:
+            # the connections from inhibitory nodes (population of networks
+            # or "type" node attribute) are negative
+            ntypes = self._get_node_types()
+            if np.any(ntypes < 0):
+                mat = diags(ntypes.astype(float)).dot(mat).tocsr()
         return mat
     
     #-------------------------------------------------------------------------#
@@ -178,6 +378,17 @@ class GraphInterface(nngt._config["graph"]):
     def new_edges(self, edge_list, attributes=None):
         pass
 
+    def _fill_edges(self, edges, attributes):
+        '''
+        Add all the `edges` of a graph without edges in one call, with the
+        complete values of their `attributes`.
+        The edges must be unique and, for undirected graphs, contain both
+        directions, as in the `edges_array` of a graph; backends which can
+        build their edge store directly from the arrays override this
+        function.
+        '''
+        self.new_edges(edges, attributes=dict(attributes))
+
     def attr_new_edges(self, edge_list, attributes=None):
         num_edges = len(edge_list)
         if num_edges:
@@ -190,7 +401,8 @@ class GraphInterface(nngt._config["graph"]):
             bio_weights = False
             bio_delays = False
             # distance must come first
-            if self.is_spatial() or "distance" in attributes:
+            if ((self.is_spatial() or "distance" in attributes) and
+                    not self._eattr.is_computed("distance")):
                 prop = attributes.get("distance", None)
                 values = _get_edge_attr(
                     self, edge_list, 'distance', prop, last_edges=True)
@@ -245,7 +457,7 @@ class GraphInterface(nngt._config["graph"]):
                 self._eattr.set_attribute(
                     "delay", values, edges=edge_list)
             for k in attributes.keys():
-                if k not in specials:
+                if k not in specials and not self._eattr.is_computed(k):
                     if k in self.edges_attributes:
                         values = _get_edge_attr(
                             self, edge_list, k, attributes[k], last_edges=True)
@@ -261,6 +473,7 @@ class GraphInterface(nngt._config["graph"]):
                         v = np.repeat(v, self.edge_nb())
                     self._eattr.new_attribute(attributes["names"][i],
                                               attributes["types"][i], values=v)
+            self._eattr._invalidate()
         
     @abstractmethod
     def node_nb(self):
@@ -307,10 +520,29 @@ class BaseGraph(GraphInterface):
         self._out_deg  = []
         self._in_deg   = []
         self._edges    = OrderedDict()
-        self._adj_mat  = lil_matrix((nodes, nodes))
+        self._adj      = None
+        # whether the topology is shared with another graph (copy-on-write)
+        self._shared_topology = False
         super(BaseGraph, self).__init__()
         # test if copying graph
-        if g is not None:
+        if isinstance(g, BaseGraph):
+            # direct copy of the containers
+            self._nattr    = g._nattr._copy(self)
+            self._eattr    = g._eattr._copy(self)
+            self._directed = g.is_directed()
+            self._weighted = g._weighted
+            self._nodes    = g._nodes
+            self._out_deg  = g._out_deg
+            self._in_deg   = g._in_deg
+            self._edges    = g._edges
+            self._adj      = g._adj
+            if kwargs.get("share", False):
+                # both graphs will copy the topology before modifying it
+                self._shared_topology = g._shared_topology = True
+            else:
+                self._shared_topology = True
+                self._own_topology()
+        elif g is not None:
             # create nodes and node attributes
             self.new_node(g.node_nb())
             self._nattr    = deepcopy(g._nattr)
@@ -320,7 +552,9 @@ class BaseGraph(GraphInterface):
             self._edges    = OrderedDict()
             self._adj_mat  = lil_matrix((g.node_nb(), g.node_nb()))
             # create edges and edge attributes
-            attributes = g.get_edge_attributes()
+            attributes = {
+                k: g._eattr[k] for k in g._eattr._stored_keys()
+            }
             self.new_edges(g.edges_array, attributes=attributes)
         else:
             self._nattr    = _NProperty(self)
@@ -329,9 +563,45 @@ class BaseGraph(GraphInterface):
             self._weighted = weighted
             self.new_node(nodes)
 
+    @property
+    def _adj_mat(self):
+        '''
+        Adjacency matrix (lil format) of the graph; it is created on first
+        use, e.g. after nodes were added or for graphs filled in bulk (see
+        :func:`_fill_edges`).
+        '''
+        if self._adj is None:
+            edges     = np.asarray(self.edges_array, dtype=int).reshape(-1, 2)
+            num_nodes = self.node_nb()
+            ws        = np.ones(len(edges))
+            if "weight" in self._eattr:
+                ws[:] = self._eattr["weight"]
+            self._adj = coo_matrix(
+                (ws, (edges[:, 0], edges[:, 1])),
+                shape=(num_nodes, num_nodes)).tolil()
+        return self._adj
+
+    @_adj_mat.setter
+    def _adj_mat(self, value):
+        self._adj = value
+
     #-------------------------------------------------------------------------#
     # Graph manipulation
 
+    def _own_topology(self):
+        '''
+        Copy the nodes, edges and degrees if they are shared with another
+        graph, before they are modified.
+        '''
+        if self._shared_topology:
+            self._nodes   = list(self._nodes)
+            self._out_deg = list(self._out_deg)
+            self._in_deg  = list(self._in_deg)
+            self._edges   = self._edges.copy()
+            if self._adj is not None:
+                self._adj = self._adj.copy()
+            self._shared_topology = False
+
     def edge_id(self, edge):
         '''
         Return the ID a given edge or a list of edges in the graph.
@@ -363,7 +633,20 @@ class BaseGraph(GraphInterface):
         Edges of the graph, sorted by order of creation, as an array of
         2-tuple.
         '''
-        return np.array(list(self._edges.keys()), dtype=int)
+        return np.array(list(self._edges.keys()),
+                        dtype=self._index_dtype).reshape(-1, 2)
+
+    def _edges_from(self, first_eid):
+        num_new = max(len(self._edges) - first_eid, 0)
+        edges   = list(islice(reversed(self._edges), num_new))[::-1]
+        return np.array(edges, dtype=self._index_dtype).reshape(-1, 2)
+
+    def _memory_edges(self, deep=False):
+        if deep:
+            edges = (_deep_sizeof(self._adj) + _deep_sizeof(self._out_deg)
+                     + _deep_sizeof(self._in_deg))
+            return edges, _deep_sizeof(self._edges)
+        return super(BaseGraph, self)._memory_edges(deep)
     
     def new_node(self, n=1, ntype=1, attributes=None, value_types=None,
                  positions=None, groups=None):
@@ -392,6 +675,7 @@ class BaseGraph(GraphInterface):
         -------
         The node or a tuple of the nodes created.
         '''
+        self._own_topology()
         nodes = []
         if n == 1:
             nodes.append(len(self._nodes))
@@ -405,13 +689,14 @@ class BaseGraph(GraphInterface):
             self._out_deg.extend([0 for _ in range(n)])
         self._nodes.extend(nodes)
 
-        old_mat = self._adj_mat.tocoo()
-        if self.edge_nb():
+        if self.edge_nb() and self._adj is not None:
+            old_mat = self._adj.tocoo()
             tmp = coo_matrix((old_mat.data, (old_mat.row, old_mat.col)),
                              shape=(len(self._nodes), len(self._nodes)))
             self._adj_mat = tmp.tolil()
         else:
-            self._adj_mat = lil_matrix((len(self._nodes), len(self._nodes)))
+            # created on first use, with the new number of nodes
+            self._adj = None
 
         if attributes is not None:
             for k, v in attributes.items():
@@ -468,6 +753,7 @@ class BaseGraph(GraphInterface):
         -------
         The new connection.
         '''
+        self._own_topology()
         #check attributes
         if attributes is None:
             attributes = {}
@@ -514,6 +800,7 @@ class BaseGraph(GraphInterface):
             
         @todo: add example, check the edges for self-loops and multiple edges
         '''
+        self._own_topology()
         #check attributes
         if attributes is None:
             attributes = {}
@@ -521,36 +808,69 @@ class BaseGraph(GraphInterface):
         if not isinstance(edge_list, np.ndarray):
             edge_list = np.array(edge_list)
         if not self._directed:
-            recip_edges = edge_list[:,::-1]
-            # slow but works
-            unique = ~(recip_edges[..., np.newaxis]
-                       == edge_list[..., np.newaxis].T).all(1).any(1)
-            edge_list = np.concatenate((edge_list, recip_edges[unique]))
+            # add the reciprocal edges which are not present
+            unique    = _missing_reciprocals(edge_list)
+            edge_list = np.concatenate((edge_list, edge_list[unique, ::-1]))
             for key, val in attributes.items():
                 attributes[key] = np.concatenate((val, val[unique]))
-        # create the edges
-        ws        = None
+        # create the edges (in bulk)
         num_added = len(edge_list)
-        if "weight" in attributes:
-            if nonstring_container(attributes["weight"]):
-                ws = attributes["weight"]
+        if num_added:
+            num_nodes = self.node_nb()
+            sources   = edge_list[:, 0].astype(int)
+            targets   = edge_list[:, 1].astype(int)
+            ws        = np.ones(num_added)
+            if "weight" in attributes:
+                ws[:] = attributes["weight"]
+            # update the matrix first: if it was not built yet, it is created
+            # from the existing edges and weights
+            if initial_edges:
+                self._adj_mat[sources, targets] = ws
             else:
-                ws = (attributes["weight"] for _ in range(num_added))
-        else:
-            ws = (1 for _ in range(num_added))
-        for i, (e, w) in enumerate(zip(edge_list, ws)):
-            self._edges[tuple(e)]     = initial_edges + i
-            self._out_deg[e[0]]  += 1
-            self._in_deg[e[1]]   += 1
-            self._adj_mat[e[0], e[1]] = w
+                # faster conversion, keeping the last value of duplicates
+                lin     = sources*num_nodes + targets
+                _, last = np.unique(lin[::-1], return_index=True)
+                keep    = num_added - 1 - last
+                self._adj_mat = coo_matrix(
+                    (ws[keep], (sources[keep], targets[keep])),
+                    shape=(num_nodes, num_nodes)).tolil()
+            self._edges.update(zip(
+                zip(sources.tolist(), targets.tolist()),
+                range(initial_edges, initial_edges + num_added)))
+            self._out_deg = (np.bincount(sources, minlength=num_nodes)
+                             + self._out_deg).tolist()
+            self._in_deg  = (np.bincount(targets, minlength=num_nodes)
+                             + self._in_deg).tolist()
         # call parent function to set the attributes
         self.attr_new_edges(edge_list, attributes=attributes)
         return edge_list
-    
+
+    def _fill_edges(self, edges, attributes):
+        '''
+        Build the edge containers directly from the `edges` array (no
+        duplicate or reciprocal edge check) and store the `attributes` values
+        as they are; the adjacency matrix is created when it is first used.
+        '''
+        self._own_topology()
+        num_nodes = self.node_nb()
+        num_edges = len(edges)
+        sources   = np.asarray(edges[:, 0], dtype=int)
+        targets   = np.asarray(edges[:, 1], dtype=int)
+        self._edges = OrderedDict(
+            zip(zip(sources.tolist(), targets.tolist()), range(num_edges)))
+        self._out_deg = np.bincount(sources, minlength=num_nodes).tolist()
+        self._in_deg  = np.bincount(targets, minlength=num_nodes).tolist()
+        # the adjacency matrix is only built if it is used
+        self._adj = None
+        for name, values in attributes.items():
+            self._eattr.set_attribute(name, values)
+        self._eattr._invalidate()
+
     def clear_all_edges(self):
+        self._own_topology()
         self._edges   = OrderedDict()
         self._out_deg = [0 for _ in range(self.node_nb())]
-        self._out_deg = [0 for _ in range(self.node_nb())]
+        self._in_deg  = [0 for _ in range(self.node_nb())]
         self._adj_mat = lil_matrix((self.node_nb(), self.node_nb()))
         self._eattr.clear()
 
@@ -586,13 +906,23 @@ class BaseGraph(GraphInterface):
         degrees = np.zeros(len(node_list))
 
         if "weight" in self._eattr and use_weights:
+            # use the current weights (the values stored in the adjacency
+            # matrix are those given when the edges were created)
+            edges     = self.edges_array.reshape(-1, 2)
+            weights   = self._eattr["weight"]
+            num_nodes = self.node_nb()
+            strength  = np.zeros(num_nodes)
             if not self._directed:
-                degrees += self._adj_mat.sum(axis=1).A1
+                strength += np.bincount(edges[:, 0], weights=weights,
+                                        minlength=num_nodes)
             else:
                 if deg_type in ("in", "total"):
-                    degrees += self._adj_mat.sum(axis=0).A1
+                    strength += np.bincount(edges[:, 1], weights=weights,
+                                            minlength=num_nodes)
                 if deg_type in ("out", "total"):
-                    degrees += self._adj_mat.sum(axis=1).A1
+                    strength += np.bincount(edges[:, 0], weights=weights,
+                                            minlength=num_nodes)
+            degrees += strength[node_list]
         else:
             if not self._directed:
                 degrees += self._in_deg
@@ -647,7 +977,7 @@ class _NProperty(BaseProperty):
         self.prop = OrderedDict()
 
     def __getitem__(self, name):
-        dtype = _np_dtype(super(_NProperty, self).__getitem__(name))
+        dtype = self._dtype(name)
         return np.array(self.prop[name], dtype=dtype)
 
     def __setitem__(self, name, value):
@@ -655,6 +985,7 @@ class _NProperty(BaseProperty):
             size = self.parent().node_nb()
             if len(value) == size:
                 self.prop[name] = list(value)
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "node in the graph is required")
@@ -686,6 +1017,7 @@ class _NProperty(BaseProperty):
         # store the real values in the attribute
         self.prop[name] = list(values)
         self._num_values_set[name] = len(values)
+        self._written(name)
 
     def set_attribute(self, name, values, nodes=None):
         '''
@@ -715,11 +1047,23 @@ class _NProperty(BaseProperty):
                        not in ('string', 'object'))
             if self._num_values_set[name] == num_nodes - num_n and non_obj:
                 self.prop[name].extend(values)
+                self._written(name, slice(num_nodes - num_n, num_nodes))
             else:
                 for n, val in zip(nodes, values):
                     self.prop[name][n] = val
+                self._written(name, nodes)
         self._num_values_set[name] = num_nodes
 
+    def _memory(self, name, num_values, deep=False):
+        if deep and name in self.prop:
+            return _deep_sizeof(self.prop[name])
+        return super(_NProperty, self)._memory(name, num_values, deep)
+
+    def _copy(self, parent):
+        new = super(_NProperty, self)._copy(parent)
+        new.prop = OrderedDict((k, list(v)) for k, v in self.prop.items())
+        return new
+
 
 class _EProperty(BaseProperty):
 
@@ -735,29 +1079,32 @@ class _EProperty(BaseProperty):
         '''
         eprop = {}
         if isinstance(name, slice):
-            for k in self.keys():
-                dtype = _np_dtype(super(_EProperty, self).__getitem__(k))
-                eprop[k] = np.array(self.prop[k][name], dtype=dtype)
+            eprop = self._stored_slice(name)
+            eprop.update(self._computed_items(name))
             return eprop
         elif nonstring_container(name):
             if nonstring_container(name[0]):
                 eids = [self.parent().edge_id(e) for e in name]
-                for k in self.keys():
-                    dtype = _np_dtype(super(_EProperty, self).__getitem__(k))
-                    eprop[k] = np.array(self.prop[k][eids], dtype=dtype)
+                for k in self._stored_keys():
+                    dtype = self._dtype(k)
+                    eprop[k] = np.array(self.prop[k], dtype=dtype)[eids]
             else:
-                for k in self.keys():
-                    dtype = _np_dtype(super(_EProperty, self).__getitem__(k))
-                    eprop[k] = np.array(self.prop[k][name], dtype=dtype)
+                for k in self._stored_keys():
+                    dtype = self._dtype(k)
+                    eprop[k] = np.array(self.prop[k], dtype=dtype)[name]
+            eprop.update(self._computed_items(name))
             return eprop
-        dtype = _np_dtype(super(_EProperty, self).__getitem__(name))
+        elif name in self._computed:
+            return self._get_computed(name)
+        dtype = self._dtype(name)
         return np.array(self.prop[name], dtype=dtype)
 
     def __setitem__(self, name, value):
         if name in self:
             size = self.parent().edge_nb()
             if len(value) == size:
-                self.prop[name] = list(value)
+                self.prop[name] = self._to_storage(name, value)
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "edge in the graph is required")
@@ -783,7 +1130,7 @@ class _EProperty(BaseProperty):
         num_edges = self.parent().edge_nb()
         num_e = len(edges) if edges is not None else num_edges
         if num_e == num_edges:
-            self[name] = list(values)
+            self[name] = values
             self._num_values_set[name] = num_edges
         else:
             if num_e != len(values):
@@ -791,13 +1138,19 @@ class _EProperty(BaseProperty):
                                  "size; got respectively " + str(num_e) + \
                                  " and " + str(len(values)) + "entries.")
             if self._num_values_set[name] == num_edges - num_e:
-                self.prop[name].extend(values)
+                if isinstance(self.prop[name], np.ndarray):
+                    self.prop[name] = np.concatenate(
+                        (self.prop[name], self._to_storage(name, values)))
+                else:
+                    self.prop[name].extend(values)
                 self._num_values_set[name] = num_edges
+                self._written(name, slice(num_edges - num_e, num_edges))
             else:
-                for e, val in zip(edges, values):
-                    idx = self.parent().edge_id(e)
+                eids = [self.parent().edge_id(e) for e in edges]
+                for idx, val in zip(eids, values):
                     self.prop[name][idx] = val
-                self._num_values_set[name] += num_e
+                self._num_values_set[name] = num_edges
+                self._written(name, eids)
 
     def new_attribute(self, name, value_type, values=None, val=None):
         if values is None and val is None:
@@ -821,5 +1174,29 @@ class _EProperty(BaseProperty):
         # store name and value type in the dict
         super(_EProperty, self).__setitem__(name, value_type)
         # store the real values in the attribute
-        self.prop[name] = list(values)
+        self.prop[name] = self._to_storage(name, values)
         self._num_values_set[name] = len(values)
+        self._written(name)
+
+    def _stored_slice(self, edges):
+        return {k: np.array(self.prop[k][edges], dtype=self._dtype(k))
+                for k in self._stored_keys()}
+
+    def _to_storage(self, name, values):
+        ''' Numeric attributes are stored as arrays with the graph dtype '''
+        dtype = self._dtype(name)
+        if dtype is not object:
+            return np.array(values, dtype=dtype)
+        return list(values)
+
+    def _memory(self, name, num_values, deep=False):
+        if deep and name in self.prop and name not in self._computed:
+            return _deep_sizeof(self.prop[name])
+        return super(_EProperty, self)._memory(name, num_values, deep)
+
+    def _copy(self, parent):
+        new = super(_EProperty, self)._copy(parent)
+        new.prop = OrderedDict(
+            (k, v.copy() if isinstance(v, np.ndarray) else list(v))
+            for k, v in self.prop.items())
+        return new
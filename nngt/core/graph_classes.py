@@ -20,8 +20,10 @@
 
 """ Graph classes for graph generation and management """
 
+from collections import OrderedDict
 from copy import deepcopy
 import logging
+import os
 
 import numpy as np
 import scipy.sparse as ssp
@@ -29,10 +31,15 @@ import scipy.sparse as ssp
 import nngt
 from nngt import save_to_file, load_from_file
 import nngt.analysis as na
-from nngt.lib import (InvalidArgument, nonstring_container, default_neuron,
-                      default_synapse, POS, WEIGHT, DELAY, DIST, TYPE)
-from nngt.lib.graph_helpers import _edge_prop
-from nngt.lib.io_tools import _as_string
+from nngt.lib import (InvalidArgument, nonstring_container, is_integer,
+                      default_neuron, default_synapse, POS, WEIGHT, DELAY,
+                      DIST, TYPE, BWEIGHT)
+from nngt.lib.graph_helpers import (_edge_prop, _edge_bweights,
+                                    _edge_distances, _deep_sizeof,
+                                    _check_index_dtype,
+                                    _csr_is_symmetric, _graph_from_arrays,
+                                    _graph_to_arrays, _graph_to_library)
+from nngt.lib.io_tools import _as_string, _get_format, _LazyPopulation
 from nngt.lib.logger import _log_message
 from nngt.lib.test_functions import graph_tool_check
 
@@ -90,6 +97,11 @@ class Graph(nngt.core.GraphObject):
         '''
         Creates a :class:`~nngt.Graph` from a :class:`scipy.sparse` matrix or
         a dense matrix.
+
+        .. versionchanged:: 1.0
+            The edges are created in CSR order (sorted by source, then by
+            target) directly from the CSR arrays of the matrix, see
+            :func:`~nngt.Graph.from_csr`.
         
         Parameters
         ----------
@@ -105,44 +117,178 @@ class Graph(nngt.core.GraphObject):
         :class:`~nngt.Graph`
         '''
         shape = matrix.shape
-        graph_name = "FromYMatrix_Z"
         nodes = max(shape[0], shape[1])
         if issubclass(matrix.__class__, ssp.spmatrix):
-            graph_name = graph_name.replace('Y', 'Sparse')
-            if not directed:
-                if shape[0] != shape[1] or not (matrix.T != matrix).nnz == 0:
-                    raise InvalidArgument('Incompatible `directed=False` '
-                                          'option provided for non symmetric '
-                                          'matrix.')
+            graph_name = "FromSparseMatrix_"
+            csr = matrix.tocsr()
+            # entries are summed and explicit zeros are not edges (copy the
+            # matrix only if it must be modified)
+            if not csr.has_canonical_format:
+                csr = csr.copy() if csr is matrix else csr
+                csr.sum_duplicates()
+            if np.any(csr.data == 0):
+                csr = csr.copy() if csr is matrix else csr
+                csr.eliminate_zeros()
         else:
-            graph_name = graph_name.replace('Y', 'Dense')
-            if not directed:
-                if shape[0] != shape[1] or not (matrix.T == matrix).all():
-                    raise InvalidArgument('Incompatible `directed=False` '
-                                          'option provided for non symmetric '
-                                          'matrix.')
-        edges = np.array(matrix.nonzero()).T
-        graph = cls(nodes, name=graph_name.replace("Z", str(cls.__num_graphs)),
-                    weighted=weighted, directed=directed)
-        weights = None
-        if weighted:
-            if issubclass(matrix.__class__, ssp.spmatrix):
-                weights = np.array(matrix[edges[:, 0], edges[:, 1]])[0]
-            else:
-                weights = matrix[edges[:, 0], edges[:, 1]]
-        graph.new_edges(edges, {"weight": weights})
+            graph_name = "FromDenseMatrix_"
+            csr = ssp.csr_matrix(np.asarray(matrix))
+        if not directed and shape[0] != shape[1]:
+            raise InvalidArgument('Incompatible `directed=False` option '
+                                  'provided for non symmetric matrix.')
+        indptr = csr.indptr
+        if shape[0] < nodes:
+            # the last rows are empty
+            indptr = np.concatenate(
+                (indptr, np.full(nodes - shape[0], indptr[-1])))
+        return cls.from_csr(
+            indptr, csr.indices, csr.data, weighted=weighted, directed=directed,
+            name=graph_name + str(cls.__num_graphs))
+
+    @classmethod
+    def from_csr(cls, indptr, indices, data=None, weighted=True,
+                 directed=True, name=None):
+        '''
+        Creates a :class:`~nngt.Graph` from the arrays of an adjacency matrix
+        in compressed sparse row (CSR) format.
+
+        .. versionadded:: 1.0
+
+        Each stored entry is an edge: the edges are created in CSR order
+        (sorted by source, then in the order of `indices`) and `data` gives
+        their weights directly, so no matrix indexing is required.
+        Duplicate entries (same target several times in a row) are not
+        allowed.
+
+        Parameters
+        ----------
+        indptr : array-like of size N + 1
+            Offsets of the targets of each of the N nodes in `indices`.
+        indices : array-like
+            Targets of the edges.
+        data : array-like, optional (default: unit weights)
+            Weights of the edges (used only if `weighted` is True).
+        weighted : bool, optional (default: True)
+            Whether the graph edges have weight properties.
+        directed : bool, optional (default: True)
+            Whether the graph is directed or undirected. Undirected graphs
+            require a symmetric matrix, which is checked on the CSR arrays.
+        name : str, optional (default: "FromCSR_" + graph number)
+            Name of the graph.
+
+        Returns
+        -------
+        :class:`~nngt.Graph`
+
+        Example
+        -------
+        >>> mat = scipy.sparse.random(100, 100, density=0.1, format="csr")
+        >>> g = nngt.Graph.from_csr(mat.indptr, mat.indices, mat.data)
+        '''
+        indptr  = np.asarray(indptr)
+        indices = np.asarray(indices)
+        data    = None if data is None else np.asarray(data)
+        nodes   = len(indptr) - 1
+        if len(indptr) == 0 or len(indices) != indptr[-1]:
+            raise InvalidArgument("`indptr` must be of size N + 1 and end "
+                                  "with the number of edges.")
+        if len(indices) and (indices.min() < 0 or indices.max() >= nodes):
+            raise InvalidArgument("`indices` must be node ids between 0 and "
+                                  "{}.".format(nodes - 1))
+        if data is not None and len(data) != len(indices):
+            raise InvalidArgument("`data` and `indices` must have the same "
+                                  "size.")
+        sources = np.repeat(np.arange(nodes), np.diff(indptr))
+        order   = np.lexsort((indices, sources))
+        if np.any((np.diff(sources[order]) == 0) &
+                  (np.diff(indices[order]) == 0)):
+            raise InvalidArgument("`indices` contains the same target "
+                                  "several times for a row: sum the "
+                                  "duplicate entries first (e.g. with "
+                                  "`scipy.sparse.csr_matrix.sum_duplicates`).")
+        if not directed and not _csr_is_symmetric(indptr, indices, data):
+            raise InvalidArgument('Incompatible `directed=False` option '
+                                  'provided for non symmetric matrix.')
+        if name is None:
+            name = "FromCSR_" + str(cls.__num_graphs)
+        graph = cls(nodes, name=name, weighted=weighted, directed=directed)
+        if len(indices):
+            # the entries are unique and a symmetric matrix contains both
+            # directions, so the edges are stored in bulk
+            attributes = {}
+            if weighted:
+                attributes["weight"] = (np.ones(len(indices)) if data is None
+                                        else data.astype(float))
+            graph._fill_edges(np.column_stack((sources, indices)), attributes)
         return graph
-    
+
+    @classmethod
+    def from_edge_file(cls, filename, nodes=None, chunk_size=1000000,
+                       name="FromEdgeFile", weighted=True, directed=True,
+                       **kwargs):
+        '''
+        Creates a :class:`~nngt.Graph` from a ``.npy`` file containing an
+        (E, 2) array of edges, such as those produced by
+        :func:`~nngt.generation.generate_to_file`.
+
+        The file is memory-mapped and the edges are added chunk by chunk, so
+        that the whole array is never loaded at once.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        filename : str
+            Path to the ``.npy`` file.
+        nodes : int, optional (default: highest node id + 1)
+            Number of nodes in the graph.
+        chunk_size : int, optional (default: 1000000)
+            Number of edges added at each step.
+        name : string, optional (default: "FromEdgeFile")
+            The name of the graph.
+        weighted : bool, optional (default: True)
+            Whether the graph edges have weight properties.
+        directed : bool, optional (default: True)
+            Whether the graph is directed or undirected.
+        kwargs : optional keywords arguments
+            Additional arguments passed to the :class:`~nngt.Graph`
+            constructor (e.g. `weights`).
+
+        Returns
+        -------
+        :class:`~nngt.Graph`
+        '''
+        edges = np.load(filename, mmap_mode="r")
+        if edges.ndim != 2 or edges.shape[1] != 2:
+            raise InvalidArgument("The file should contain an (E, 2) array, "
+                                  "got shape {}.".format(edges.shape))
+        num_edges = edges.shape[0]
+        if nodes is None:
+            nodes = 0
+            for start in range(0, num_edges, chunk_size):
+                chunk = edges[start:start + chunk_size]
+                nodes = max(nodes, int(chunk.max()) + 1)
+        graph = cls(nodes, name=name, weighted=weighted, directed=directed,
+                    **kwargs)
+        for start in range(0, num_edges, chunk_size):
+            graph.new_edges(
+                np.array(edges[start:start + chunk_size], dtype=int))
+        return graph
+
     @staticmethod
     @graph_tool_check('2.22')
     def from_file(filename, fmt="auto", separator=" ", secondary=";",
                   attributes=None, notifier="@", ignore="#",
-                  from_string=False):
+                  from_string=False, mmap=False, n_jobs=1):
         '''
         Import a saved graph from a file.
         @todo: implement population and shape loading, implement gml, dot, xml,
         gt
 
+        .. versionchanged:: 1.0
+            Added the binary "nngt" format and the `mmap` and `n_jobs`
+            arguments. Files compressed with gzip, bz2, or xz are detected
+            and decompressed on the fly.
+
         Parameters
         ----------
         filename: str
@@ -157,7 +303,8 @@ class Graph(nngt.core.GraphObject):
             with '.graphml' or '.xml'), "dot" (dot format, default if
             `filename` ends with '.dot'), "gt" (only when using
             `graph_tool`<http://graph-tool.skewed.de/>_ as library, detected
-            if `filename` ends with '.gt').
+            if `filename` ends with '.gt'), "nngt" (binary format, detected
+            if `filename` ends with '.nngt').
         separator : str, optional (default " ")
             separator used to separate inputs in the case of custom formats
             (namely "neighbour" and "edge_list")
@@ -181,15 +328,31 @@ class Graph(nngt.core.GraphObject):
             among ``@shape``, ``@population``, and ``@graph``.
         from_string : bool, optional (default: False)
             Load from a string instead of a file.
+        mmap : bool, optional (default: False)
+            For the "nngt" format, return a read-only
+            :class:`~nngt.core.MappedGraph` whose arrays are memory-mapped
+            from the file instead of a :class:`~nngt.Graph`: the file is
+            opened without reading its data, which can then be analyzed, or
+            converted into a normal graph with
+            :func:`~nngt.core.MappedGraph.materialize`.
+        n_jobs : int, optional (default: 1)
+            Number of processes used to parse the edges of large "neighbour"
+            and "edge_list" files (see :func:`~nngt.load_from_file`).
 
         Returns
         -------
         graph : :class:`~nngt.Graph` or subclass
             Loaded graph.
         '''
+        if mmap:
+            if _get_format(fmt, filename) != "nngt":
+                raise InvalidArgument("`mmap` is only available for the "
+                                      "binary 'nngt' format.")
+            return nngt.core.MappedGraph(filename)
         info, edges, nattr, eattr, pop, shape, pos = load_from_file(
             filename=filename, fmt=fmt, separator=separator,
-            secondary=secondary, attributes=attributes, notifier=notifier)
+            secondary=secondary, attributes=attributes, notifier=notifier,
+            n_jobs=n_jobs)
         # create the graph
         graph = Graph(nodes=info["size"], name=info["name"],
                       directed=info["directed"])
@@ -319,6 +482,10 @@ class Graph(nngt.core.GraphObject):
             (``weights={"distribution": "constant", "value": 2.3}`` which is
             equivalent to ``weights=2.3``), the synaptic `delays`, or a
             ``type`` information.
+            The dtype policy of the graph can also be set through
+            `index_dtype` (integer type of the node ids, default ``int``) and
+            `attr_dtype` (floating type of the "double" attributes, default
+            ``float``), e.g. ``index_dtype=np.int32, attr_dtype=np.float32``.
         
         Returns
         -------
@@ -327,16 +494,29 @@ class Graph(nngt.core.GraphObject):
         self.__id = self.__class__.__max_id
         self._name = name
         self._graph_type = kwargs["type"] if "type" in kwargs else "custom"
+        # dtype policy (must be set before the edges are created)
+        self._index_dtype = np.dtype(kwargs.get("index_dtype", int))
+        self._attr_dtype  = np.dtype(kwargs.get("attr_dtype", float))
+        if not np.issubdtype(self._index_dtype, np.integer):
+            raise InvalidArgument("`index_dtype` must be an integer type.")
+        if not np.issubdtype(self._attr_dtype, np.floating):
+            raise InvalidArgument("`attr_dtype` must be a floating type.")
+        _check_index_dtype(nodes, self._index_dtype)
+        # states of the files written by `save_increment`
+        self._checkpoints = {}
         # Init the core.GraphObject
         super(Graph, self).__init__(nodes=nodes, g=from_graph,
-                                    directed=directed, weighted=weighted)
-        # take care of the weights and delays
-        # @todo: use those of the from_graph
+                                    directed=directed, weighted=weighted,
+                                    share=kwargs.get("share", False))
+        # take care of the weights and delays (keep those of `from_graph`)
         if weighted:
-            self.new_edge_attribute('weight', 'double')
+            if WEIGHT not in self.edges_attributes:
+                self.new_edge_attribute(WEIGHT, 'double')
+            self.new_computed_edge_attribute(BWEIGHT, 'double', _edge_bweights)
             self._w = _edge_prop(kwargs.get("weights", None))
         if "delays" in kwargs:
-            self.new_edge_attribute('delay', 'double')
+            if DELAY not in self.edges_attributes:
+                self.new_edge_attribute(DELAY, 'double')
             self._d = _edge_prop(kwargs.get("delays", None))
         if 'inh_weight_factor' in kwargs:
             self._iwf = kwargs['inh_weight_factor']
@@ -347,6 +527,19 @@ class Graph(nngt.core.GraphObject):
     def __del__(self):
         self.__class__.__num_graphs -= 1
 
+    def __reduce__(self):
+        '''
+        Pickle the graph as a compact dict of contiguous numpy arrays (edges
+        and attributes) instead of the internal structures of the backend.
+        With pickle protocol 5, these arrays are passed as out-of-band
+        buffers when a `buffer_callback` is given.
+        The graph and its indices are rebuilt in bulk on unpickling.
+
+        .. versionadded:: 1.0
+        '''
+        return (_graph_from_arrays,
+                (_graph_to_arrays(self, index_dtype=self._index_dtype),))
+
     def __repr__(self):
         ''' Provide unambiguous informations regarding the object. '''
         d = "directed" if self._directed else "undirected"
@@ -384,32 +577,237 @@ class Graph(nngt.core.GraphObject):
     #-------------------------------------------------------------------------#
     # Graph actions
     
-    def copy(self):
+    def copy(self, share=False):
         '''
         Returns a deepcopy of the current :class:`~nngt.Graph`
         instance
-        '''
-        gc_instance = Graph(name=self._name+'_copy',
-                            weighted=self._weighted,
-                            from_graph=self)
+
+        .. versionchanged:: 1.0
+            The arrays of the graph are copied directly and `share` was
+            added.
+
+        Parameters
+        ----------
+        share : bool, optional (default: False)
+            Whether the topology (nodes, edges and degrees), the positions
+            and the population should be shared with the current graph
+            instead of copied. The topology is then copied by each graph
+            before it is modified and the population before it is accessed
+            through :attr:`~nngt.Network.population` (copy-on-write);
+            positions are never modified in place.
+            Only the "nngt" backend can share its topology, the other
+            backends always copy it.
+
+        Returns
+        -------
+        A new :class:`~nngt.Graph` (or subclass) instance.
+        '''
+        kwargs = {
+            "name": self._name + '_copy', "weighted": self._weighted,
+            "directed": self._directed, "from_graph": self,
+            "index_dtype": self._index_dtype, "attr_dtype": self._attr_dtype,
+            "share": share, "type": self._graph_type
+        }
         if self.is_spatial():
-            SpatialGraph.make_spatial(gc_instance)
+            # the shape is shared, the positions are copied unless `share`
+            kwargs["shape"]        = self._shape
+            kwargs["positions"]    = self._pos if share else self._pos.copy()
+            kwargs["_share_shape"] = True
         if self.is_network():
-            Network.make_network(gc_instance, deepcopy(self.population))
+            kwargs["population"] = (self._population if share
+                                    else deepcopy(self._population))
+        gc_instance = self.__class__(**kwargs)
+        for attr in ("_w", "_d", "_iwf"):
+            if hasattr(self, attr):
+                setattr(gc_instance, attr, deepcopy(getattr(self, attr)))
+        if self.is_network() and share:
+            # both networks will copy the population before handing it out
+            self._shared_population = gc_instance._shared_population = True
         return gc_instance
 
+    def to_backend(self, backend):
+        '''
+        Returns the graph as an object of the `backend` graph library,
+        without changing the current backend of NNGT.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        backend : string
+            Name of a graph library among 'graph-tool', 'igraph', and
+            'networkx' (the library must be installed).
+
+        Returns
+        -------
+        A :class:`igraph.Graph`, a :class:`networkx.DiGraph` (or
+        :class:`networkx.Graph` for undirected graphs), or a
+        :class:`graph_tool.Graph` with the same nodes, edges (in the same
+        order), and stored node and edge attributes. Positions are stored as
+        the "x" and "y" node attributes.
+
+        Notes
+        -----
+        The edges and the attributes are passed as arrays ordered by edge id
+        to the bulk creation functions of the library.
+        To get a :class:`~nngt.Graph` using another backend, pickle the graph
+        and load it in a process which uses `backend` (see
+        :func:`~nngt.use_backend`).
+        '''
+        return _graph_to_library(self, backend)
+
+    def to_shared_memory(self):
+        '''
+        Copy the edges, CSR index, attributes and positions of the graph into
+        a shared memory block, so that several processes can analyze it
+        without copying it.
+
+        .. versionadded:: 1.0
+
+        Returns
+        -------
+        handle : :class:`~nngt.core.SharedGraphHandle`
+            Small picklable object to send to the workers, which get a
+            read-only graph through :func:`~nngt.Graph.from_shared_memory`.
+            The block must be released by calling ``handle.unlink()`` (or by
+            using the handle as a context manager) in the current process.
+
+        Note
+        ----
+        Requires Python 3.8 or newer. The population of networks is not
+        shared, only the type of each neuron.
+
+        Example
+        -------
+        >>> with graph.to_shared_memory() as handle:
+        ...     with multiprocessing.Pool(4) as pool:
+        ...         results = pool.map(analyze, [handle]*4)
+
+        where ``analyze`` calls ``nngt.Graph.from_shared_memory(handle)``.
+        '''
+        from .shared_graph import _to_shared_memory
+        return _to_shared_memory(self)
+
+    @staticmethod
+    def from_shared_memory(handle):
+        '''
+        Attach to a graph exported by :func:`~nngt.Graph.to_shared_memory`.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        handle : :class:`~nngt.core.SharedGraphHandle`
+            Handle returned by :func:`~nngt.Graph.to_shared_memory`.
+
+        Returns
+        -------
+        graph : :class:`~nngt.core.SharedGraph`
+            Read-only graph whose arrays are views on the shared memory; call
+            ``graph.close()`` when it is no longer used, or
+            ``graph.materialize()`` to get a normal graph.
+        '''
+        return nngt.core.SharedGraph(handle)
+
     @graph_tool_check('2.22')
     def to_file(self, filename, fmt="auto", separator=" ", secondary=";",
-                attributes=None, notifier="@"):
+                attributes=None, notifier="@", compression="auto",
+                compression_level=None, target_index=False):
         '''
         Save graph to file; options detailed below.
 
+        .. versionchanged:: 1.0
+            Added the `compression`, `compression_level`, and `target_index`
+            arguments.
+
         .. seealso::
             :py:func:`nngt.lib.save_to_file` function for options.
         '''
         save_to_file(self, filename, fmt=fmt, separator=separator,
                      secondary=secondary, attributes=attributes,
-                     notifier=notifier)
+                     notifier=notifier, compression=compression,
+                     compression_level=compression_level,
+                     target_index=target_index)
+
+    def save_increment(self, filename, compact=False):
+        '''
+        Checkpoint the graph to a binary "nngt" file, writing only the
+        changes since the previous checkpoint to the same file.
+
+        The first call for a given file (or a call with `compact` set to
+        True) saves the whole graph.
+        The next calls append the new nodes and edges, with their attributes,
+        and the blocks of attribute values of the existing nodes and edges
+        that were written since the previous checkpoint, so the cost of a
+        checkpoint follows the size of the changes rather than the size of
+        the graph.
+        The increments are replayed when the file is loaded through
+        :func:`~nngt.Graph.from_file`, :func:`~nngt.load_subgraph` or
+        :class:`~nngt.core.MappedGraph`.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        filename : str
+            Path of the file.
+        compact : bool, optional (default: False)
+            Rewrite the file as a single snapshot containing the current
+            state of the graph, which also makes it faster to load.
+
+        Note
+        ----
+        Nodes and edges cannot be removed between two checkpoints of the
+        same file (this raises an :class:`~nngt.lib.InvalidArgument`), use
+        `compact` after removing them.
+        If the file was modified by other means since the previous checkpoint
+        (e.g. by :func:`~nngt.Graph.to_file`), the whole graph is saved again.
+
+        Example
+        -------
+        >>> for step in range(num_steps):
+        ...     grow(graph)
+        ...     graph.save_increment("growth.nngt")
+        '''
+        from nngt.lib.io_tools import _save_increment
+        filename = os.path.abspath(filename)
+        state    = None if compact else self._checkpoints.get(filename, None)
+        writes   = {"edge": self._eattr._writes(filename),
+                    "node": self._nattr._writes(filename)}
+        self._checkpoints[filename] = _save_increment(
+            self, filename, state, writes)
+        # record the writes made until the next checkpoint
+        self._eattr._track(filename)
+        self._nattr._track(filename)
+
+    def subgraph_view(self, nodes=None, edge_mask=None):
+        '''
+        Return a lightweight view on a subset of the nodes and edges, which
+        shares the edges and attributes of the current graph (no copy is made
+        until :func:`~nngt.core.GraphView.materialize` is called).
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        nodes : array-like or str, optional (default: all nodes)
+            Nodes that are kept, either as a list of node ids, as a boolean
+            mask, or, for a :class:`~nngt.Network`, as the name of a group.
+        edge_mask : array-like, optional (default: all edges)
+            Boolean mask of size ``edge_nb()`` giving the edges that are kept.
+
+        Returns
+        -------
+        view : :class:`~nngt.core.GraphView`
+
+        Example
+        -------
+        >>> view = net.subgraph_view(
+        ...     edge_mask=net.get_edge_types() < 0)  # inhibitory edges
+        >>> degrees = view.get_degrees("in")
+        >>> inhib_graph = view.materialize()
+        '''
+        return nngt.core.GraphView(self, nodes=nodes, edge_mask=edge_mask)
 
     #~ def inhibitory_subgraph(self):
         #~ ''' Create a :class:`~nngt.Graph` instance which graph
@@ -471,6 +869,45 @@ class Graph(nngt.core.GraphObject):
             Identical value for all edges.
         '''
         self._eattr.new_attribute(name, value_type, values=values, val=val)
+        self._eattr._invalidate()
+
+    def new_computed_edge_attribute(self, name, value_type, func,
+                                    cache=False):
+        '''
+        Create an edge attribute whose values are not stored but computed
+        from the graph each time they are accessed.
+
+        Computed attributes are listed in :attr:`~nngt.Graph.edges_attributes`
+        and returned by :func:`~nngt.Graph.get_edge_attributes` like the
+        others, but they cannot be set and are not saved to files.
+        The "bweight" attribute of weighted graphs and the "distance"
+        attribute of spatial graphs are computed attributes.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        name : str
+            The name of the new attribute.
+        value_type : str
+            Type of the attribute, among 'int', 'double', 'string'
+        func : callable
+            Function with signature ``func(graph, edges)`` returning an array
+            containing the attribute values. `edges` is either ``None``, for
+            all edges (ordered as in :func:`~nngt.Graph.edges_array`), or an
+            array of shape (E, 2) containing the requested edges.
+        cache : bool, optional (default: False)
+            Keep the values computed for all edges until the edges or the
+            stored edge attributes of the graph are modified.
+
+        Example
+        -------
+        >>> g.new_computed_edge_attribute(
+        ...     "log_weight", "double",
+        ...     lambda graph, edges: np.log(
+        ...         graph.get_edge_attributes(edges=edges, name="weight")))
+        '''
+        self._eattr.new_computed_attribute(name, value_type, func, cache=cache)
 
     def new_node_attribute(self, name, value_type, values=None, val=None):
         '''
@@ -521,7 +958,10 @@ class Graph(nngt.core.GraphObject):
         edges : list of edges or array of shape (E, 2), optional (default: all)
             Edges whose attributes should be set. Others will remain unchanged.
         '''
-        if attribute not in self.edges_attributes:
+        if self._eattr.is_computed(attribute):
+            raise InvalidArgument("'" + attribute + "' is a computed "
+                                  "attribute and cannot be set.")
+        elif attribute not in self.edges_attributes:
             assert value_type is not None, "`value_type` is necessary for " +\
                                            "new attributes."
             self.new_edge_attribute(name=attribute, value_type=value_type,
@@ -535,6 +975,7 @@ class Graph(nngt.core.GraphObject):
                     raise InvalidArgument("At least one of the `values` and "
                         "`val` arguments should not be ``None``.")
             self._eattr.set_attribute(attribute, values, edges=edges)
+            self._eattr._invalidate()
 
     def set_node_attribute(self, attribute, values=None, val=None,
                            value_type=None, nodes=None):
@@ -652,14 +1093,13 @@ class Graph(nngt.core.GraphObject):
         inhib_nodes = nodes
         if syn_type == 'excitatory' or syn_type == 1:
             if is_integer(nodes):
-                inhib_nodes = graph.node_nb() - nodes
-            elif isinstance(nodes, np.float):
-                inhib_nodes = 1. / nodes
+                inhib_nodes = self.node_nb() - nodes
             elif nonstring_container(nodes):
-                inhib_nodes = list(range(graph.node_nb()))
-                nodes.sort()
-                for node in nodes[::-1]:
-                    del inhib_nodes[node]
+                inhib_mask = np.ones(self.node_nb(), dtype=bool)
+                inhib_mask[np.asarray(nodes, dtype=int)] = False
+                inhib_nodes = np.where(inhib_mask)[0]
+            elif nodes is not None:
+                inhib_nodes = 1. - nodes
         return nngt.core.Connections.types(self, inhib_nodes, fraction)
         
     def set_delays(self, delay=None, elist=None, distribution=None,
@@ -759,9 +1199,14 @@ class Graph(nngt.core.GraphObject):
         The attributes values are ordered as the edges in
         :func:`~nngt.Graph.edges_array`.
         '''
-        if name is not None and edges is not None:
+        if name is not None and self._eattr.is_computed(name):
+            return self._eattr._get_computed(name, edges)
+        elif name is not None and edges is not None:
             if isinstance(edges, slice):
                 return self._eattr[name][edges]
+            elif nonstring_container(edges) and nonstring_container(edges[0]):
+                # evaluate only the requested attribute
+                return self._eattr[name][self.edge_id(edges)]
             else:
                 return self._eattr[edges][name]
         elif name is None and edges is None:
@@ -841,6 +1286,66 @@ class Graph(nngt.core.GraphObject):
                 raise InvalidArgument(
                     "Unknown attribute class '{}'.".format(attribute_class))
     
+    def memory_usage(self, deep=False):
+        '''
+        Memory used by each component of the graph, in bytes.
+
+        .. versionadded:: 1.0
+
+        Parameters
+        ----------
+        deep : bool, optional (default: False)
+            If False, each component is counted as a compact array following
+            the dtype policy of the graph (edges as an (E, 2) array of
+            `index_dtype`, "double" attributes as arrays of `attr_dtype`...),
+            which is the size it takes when it is sent or saved in binary
+            form. If True, the actual storage of the backend is measured,
+            including the python objects it contains; the size of structures
+            internal to graph-tool and igraph is estimated from their layout.
+
+        Returns
+        -------
+        usage : :class:`collections.OrderedDict`
+            Bytes used by the "edges", the "index" (structure giving the edge
+            ids), each entry of the "edge_attributes" and "node_attributes"
+            dicts, the "positions" and the "population", as well as the
+            "total".
+
+        Example
+        -------
+        >>> g = nngt.generation.erdos_renyi(
+        ...     nodes=1000, avg_deg=100, index_dtype=np.int32,
+        ...     attr_dtype=np.float32)
+        >>> g.memory_usage()["edges"]
+        800000
+        '''
+        num_nodes, num_edges = self.node_nb(), self.edge_nb()
+        usage = OrderedDict()
+        usage["edges"], usage["index"] = self._memory_edges(deep)
+        usage["edge_attributes"] = OrderedDict(
+            (k, self._eattr._memory(k, num_edges, deep)) for k in self._eattr)
+        usage["node_attributes"] = OrderedDict(
+            (k, self._nattr._memory(k, num_nodes, deep)) for k in self._nattr)
+        usage["positions"]  = 0
+        usage["population"] = 0
+        if self.is_spatial():
+            usage["positions"] = (_deep_sizeof(self._pos) if deep
+                                  else np.asarray(self._pos).nbytes)
+        if self.is_network():
+            if deep:
+                usage["population"] = _deep_sizeof(self.population)
+            else:
+                groups = self.population._neuron_group
+                usage["population"] = (
+                    (0 if groups is None else groups.nbytes) +
+                    self._index_dtype.itemsize*np.sum(
+                        [len(g.ids) for g in self.population.values()]))
+        usage["total"] = int(
+            usage["edges"] + usage["index"] + usage["positions"] +
+            usage["population"] + np.sum(list(usage["edge_attributes"].values()))
+            + np.sum(list(usage["node_attributes"].values())))
+        return usage
+
     def get_name(self):
         ''' Get the name of the graph '''
         return self._name
@@ -915,38 +1420,36 @@ class Graph(nngt.core.GraphObject):
         :class:`numpy.array` or None (if an invalid type is asked).
         '''
         valid_types = ("in", "out", "total")
-        if deg_type in valid_types:
-            if syn_type in ("excitatory", 1):
-                e_neurons = []
-                if isinstance(self, Network):
-                    for g in self.population.values():
-                        if g.neuron_type == 1:
-                            e_neurons.extend(g.ids)
-                else:
-                    e_neurons = np.where(
-                        self.get_node_attributes(name="type") == 1)[0]
-                return self.adjacency_matrix(
-                    weights=use_weights,
-                    types=False)[e_neurons, :].sum(axis=0).A1
-            elif syn_type in ("inhibitory", -1):
-                i_neurons = []
-                if isinstance(self, Network):
-                    for g in self.population.values():
-                        if g.neuron_type == -1:
-                            i_neurons.extend(g.ids)
-                else:
-                    i_neurons = np.where(
-                        self.get_node_attributes(name="type") == -1)[0]
-                return self.adjacency_matrix(
-                    weights=use_weights,
-                    types=False)[i_neurons, :].sum(axis=0).A1
-            elif syn_type == "all":
-                return self.degree_list(node_list, deg_type, use_weights)
-            else:
-                raise InvalidArgument(
-                    "Invalid synaptic type '{}'".format(syn_type))
-        else:
+        if deg_type not in valid_types:
             raise InvalidArgument("Invalid degree type '{}'".format(deg_type))
+        if syn_type == "all":
+            return self.degree_list(node_list, deg_type, use_weights)
+        elif syn_type in ("excitatory", 1):
+            syn_type = 1
+        elif syn_type in ("inhibitory", -1):
+            syn_type = -1
+        else:
+            raise InvalidArgument(
+                "Invalid synaptic type '{}'".format(syn_type))
+        # keep only the edges coming from nodes of the right type
+        num_nodes = self.node_nb()
+        edges     = self.edges_array
+        keep      = self._get_node_types()[edges[:, 0]] == syn_type
+        edges     = edges[keep]
+        weights   = None
+        degrees   = np.zeros(num_nodes, dtype=int)
+        if use_weights:
+            weights = np.asarray(self.get_weights())[keep]
+            degrees = np.zeros(num_nodes, dtype=float)
+        if deg_type in ("in", "total"):
+            degrees += np.bincount(edges[:, 1], weights=weights,
+                                   minlength=num_nodes).astype(degrees.dtype)
+        if deg_type in ("out", "total"):
+            degrees += np.bincount(edges[:, 0], weights=weights,
+                                   minlength=num_nodes).astype(degrees.dtype)
+        if node_list is not None:
+            return degrees[node_list]
+        return degrees
 
     def get_betweenness(self, btype="both", use_weights=False):
         '''
@@ -974,6 +1477,19 @@ class Graph(nngt.core.GraphObject):
             return self.get_edge_attributes(name=TYPE)
         else:
             return np.ones(self.edge_nb())
+
+    def _get_node_types(self):
+        '''
+        Return an int8 array containing the type of each node (1 for
+        excitatory, -1 for inhibitory), from the population for networks or
+        from the "type" node attribute otherwise.
+        '''
+        if self.is_network():
+            # does not require to build a lazily loaded population
+            return self._population._get_neuron_types()
+        elif TYPE in self.nodes_attributes:
+            return np.sign(self.get_node_attributes(name=TYPE)).astype(np.int8)
+        return np.ones(self.node_nb(), dtype=np.int8)
     
     def get_weights(self):
         ''' Returns the weighted adjacency matrix as a
@@ -1070,7 +1586,8 @@ class SpatialGraph(Graph):
         
     def __del__(self):
         if hasattr(self, '_shape'):
-            if self._shape is not None:
+            # copies share the shape of the original graph
+            if self._shape is not None and getattr(self, "_shape_owner", True):
                 self._shape._parent = None
             self._shape = None
         super(SpatialGraph, self).__del__()
@@ -1088,11 +1605,13 @@ class SpatialGraph(Graph):
         Create the positions of the neurons from the graph `shape` attribute
         and computes the connections distances.
         '''
-        self.new_edge_attribute('distance', 'double')
         if positions is not None and positions.shape[0] != self.node_nb():
             raise InvalidArgument("Wrong number of neurons in `positions`.")
         if shape is not None:
-            shape.set_parent(self)
+            # copies share the shape of the original graph without owning it
+            self._shape_owner = not kwargs.get("_share_shape", False)
+            if self._shape_owner:
+                shape.set_parent(self)
             self._shape = shape
         else:
             if positions is None:
@@ -1124,7 +1643,12 @@ class SpatialGraph(Graph):
                     height, width, centroid=centroid, parent=self)
         b_rnd_pos = True if not self.node_nb() or positions is None else False
         self._pos = self._shape.seed_neurons() if b_rnd_pos else positions
-        nngt.core.Connections.distances(self)
+        if DIST in self.edges_attributes:
+            # distances previously stored with the edges are updated
+            if not self.edges_attributes.is_computed(DIST):
+                nngt.core.Connections.distances(self)
+        else:
+            self.new_computed_edge_attribute(DIST, 'double', _edge_distances)
 
     #-------------------------------------------------------------------------#
     # Getters
@@ -1375,7 +1899,8 @@ class Network(Graph):
             from_graph=from_graph, inh_weight_factor=inh_weight_factor,
             **kwargs)
         self._init_bioproperties(population)
-        if "shape" in kwargs or "positions" in kwargs:
+        if not self.is_spatial() and ("shape" in kwargs
+                                      or "positions" in kwargs):
             self.make_spatial(self, shape=kwargs.get("shape", None),
                               positions=kwargs.get("positions", None))
     
@@ -1388,7 +1913,14 @@ class Network(Graph):
         '''
         :class:`~nngt.NeuralPop` that divides the neurons into groups with
         specific properties.
+
+        .. versionchanged:: 1.0
+            For networks loaded from a file, the population is only built
+            when it is first accessed.
         '''
+        if isinstance(self._population, _LazyPopulation):
+            self._population = self._population.load()
+        self._own_population()
         return self._population
 
     @population.setter
@@ -1397,6 +1929,7 @@ class Network(Graph):
             if self.node_nb() == population.size:
                 if population.is_valid:
                     self._population = population
+                    self._shared_population = False
                 else:
                     raise AttributeError("NeuralPop is not valid (not all \
                     neurons are associated to a group).")
@@ -1418,19 +1951,8 @@ class Network(Graph):
             group._nest_gids = gids[group.ids]
 
     def get_edge_types(self):
-        inhib_neurons = {}
-        types         = np.ones(self.edge_nb())
-
-        for g in self._population.values():
-            if g.neuron_type == -1:
-                for n in g.ids:
-                    inhib_neurons[n] = None
-
-        for i, e in enumerate(self.edges_array):
-            if e[0] in inhib_neurons:
-                types[i] = -1
-        
-        return types
+        sources = self.edges_array[:, 0]
+        return np.where(self._get_node_types()[sources] < 0, -1., 1.)
 
     def id_from_nest_gid(self, gids):
         '''
@@ -1473,11 +1995,13 @@ class Network(Graph):
     def _init_bioproperties(self, population):
         ''' Set the population attribute and link each neuron to its group. '''
         self._population = None
+        # whether the population is shared with a copy (copy-on-write)
+        self._shared_population = False
         self._nest_gid = None
         self._id_from_nest_gid = None
         if not hasattr(self, '_iwf'):
             self._iwf = 1.
-        if issubclass(population.__class__, nngt.NeuralPop):
+        if isinstance(population, (nngt.NeuralPop, _LazyPopulation)):
             if population.is_valid or not self.node_nb():
                 self._population = population
                 nodes = population.size
@@ -1491,6 +2015,15 @@ class Network(Graph):
             raise AttributeError("Expected NeuralPop but received "
                                  "{}".format(pop.__class__.__name__))
 
+    def _own_population(self):
+        '''
+        Copy the population if it is shared with another network, before it
+        is handed out (and possibly modified).
+        '''
+        if self._shared_population:
+            self._population = deepcopy(self._population)
+            self._shared_population = False
+
     #-------------------------------------------------------------------------#
     # Setter
 
@@ -1511,14 +2044,11 @@ class Network(Graph):
         ids : int or tuple
             Ids in the network. Same type as the requested `gids` type.
         '''
+        types = self._population._get_neuron_types()
         if is_integer(neuron_ids):
-            group_name = self._population._neuron_group[neuron_ids]
-            ntype = self._population[group_name].neuron_type
-            return ntype
+            return int(types[neuron_ids])
         else:
-            groups = (self._population._neuron_group[i] for i in neuron_ids)
-            types = tuple(self._population[gn].neuron_type for gn in groups)
-            return types
+            return tuple(int(t) for t in types[np.asarray(neuron_ids)])
 
     #-------------------------------------------------------------------------#
     # Getter
@@ -1536,8 +2066,8 @@ class Network(Graph):
         -------
         dict of the neuron's properties.
         '''
-        group_name = self._population._neuron_group[idx_neuron]
-        return self._population[group_name].properties()
+        group_name = self.population._neuron_group[idx_neuron]
+        return self.population[group_name].properties()
 
 
 # -------------- #
@@ -26,7 +26,6 @@ import weakref
 from copy import deepcopy
 
 import numpy as np
-from numpy.random import randint, uniform
 import scipy.sparse as ssp
 import scipy.spatial as sptl
 
@@ -34,6 +33,7 @@ import nngt
 from nngt.lib import (InvalidArgument, nonstring_container, is_integer,
                       default_neuron, default_synapse, POS, WEIGHT, DELAY,
                       DIST, TYPE, BWEIGHT)
+from nngt.lib.graph_helpers import _edge_bweights
 from nngt.lib.rng_tools import _eprop_distribution
 from nngt.lib.logger import _log_message
 
@@ -309,9 +309,10 @@ class NeuralPop(OrderedDict):
         '''
         state    = super(NeuralPop, self).__reduce__()
         last     = state[4] if len(state) == 5 else None
-        dic      = state[2]
+        # the weakref to the parent network cannot be pickled
+        dic      = dict(state[2], _parent=None)
         od_args  = state[1][0] if state[1] else state[1]
-        args     = (dic.get("_size", None), dic.get("_parent", None),
+        args     = (dic.get("_size", None), None,
                     dic.get("_has_models", True), od_args)
         newstate = (NeuralPop, args, dic, None, last)
         return newstate
@@ -585,6 +586,19 @@ class NeuralPop(OrderedDict):
                         groups.append(None)
                 return groups
 
+    def _get_neuron_types(self):
+        '''
+        Return an int8 array containing the type of each neuron (1 for
+        excitatory, -1 for inhibitory); neurons that do not belong to any
+        group are considered excitatory.
+        '''
+        if self._neuron_group is None:
+            return np.zeros(0, dtype=np.int8)
+        # last entry is used for the neurons without group (index -1)
+        group_types = [g.neuron_type for g in self.values()]
+        group_types.append(1)
+        return np.array(group_types, dtype=np.int8)[self._neuron_group]
+
     def add_to_group(self, group_name, ids):
         '''
         Add neurons to a specific group.
@@ -854,6 +868,13 @@ class Connections:
             Array containing *ONLY* the newly-computed distances.
         '''
         n = graph.node_nb()
+        if graph.edges_attributes.is_computed(DIST):
+            # spatial graphs compute the distances from the positions
+            if dlist is not None:
+                raise InvalidArgument(
+                    "Distances are computed from the neurons' positions and "
+                    "cannot be set.")
+            return graph.get_edge_attributes(edges=elist, name=DIST)
         elist = graph.edges_array if elist is None else elist
         if dlist is not None:
             assert isinstance(dlist, np.ndarray), "numpy.ndarray required in "\
@@ -968,18 +989,18 @@ there are {} edges while {} values where provided'''.format(
         # for normalize by the inhibitory weight factor
         if graph is not None and graph.is_network():
             if not np.isclose(graph._iwf, 1.):
-                adj = graph.adjacency_matrix(types=True, weights=False)
-                keep = (adj[elist[:, 0], elist[:, 1]] < 0).A1
-                wlist[keep] *= graph._iwf
+                sources = (graph.edges_array[:, 0] if elist is None
+                           else elist[:, 0])
+                wlist   = np.array(wlist, dtype=float)
+                wlist[graph._get_node_types()[sources] < 0] *= graph._iwf
             
-        # add to the graph container
-        bwlist = (np.max(wlist) - wlist if np.any(wlist)
-                  else np.repeat(0., len(wlist)))
+        # add to the graph container ("bweight" is computed from the weights)
         if graph is not None:
             graph.set_edge_attribute(
                 WEIGHT, value_type="double", values=wlist, edges=elist)
-            graph.set_edge_attribute(
-                BWEIGHT, value_type="double", values=bwlist, edges=elist)
+            if BWEIGHT not in graph.edges_attributes:
+                graph.new_computed_edge_attribute(
+                    BWEIGHT, "double", _edge_bweights)
         return wlist
 
     @staticmethod
@@ -1011,64 +1032,54 @@ there are {} edges while {} values where provided'''.format(
             List of the edges' types.
         '''
         t_list = np.repeat(1., graph.edge_nb())
-        edges = graph.edges_array
-        num_inhib = 0
-        idx_inhib = []
         if inhib_nodes is None and inhib_frac is None:
             graph.new_edge_attribute("type", "double", val=1.)
             return t_list
+        num_edges = graph.edge_nb()
+        if inhib_nodes is None:
+            # set inhib_frac*num_edges random inhibitory connections
+            num_inhib = int(num_edges*inhib_frac)
+            idx_inhib = np.random.choice(num_edges, num_inhib, replace=False)
+            t_list[idx_inhib] = -1.
         else:
             n = graph.node_nb()
-            if inhib_nodes is None:
-                # set inhib_frac*num_edges random inhibitory connections
-                num_edges = graph.edge_nb()
-                num_inhib = int(num_edges*inhib_frac)
-                num_current = 0
-                while num_current < num_inhib:
-                    new = randint(0,num_edges,num_inhib-num_current)
-                    idx_inhib = np.unique(np.concatenate((idx_inhib, new)))
-                    num_current = len(idx_inhib)
-                t_list[idx_inhib.astype(int)] *= -1.
+            # boolean mask of the inhibitory nodes
+            inhib_mask = np.zeros(n, dtype=bool)
+            if nonstring_container(inhib_nodes):
+                inhib_mask[np.asarray(inhib_nodes, dtype=int)] = True
             else:
-                # get the dict of inhibitory nodes
                 num_inhib_nodes = 0
-                idx_nodes = {}
-                if nonstring_container(inhib_nodes):
-                    idx_nodes = {i: -1 for i in inhib_nodes}
-                    num_inhib_nodes = len(idx_nodes)
-                if isinstance(inhib_nodes, np.float):
-                    if inhib_nodes > 1:
-                        raise InvalidArgument(
-                            "Inhibitory ratio (float value for `inhib_nodes`) "
-                            "must be smaller than 1.")
-                        num_inhib_nodes = int(inhib_nodes*n)
                 if is_integer(inhib_nodes):
                     num_inhib_nodes = int(inhib_nodes)
-                while len(idx_nodes) != num_inhib_nodes:
-                    indices = randint(0,n,num_inhib_nodes-len(idx_nodes))
-                    di_tmp = { i:-1 for i in indices }
-                    idx_nodes.update(di_tmp)
-                for v in edges[:,0]:
-                    if v in idx_nodes:
-                        idx_inhib.append(v)
-                idx_inhib = np.unique(idx_inhib)
-                # set the inhibitory edge indices
-                for v in idx_inhib:
-                    idx_edges = np.argwhere(edges[:,0]==v)
-                    n = len(idx_edges)
-                    if inhib_frac is not None:
-                        idx_inh = []
-                        num_inh = n*inhib_frac
-                        i = 0
-                        while i != num_inh:
-                            ids = randint(0,n,num_inh-i)
-                            idx_inh = np.unique(np.concatenate((idx_inh,ids)))
-                            i = len(idx_inh)
-                        t_list[idx_inh] *= -1.
-                    else:
-                        t_list[idx_edges] *= -1.
-            graph.set_edge_attribute("type", value_type="double", values=t_list)
-            return t_list
+                elif inhib_nodes > 1:
+                    raise InvalidArgument(
+                        "Inhibitory ratio (float value for `inhib_nodes`) "
+                        "must be smaller than 1.")
+                else:
+                    num_inhib_nodes = int(inhib_nodes*n)
+                inhib_mask[np.random.choice(n, num_inhib_nodes,
+                                            replace=False)] = True
+            # edges coming from inhibitory nodes
+            sources   = graph.edges_array[:, 0]
+            idx_inhib = np.where(inhib_mask[sources])[0]
+            if inhib_frac is not None and len(idx_inhib):
+                # keep only a fraction of the edges of each inhibitory node:
+                # sort the edges by source with a random order inside each
+                # source group, then keep the first int(degree*inhib_frac)
+                src   = sources[idx_inhib]
+                order = np.argsort(src + np.random.random(len(src)))
+                idx_inhib = idx_inhib[order]
+                src       = src[order]
+                first  = np.concatenate(
+                    ([0], np.flatnonzero(np.diff(src)) + 1))
+                counts = np.diff(np.append(first, len(src)))
+                rank   = np.arange(len(src)) - np.repeat(first, counts)
+                keep = rank < np.repeat((counts*inhib_frac).astype(int),
+                                        counts)
+                idx_inhib = idx_inhib[keep]
+            t_list[idx_inhib] = -1.
+        graph.set_edge_attribute("type", value_type="double", values=t_list)
+        return t_list
 
 
 # ----- #
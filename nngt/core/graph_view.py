@@ -0,0 +1,408 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+#
+# This file is part of the NNGT project to generate and analyze
+# neuronal networks and their activity.
+# Copyright (C) 2015-2017  Tanguy Fardet
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Lightweight views on a subset of the nodes and edges of a graph """
+
+import numpy as np
+import scipy.sparse as ssp
+
+import nngt
+from nngt.lib import InvalidArgument, DIST, TYPE
+
+
+__all__ = ["GraphView"]
+
+
+class GraphView(object):
+
+    """
+    Read-only view on a subset of the nodes and edges of a
+    :class:`~nngt.Graph`.
+
+    The view does not create a new graph: it only stores the ids of the
+    selected nodes and edges, and the node ids in the view are remapped to
+    ``0, ..., N-1`` (in the order of the ids in the parent graph).
+    Edges and attributes are read from the parent graph when they are
+    requested, so the view must not be used after the edges of the parent
+    have been modified.
+
+    Degrees, adjacency matrix and the analysis functions that rely on them
+    (e.g. :func:`~nngt.analysis.degree_distrib`,
+    :func:`~nngt.analysis.spectral_radius`,
+    :func:`~nngt.analysis.subgraph_centrality`) can be used directly on the
+    view; functions requiring the graph library (betweenness, clustering...)
+    require a real graph, obtained through :func:`~GraphView.materialize`.
+
+    .. versionadded:: 1.0
+    """
+
+    def __init__(self, parent, nodes=None, edge_mask=None):
+        '''
+        Create a view on `parent`.
+
+        Parameters
+        ----------
+        parent : :class:`~nngt.Graph`
+            Graph that is viewed.
+        nodes : array-like or str, optional (default: all nodes)
+            Nodes that are kept, either as a list of node ids, as a boolean
+            mask of size ``parent.node_nb()``, or, for a
+            :class:`~nngt.Network`, as the name of a group of the population.
+        edge_mask : array-like, optional (default: all edges)
+            Boolean mask of size ``parent.edge_nb()`` giving the edges that
+            are kept (edges are always removed if one of their ends is not
+            in `nodes`).
+        '''
+        num_nodes = parent.node_nb()
+        num_edges = parent.edge_nb()
+        self._parent = parent
+        # nodes
+        node_mask = np.ones(num_nodes, dtype=bool)
+        if isinstance(nodes, str):
+            if not parent.is_network() or nodes not in parent.population:
+                raise InvalidArgument(
+                    "No group named '{}' in the graph.".format(nodes))
+            node_mask[:] = False
+            node_mask[parent.population[nodes].ids] = True
+        elif nodes is not None:
+            nodes = np.asarray(nodes)
+            if nodes.dtype == bool:
+                if len(nodes) != num_nodes:
+                    raise InvalidArgument(
+                        "Boolean `nodes` must be of size {}.".format(
+                            num_nodes))
+                node_mask = nodes.copy()
+            else:
+                node_mask[:] = False
+                node_mask[nodes] = True
+        self._node_ids = np.where(node_mask)[0].astype(parent._index_dtype)
+        # remapping of the node ids (-1 for nodes outside the view)
+        self._remap = np.full(num_nodes, -1, dtype=parent._index_dtype)
+        self._remap[self._node_ids] = np.arange(len(self._node_ids))
+        # edges
+        edges = parent.edges_array
+        if edge_mask is None:
+            edge_mask = np.ones(num_edges, dtype=bool)
+        else:
+            edge_mask = np.asarray(edge_mask, dtype=bool)
+            if len(edge_mask) != num_edges:
+                raise InvalidArgument(
+                    "`edge_mask` must be of size {}.".format(num_edges))
+        if num_edges and len(self._node_ids) < num_nodes:
+            edge_mask = edge_mask & node_mask[edges[:, 0]] \
+                & node_mask[edges[:, 1]]
+        self._edge_ids = np.where(edge_mask)[0]
+        self._edges    = self._remap[edges[self._edge_ids]]
+
+    def __repr__(self):
+        return "<GraphView of {} with {} nodes and {} edges at 0x{}>".format(
+            self._parent.name, self.node_nb(), self.edge_nb(), id(self))
+
+    # ---------- #
+    # Properties #
+    # ---------- #
+
+    @property
+    def parent(self):
+        ''' Graph that is viewed. '''
+        return self._parent
+
+    @property
+    def name(self):
+        ''' Name of the view. '''
+        return self._parent.name + "_view"
+
+    @property
+    def node_ids(self):
+        ''' Ids of the nodes of the view in the parent graph. '''
+        return self._node_ids
+
+    @property
+    def edge_ids(self):
+        ''' Ids of the edges of the view in the parent graph. '''
+        return self._edge_ids
+
+    @property
+    def edges_array(self):
+        '''
+        Edges of the view as an (E, 2) array, with the node ids of the view.
+        '''
+        return self._edges
+
+    @property
+    def edges_attributes(self):
+        ''' Names of the edge attributes. '''
+        return self._parent.edges_attributes.keys()
+
+    @property
+    def nodes_attributes(self):
+        ''' Names of the node attributes. '''
+        return self._parent.nodes_attributes.keys()
+
+    # ------- #
+    # Getters #
+    # ------- #
+
+    def node_nb(self):
+        ''' Number of nodes in the view. '''
+        return len(self._node_ids)
+
+    def edge_nb(self):
+        ''' Number of edges in the view. '''
+        return len(self._edge_ids)
+
+    def get_density(self):
+        '''
+        Density of the view: :math:`\\frac{E}{N^2}`, where `E` is the number of
+        edges and `N` the number of nodes.
+        '''
+        return self.edge_nb()/float(self.node_nb()**2)
+
+    def is_directed(self):
+        ''' Whether the graph is directed or not '''
+        return self._parent.is_directed()
+
+    def is_weighted(self):
+        ''' Whether the edges have weights '''
+        return self._parent.is_weighted()
+
+    def is_spatial(self):
+        ''' Whether the parent graph is embedded in space. '''
+        return self._parent.is_spatial()
+
+    def is_network(self):
+        '''
+        Always ``False`` since the population cannot be restricted without a
+        copy (see :func:`~GraphView.materialize`).
+        '''
+        return False
+
+    def get_edge_attributes(self, edges=None, name=None):
+        '''
+        Attributes of the edges of the view.
+
+        Parameters
+        ----------
+        edges : slice or array of ints, optional (default: all edges)
+            Edges of the view whose attributes should be returned.
+        name : str, optional (default: ``None``)
+            Name of the desired attribute.
+
+        Returns
+        -------
+        A dict containing all the attributes if `name` is ``None``, otherwise
+        the values of attribute `name`, ordered as the edges in
+        :func:`~GraphView.edges_array`.
+        '''
+        if name is None:
+            return {k: self.get_edge_attributes(edges, k)
+                    for k in self.edges_attributes}
+        eattr = self._parent.edges_attributes
+        eids  = self._edge_ids if edges is None else self._edge_ids[edges]
+        if name not in eattr:
+            raise InvalidArgument("Unknown edge attribute '{}'.".format(name))
+        elif eattr.is_computed(name):
+            return eattr._get_computed(name, eids)
+        return np.asarray(eattr[name])[eids]
+
+    def get_node_attributes(self, nodes=None, name=None):
+        '''
+        Attributes of the nodes of the view.
+
+        Parameters
+        ----------
+        nodes : slice or array of ints, optional (default: all nodes)
+            Nodes of the view whose attributes should be returned.
+        name : str, optional (default: ``None``)
+            Name of the desired attribute.
+
+        Returns
+        -------
+        A dict containing all the attributes if `name` is ``None``, otherwise
+        the values of attribute `name`.
+        '''
+        if name is None:
+            return {k: self.get_node_attributes(nodes, k)
+                    for k in self.nodes_attributes}
+        nids = self._node_ids if nodes is None else self._node_ids[nodes]
+        return np.asarray(self._parent.get_node_attributes(name=name))[nids]
+
+    def get_weights(self):
+        ''' Weights of the edges of the view. '''
+        return self.get_edge_attributes(name="weight")
+
+    def get_delays(self):
+        ''' Delays of the edges of the view. '''
+        return self.get_edge_attributes(name="delay")
+
+    def get_edge_types(self):
+        ''' Types of the edges of the view. '''
+        return np.asarray(self._parent.get_edge_types())[self._edge_ids]
+
+    def _get_node_types(self):
+        return self._parent._get_node_types()[self._node_ids]
+
+    def get_positions(self, neurons=None):
+        '''
+        Positions of the nodes of the view (spatial graphs only).
+        '''
+        if neurons is not None:
+            return self._parent.get_positions(self._node_ids[neurons])
+        return self._parent.get_positions(self._node_ids)
+
+    def get_degrees(self, deg_type="total", node_list=None, use_weights=False,
+                    syn_type="all"):
+        '''
+        Degree sequence of the nodes, restricted to the edges of the view.
+
+        Parameters
+        ----------
+        deg_type : string, optional (default: "total")
+            Degree type (among 'in', 'out' or 'total').
+        node_list : list, optional (default: None)
+            List of the nodes (ids in the view) which degree should be
+            returned.
+        use_weights : bool, optional (default: False)
+            Whether to use weighted (True) or simple degrees (False).
+        syn_type : int or str, optional (default: all)
+            Restrict to a given synaptic type ("excitatory", 1, or
+            "inhibitory", -1).
+
+        Returns
+        -------
+        :class:`numpy.array`
+        '''
+        if deg_type not in ("in", "out", "total"):
+            raise InvalidArgument("Invalid degree type '{}'".format(deg_type))
+        num_nodes = self.node_nb()
+        edges     = self._edges
+        weights   = None
+        if use_weights:
+            weights = np.asarray(self.get_weights(), dtype=float)
+        if syn_type != "all":
+            if syn_type in ("excitatory", 1):
+                syn_type = 1
+            elif syn_type in ("inhibitory", -1):
+                syn_type = -1
+            else:
+                raise InvalidArgument(
+                    "Invalid synaptic type '{}'".format(syn_type))
+            keep  = self._get_node_types()[edges[:, 0]] == syn_type
+            edges = edges[keep]
+            if use_weights:
+                weights = weights[keep]
+        degrees = np.zeros(num_nodes, dtype=float if use_weights else int)
+        if deg_type in ("in", "total") or not self.is_directed():
+            degrees += np.bincount(edges[:, 1], weights=weights,
+                                   minlength=num_nodes).astype(degrees.dtype)
+        if deg_type in ("out", "total") or not self.is_directed():
+            degrees += np.bincount(edges[:, 0], weights=weights,
+                                   minlength=num_nodes).astype(degrees.dtype)
+        if node_list is not None:
+            return degrees[node_list]
+        return degrees
+
+    def adjacency_matrix(self, types=True, weights=True):
+        '''
+        Adjacency matrix of the view.
+        NB : source nodes are represented by the rows, targets by the
+        corresponding columns.
+
+        Parameters
+        ----------
+        types : bool, optional (default: True)
+            Wether the edge types should be taken into account (negative values
+            for inhibitory connections).
+        weights : bool or string, optional (default: True)
+            Whether the adjacecy matrix should be weighted. If True, all
+            connections are multiply bythe associated synaptic strength; if
+            weight is a string, the connections are scaled bythe corresponding
+            edge attribute.
+
+        Returns
+        -------
+        mat : :class:`scipy.sparse.csr` matrix
+            The adjacency matrix of the view.
+        '''
+        num_nodes = self.node_nb()
+        weights   = "weight" if weights is True else weights
+        edges     = self._edges
+        if weights and weights in self.edges_attributes:
+            data = np.array(self.get_edge_attributes(name=weights),
+                            dtype=float)
+        else:
+            data = np.ones(len(edges))
+        if types:
+            data[self._get_node_types()[edges[:, 0]] < 0] *= -1.
+        return ssp.coo_matrix((data, (edges[:, 0], edges[:, 1])),
+                              shape=(num_nodes, num_nodes)).tocsr()
+
+    # ----------- #
+    # Copy method #
+    # ----------- #
+
+    def materialize(self, name=None):
+        '''
+        Create a new graph containing the nodes, edges and attributes of the
+        view.
+
+        The result is a :class:`~nngt.SpatialGraph` if the parent graph is
+        spatial, otherwise a :class:`~nngt.Graph`; for networks, the types of
+        the neurons are kept in the "type" node attribute.
+
+        Parameters
+        ----------
+        name : str, optional (default: name of the parent graph + "_view")
+            Name of the new graph.
+
+        Returns
+        -------
+        graph : :class:`~nngt.Graph` or :class:`~nngt.SpatialGraph`
+        '''
+        parent = self._parent
+        name   = self.name if name is None else name
+        graph  = nngt.Graph(
+            nodes=self.node_nb(), name=name, weighted=parent.is_weighted(),
+            directed=parent.is_directed(),
+            index_dtype=parent._index_dtype, attr_dtype=parent._attr_dtype)
+        # node attributes
+        for k in self.nodes_attributes:
+            graph.new_node_attribute(
+                k, parent.get_attribute_type(k, "node"),
+                values=self.get_node_attributes(name=k))
+        if parent.is_network() and TYPE not in graph.nodes_attributes:
+            graph.new_node_attribute(TYPE, "int",
+                                     values=self._get_node_types())
+        if parent.is_spatial():
+            nngt.SpatialGraph.make_spatial(
+                graph, positions=self.get_positions())
+        # edge attributes
+        eattr      = parent.edges_attributes
+        attributes = {}
+        for k in eattr._stored_keys():
+            if k not in graph.edges_attributes and k not in (DIST, "delay"):
+                graph.new_edge_attribute(k, eattr.value_type(k))
+            attributes[k] = self.get_edge_attributes(name=k)
+        graph.new_edges(self._edges, attributes=attributes)
+        for k, (func, cache) in eattr._computed.items():
+            if k not in graph.edges_attributes:
+                graph.new_computed_edge_attribute(
+                    k, eattr.value_type(k), func, cache=cache)
+        return graph
@@ -28,6 +28,7 @@ import scipy.sparse as ssp
 import nngt
 from nngt.lib import InvalidArgument, BWEIGHT, nonstring_container, is_integer
 from nngt.lib.connect_tools import _unique_rows
+from nngt.lib.graph_helpers import _missing_reciprocals
 
 from .base_graph import GraphInterface, BaseProperty
 
@@ -55,6 +56,7 @@ class _GtNProperty(BaseProperty):
             size = self.parent().num_vertices()
             if len(value) == size:
                 self.parent().vertex_properties[name].a = np.array(value)
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "node in the graph is required")
@@ -87,6 +89,7 @@ class _GtNProperty(BaseProperty):
         nprop = self.parent().new_vertex_property(value_type, vals=values)
         self.parent().vertex_properties[name] = nprop
         self._num_values_set[name] = len(values)
+        self._written(name)
 
     def set_attribute(self, name, values, nodes=None):
         '''
@@ -116,9 +119,11 @@ class _GtNProperty(BaseProperty):
                        not in ('string', 'object'))
             if self._num_values_set[name] == num_nodes - num_n and non_obj:
                 self.parent().vertex_properties[name].a[-num_n:] = values
+                self._written(name, slice(num_nodes - num_n, num_nodes))
             else:
                 for n, val in zip(nodes, values):
                     self.parent().vertex_properties[name][n] = val
+                self._written(name, nodes)
         self._num_values_set[name] = num_nodes
 
 
@@ -131,27 +136,33 @@ class _GtEProperty(BaseProperty):
         Return the attributes of an edge or a list of edges.
         '''
         if isinstance(name, slice):
-            eprop = {}
-            for k in self.keys():
-                eprop[k] = self.parent().edge_properties[k].a[name]
+            eprop = self._stored_slice(name)
+            eprop.update(self._computed_items(name))
             return eprop
         elif nonstring_container(name):
             eprop = {}
             if nonstring_container(name[0]):
-                eids = [self.parent().edge_index[e] for e in name]
-                for k in self.keys():
-                    eprop[k] = self.parent().edge_properties[k].a[eids]
+                eids = self.parent().edge_id(name)
+                for k in self._stored_keys():
+                    eprop[k] = np.array(
+                        self.parent().edge_properties[k].a[eids],
+                        dtype=self._dtype(k))
             else:
-                for k in self.keys():
+                for k in self._stored_keys():
                     eprop[k] = self.parent().edge_properties[k][name]
+            eprop.update(self._computed_items(name))
             return eprop
-        return np.array(self.parent().edge_properties[name].a)
+        elif name in self._computed:
+            return self._get_computed(name)
+        return np.array(self.parent().edge_properties[name].a,
+                        dtype=self._dtype(name))
 
     def __setitem__(self, name, value):
         if name in self:
             size = self.parent().num_edges()
             if len(value) == size:
                 self.parent().edge_properties[name].a = np.array(value)
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per \
 edge in the graph is required")
@@ -184,14 +195,26 @@ set_attribute to create it.")
                 raise ValueError("`edges` and `values` must have the same "
                                  "size; got respectively " + str(num_e) + \
                                  " and " + str(len(values)) + "entries.")
-            if self._num_values_set[name] == num_edges - num_e:
-                self.parent().edge_properties[name].a[-num_e:] = values
-                self._num_values_set[name] = num_edges
+            eprop   = self.parent().edge_properties[name]
+            non_obj = (super(_GtEProperty, self).__getitem__(name)
+                       not in ('string', 'object'))
+            if self._num_values_set[name] == num_edges - num_e and non_obj:
+                eprop.a[-num_e:] = values
+                self._written(name, slice(num_edges - num_e, num_edges))
+            elif non_obj:
+                eids = self.parent().edge_id(edges)
+                eprop.a[eids] = values
+                self._written(name, eids)
             else:
                 for e, val in zip(edges, values):
-                    gt_e = self.parent().edge(*e)
-                    self.parent().edge_properties[name][gt_e] = val
-                self._num_values_set[name] += num_e
+                    eprop[self.parent().edge(*e)] = val
+                self._written(name, self.parent().edge_id(edges))
+            self._num_values_set[name] = num_edges
+
+    def _stored_slice(self, edges):
+        return {k: np.array(self.parent().edge_properties[k].a[edges],
+                            dtype=self._dtype(k))
+                for k in self._stored_keys()}
 
     def new_attribute(self, name, value_type, values=None, val=None):
         if values is None and val is None:
@@ -218,6 +241,14 @@ set_attribute to create it.")
         eprop = self.parent().new_edge_property(value_type, vals=values)
         self.parent().edge_properties[name] = eprop
         self._num_values_set[name] = len(values)
+        self._written(name)
+
+    def _memory(self, name, num_values, deep=False):
+        if deep and name not in self._computed:
+            values = self.parent().edge_properties[name].a
+            if values is not None:
+                return values.nbytes
+        return super(_GtEProperty, self)._memory(name, num_values, deep)
 
 
 #-----------------------------------------------------------------------------#
@@ -278,8 +309,7 @@ class _GtGraph(GraphInterface):
         if is_integer(edge[0]):
             return self.edge_index[edge]
         elif nonstring_container(edge[0]):
-            idx = [self.edge_index[e] for e in edge]
-            return idx
+            return self._edge_ids(edge)
         else:
             raise AttributeError("`edge` must be either a 2-tuple of ints or "
                                  "an array of 2-tuples of ints.")
@@ -297,11 +327,20 @@ class _GtGraph(GraphInterface):
         edges = None
         if gt_major_version == 2 and gt_minor_version < 22:
             return np.array(
-                [(int(e.source()), int(e.target())) for e in self.edges()])
+                [(int(e.source()), int(e.target())) for e in self.edges()],
+                dtype=self._index_dtype)
         else:
             edges = self.get_edges()
             order = np.argsort(edges[:, 2])
-            return edges[order, :2]
+            return edges[order, :2].astype(self._index_dtype)
+
+    def _memory_edges(self, deep=False):
+        if deep:
+            # estimate of graph-tool's adjacency list: each edge is stored as
+            # a (neighbour, edge index) pair of 64-bit ints in the out- and
+            # in-lists; the edge index is implicit
+            return 32*self.num_edges() + 56*self.num_vertices(), 0
+        return super(_GtGraph, self)._memory_edges(deep)
     
     def new_node(self, n=1, ntype=1, attributes=None, value_types=None,
                  positions=None, groups=None):
@@ -425,11 +464,9 @@ class _GtGraph(GraphInterface):
         if not isinstance(edge_list, np.ndarray):
             edge_list = np.array(edge_list)
         if not self._directed:
-            recip_edges = edge_list[:,::-1]
-            # slow but works
-            unique = ~(recip_edges[..., np.newaxis]
-                       == edge_list[..., np.newaxis].T).all(1).any(1)
-            edge_list = np.concatenate((edge_list, recip_edges[unique]))
+            # add the reciprocal edges which are not present
+            unique    = _missing_reciprocals(edge_list)
+            edge_list = np.concatenate((edge_list, edge_list[unique, ::-1]))
             for key, val in attributes.items():
                 attributes[key] = np.concatenate((val, val[unique]))
         # create the edges
@@ -469,10 +506,8 @@ class _GtGraph(GraphInterface):
         if self.num_edges():
             w_p = None
             if "weight" in self.edge_properties.keys() and use_weights:
-                ws = self.get_weights()
-                self.set_edge_attribute(
-                    BWEIGHT, values=ws.max() - ws, value_type="double")
-                w_p = self.edge_properties[BWEIGHT]
+                w_p = self.new_edge_property(
+                    "double", vals=self._eattr[BWEIGHT])
             tpl = nngt.analyze_graph["betweenness"](
                 self, weight=w_p, norm=norm)
             lst_return = []
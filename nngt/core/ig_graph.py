@@ -27,7 +27,7 @@ import scipy.sparse as ssp
 
 import nngt
 from nngt.lib import InvalidArgument, nonstring_container, BWEIGHT, is_integer
-from nngt.lib.io_tools import _np_dtype
+from nngt.lib.graph_helpers import _deep_sizeof, _missing_reciprocals
 from .base_graph import GraphInterface, BaseProperty
 
 
@@ -43,7 +43,7 @@ class _IgNProperty(BaseProperty):
     '''
 
     def __getitem__(self, name):
-        dtype = _np_dtype(super(_IgNProperty, self).__getitem__(name))
+        dtype = self._dtype(name)
         return np.array(np.array(self.parent().vs[name]), dtype=dtype)
 
     def __setitem__(self, name, value):
@@ -51,6 +51,7 @@ class _IgNProperty(BaseProperty):
         if name in self:
             if len(value) == size:
                 self.parent().vs[name] = value
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "node in the graph is required")
@@ -102,9 +103,11 @@ class _IgNProperty(BaseProperty):
                                  " and " + str(len(values)) + "entries.")
             if self._num_values_set[name] == num_nodes - num_n:
                 self.parent().vs[-num_n:][name] = values
+                self._written(name, slice(num_nodes - num_n, num_nodes))
             else:
                 for n, val in zip(nodes, values):
                     self.parent().vs[n][name] = val
+                self._written(name, nodes)
         self._num_values_set[name] = num_nodes
 
 
@@ -114,24 +117,26 @@ class _IgEProperty(BaseProperty):
 
     def __getitem__(self, name):
         if isinstance(name, slice):
-            eprop = {}
-            for k in self.keys():
-                dtype = _np_dtype(super(_IgEProperty, self).__getitem__(k))
-                eprop[k] = np.array(self.parent().es[k], dtype=dtype)[name]
+            eprop = self._stored_slice(name)
+            eprop.update(self._computed_items(name))
             return eprop
         elif nonstring_container(name):
             eprop = {}
             if nonstring_container(name[0]):
-                eids = [self.parent().get_eid(*e) for e in name]
-                for k in self.keys():
-                    dtype = _np_dtype(super(_IgENProperty, self).__getitem__(k))
-                    eprop[k] = np.array(self.parent().es[k], dtype=dtype)[eids]
+                eseq = self.parent().es.select(self.parent().edge_id(name))
+                for k in self._stored_keys():
+                    eprop[k] = np.array(eseq[k], dtype=self._dtype(k))
+                eprop.update(self._computed_items(name))
             else:
                 eid = self.parent().get_eid(*name)
-                for k in self.keys():
+                for k in self._stored_keys():
                     eprop[k] = self.parent().es[k][eid]
+                for k, v in self._computed_items([name]).items():
+                    eprop[k] = v[0]
             return eprop
-        dtype = _np_dtype(super(_IgEProperty, self).__getitem__(name))
+        elif name in self._computed:
+            return self._get_computed(name)
+        dtype = self._dtype(name)
         return np.array(self.parent().es[name], dtype=dtype)
 
     def __setitem__(self, name, value):
@@ -139,6 +144,7 @@ class _IgEProperty(BaseProperty):
             size = self.parent().edge_nb()
             if len(value) == size:
                 self.parent().es[name] = value
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "edge in the graph is required")
@@ -190,12 +196,23 @@ class _IgEProperty(BaseProperty):
                                  " and " + str(len(values)) + "entries.")
             if self._num_values_set[name] == num_edges - num_e:
                 self.parent().es[-num_e:][name] = values
+                self._written(name, slice(num_edges - num_e, num_edges))
             else:
-                for e, val in zip(edges, values):
-                    eid = self.parent().get_eid(*e)
-                    self.parent().es[eid][name] = val
+                eids = self.parent().edge_id(edges)
+                self.parent().es.select(eids)[name] = values
+                self._written(name, eids)
         self._num_values_set[name] = num_edges
 
+    def _stored_slice(self, edges):
+        eseq = self.parent().es[edges]
+        return {k: np.array(eseq[k], dtype=self._dtype(k))
+                for k in self._stored_keys()}
+
+    def _memory(self, name, num_values, deep=False):
+        if deep and name not in self._computed:
+            return _deep_sizeof(self.parent().es[name])
+        return super(_IgEProperty, self)._memory(name, num_values, deep)
+
 
 #-----------------------------------------------------------------------------#
 # Graph
@@ -214,7 +231,8 @@ class _IGraph(GraphInterface):
     #-------------------------------------------------------------------------#
     # Constructor and instance properties
     
-    def __init__(self, nodes=0, g=None, directed=True, weighted=False):
+    def __init__(self, nodes=0, g=None, directed=True, weighted=False,
+                 **kwargs):
         self._nattr = _IgNProperty(self)
         self._eattr = _IgEProperty(self)
         self._weighted = weighted
@@ -238,7 +256,13 @@ class _IGraph(GraphInterface):
                 di_edge_attr[attr] = np.array(g.es[:][attr])
                 self._eattr.new_attribute(attr, value_type="double")
             lst_edges = nngt.analyze_graph["get_edges"](g)
-            self.new_edges(lst_edges, attributes=di_edge_attr)
+            # the values of `g` are complete: they are copied directly instead
+            # of going through the rules of `attr_new_edges` (synaptic
+            # properties, distances), which would require the population or
+            # the positions of the new graph
+            super(_IGraph, self).add_edges(lst_edges)
+            for attr, values in di_edge_attr.items():
+                self._eattr.set_attribute(attr, values)
 
     #-------------------------------------------------------------------------#
     # Graph manipulation
@@ -262,7 +286,7 @@ class _IGraph(GraphInterface):
         if is_integer(edge[0]):
             return self.get_eid(*edge)
         elif nonstring_container(edge[0]):
-            return self.get_eids(edge)
+            return self._edge_ids(edge)
         else:
             raise AttributeError("`edge` must be either a 2-tuple of ints or\
 an array of 2-tuples of ints.")
@@ -271,7 +295,21 @@ an array of 2-tuples of ints.")
     def edges_array(self):
         ''' Edges of the graph, sorted by order of creation, as an array of
         2-tuple. '''
-        return np.array([(e.source, e.target) for e in self.es], dtype=int)
+        return np.array(self.get_edgelist(),
+                        dtype=self._index_dtype).reshape(-1, 2)
+
+    def _edges_from(self, first_eid):
+        edges = [e.tuple for e in self.es[first_eid:]]
+        return np.array(edges, dtype=self._index_dtype).reshape(-1, 2)
+
+    def _memory_edges(self, deep=False):
+        if deep:
+            # estimate of igraph's indexed edge list: sources and targets,
+            # plus the sorted edge indices and the cumulated degrees which
+            # are used to find the edges of each node
+            e, n = self.ecount(), self.vcount()
+            return 16*e, 16*e + 16*(n + 1)
+        return super(_IGraph, self)._memory_edges(deep)
     
     def new_node(self, n=1, ntype=1, attributes=None, value_types=None,
                  positions=None, groups=None):
@@ -379,11 +417,9 @@ an array of 2-tuples of ints.")
         initial_ecount = self.ecount()
         edge_list = np.array(edge_list)
         if not self._directed:
-            recip_edges = edge_list[:,::-1]
-            # slow but works
-            unique = ~(recip_edges[..., np.newaxis]
-                      == edge_list[..., np.newaxis].T).all(1).any(1)
-            edge_list = np.concatenate((edge_list, recip_edges[unique]))
+            # add the reciprocal edges which are not present
+            unique    = _missing_reciprocals(edge_list)
+            edge_list = np.concatenate((edge_list, edge_list[unique, ::-1]))
             for key, val in attributes.items():
                 attributes[key] = np.concatenate((val, val[unique]))
         first_eid = self.ecount()
@@ -429,7 +465,7 @@ an array of 2-tuples of ints.")
         ecoeff_norm = (e-1)*(e-2)/2.
         w, nbetw, ebetw = None, None, None
         if use_weights:
-            w = self.es['bweight']
+            w = self._eattr[BWEIGHT].tolist()
         if btype in ("both", "node"):
             nbetw = np.array(self.betweenness(weights=w))
         if btype in ("both", "edge"):
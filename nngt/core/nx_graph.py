@@ -27,7 +27,7 @@ import scipy.sparse as ssp
 
 import nngt
 from nngt.lib import InvalidArgument, BWEIGHT, nonstring_container, is_integer
-from nngt.lib.io_tools import _np_dtype
+from nngt.lib.graph_helpers import _deep_sizeof, _missing_reciprocals
 from .base_graph import GraphInterface, BaseProperty
 
 
@@ -35,6 +35,9 @@ from .base_graph import GraphInterface, BaseProperty
 # Properties #
 # ---------- #
 
+_default_values = {"int": 0, "double": np.NaN, "string": ""}
+
+
 class _NxNProperty(BaseProperty):
 
     '''
@@ -44,7 +47,7 @@ class _NxNProperty(BaseProperty):
     def __getitem__(self, name):
         lst = [self.parent().node[i][name]
                for i in range(self.parent().node_nb())]
-        dtype = _np_dtype(super(_NxNProperty, self).__getitem__(name))
+        dtype = self._dtype(name)
         return np.array(lst, dtype=dtype)
 
     def __setitem__(self, name, value):
@@ -53,6 +56,7 @@ class _NxNProperty(BaseProperty):
             if len(value) == size:
                 for i in range(size):
                     self.parent().node[i][name] = value[i]
+                self._written(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "node in the graph is required")
@@ -105,51 +109,64 @@ class _NxNProperty(BaseProperty):
             else:
                 for n, val in zip(nodes, values):
                     self.parent().node[n][name] = val
+                self._written(name, nodes)
         self._num_values_set[name] = num_nodes
 
 
 class _NxEProperty(BaseProperty):
 
-    ''' Class for generic interactions with edge properties (networkx)  '''
+    '''
+    Class for generic interactions with edge properties (networkx).
+
+    The values are stored as numpy columns ordered by edge id; they are
+    written to the networkx edge dicts only when networkx functions are
+    called by NNGT (analysis functions, weighted degrees, betweenness), from
+    the values which were modified since the last call (see :func:`_sync`).
+    All modifications must therefore go through the NNGT functions: values
+    written directly to the edge dicts are not seen when reading the
+    attributes.
+    '''
+
+    def __init__(self, parent):
+        super(_NxEProperty, self).__init__(parent)
+        # values of the attributes, ordered by edge id
+        self._columns = {}
+        # ids of the edges whose values are not in the edge dicts yet, for
+        # each attribute (None for all edges)
+        self._dirty = {}
 
     def __getitem__(self, name):
-        edges = None
-        if isinstance(name, slice):
-            edges = self.parent().edges_array[name]
+        if isinstance(name, str) and name in self._computed:
+            return self._get_computed(name)
+        elif isinstance(name, str):
+            return self._column(name).copy()
+        elif isinstance(name, slice):
+            eids, edges = name, name
         elif nonstring_container(name):
             if nonstring_container(name[0]):
-                edges = name
+                edges = np.asarray(name)
+                eids  = self.parent().edge_id(edges)
             else:
                 if len(name) != 2:
                     raise InvalidArgument(
                         "key for edge attribute must be one of the following: "
                         "slice, list of edges, edges or attribute name.")
-                return self.parent()[name[0]][name[1]]
-        if isinstance(name, str):
-            dtype = _np_dtype(super(_NxEProperty, self).__getitem__(name))
-            eprop = np.empty(self.parent().edge_nb(), dtype=dtype)
-            g = self.parent()
-            for d, eid in zip(g.edges(data=name), g.edges(data="eid")):
-                eprop[eid[2]] = d[2]
-            return eprop
+                eid = self.parent().edge_id(name)
+                return {k: self._column(k)[eid] for k in self._stored_keys()}
         else:
-            eprop = {k: [] for k in self.keys()}
-            for edge in edges:
-                data = self.parent().get_edge_data(edge[0], edge[1])
-                for k, v in data.items():
-                    if k != "eid":
-                        eprop[k].append(v)
-            for k, v in eprop.items():
-                dtype = _np_dtype(super(_NxEProperty, self).__getitem__(k))
-                eprop = {k: np.array(v, dtype)}
-            return eprop
+            raise InvalidArgument(
+                "key for edge attribute must be one of the following: "
+                "slice, list of edges, edges or attribute name.")
+        eprop = {k: self._column(k)[eids] for k in self._stored_keys()}
+        eprop.update(self._computed_items(edges))
+        return eprop
 
     def __setitem__(self, name, value):
         if name in self:
             size = self.parent().number_of_edges()
             if len(value) == size:
-                for e in self.parent().edges(data="eid"):
-                    self.parent().edges[e[0], e[1]][name] = value[e[2]]
+                self._columns[name] = np.array(value, dtype=self._dtype(name))
+                self._write(name)
             else:
                 raise ValueError("A list or a np.array with one entry per "
                                  "edge in the graph is required")
@@ -157,7 +174,23 @@ class _NxEProperty(BaseProperty):
             raise InvalidArgument("Attribute does not exist yet, use "
                                   "set_attribute to create it.")
 
+    def clear(self):
+        super(_NxEProperty, self).clear()
+        self._columns.clear()
+        self._dirty.clear()
+
+    def _copy(self, parent):
+        new = super(_NxEProperty, self)._copy(parent)
+        new._columns = {k: v.copy() for k, v in self._columns.items()}
+        # networkx copies the edge dicts as they are
+        new._dirty = {k: None if v is None else list(v)
+                      for k, v in self._dirty.items()}
+        return new
+
     def new_attribute(self, name, value_type, values=None, val=None):
+        if name == "eid":
+            raise InvalidArgument("'eid' is used by NNGT to store the edge "
+                                  "ids in the networkx edge dicts.")
         if val is None:
             if value_type == "int":
                 val = int(0)
@@ -168,13 +201,17 @@ class _NxEProperty(BaseProperty):
             else:
                 val = None
                 value_type = "object"
-        if values is None:
-            values = [val for _ in range(self.parent().number_of_edges())]
         # store name and value type in the dict
         super(_NxEProperty, self).__setitem__(name, value_type)
         # store the real values in the attribute
-        self[name] = values
-        self._num_values_set[name] = len(values)
+        num_edges = self.parent().number_of_edges()
+        if values is None:
+            self._columns[name] = np.full(num_edges, val,
+                                          dtype=self._dtype(name))
+            self._write(name)
+        else:
+            self[name] = values
+        self._num_values_set[name] = num_edges
 
     def set_attribute(self, name, values, edges=None):
         '''
@@ -199,15 +236,85 @@ class _NxEProperty(BaseProperty):
                 raise ValueError("`edges` and `values` must have the same "
                                  "size; got respectively " + str(num_e) + \
                                  " and " + str(len(values)) + "entries.")
-            for i, e in enumerate(edges):
-                try:
-                    edict = self.parent()[e[0]][e[1]]
-                except:
-                    edict = {}
-                edict[name] = values[i]
-                self.parent().add_edge(e[0], e[1], **edict)
+            eids = self.parent().edge_id(np.asarray(edges))
+            self._column(name)[eids] = values
+            self._write(name, eids)
         self._num_values_set[name] = num_edges
 
+    def _column(self, name):
+        '''
+        Values of stored attribute `name` ordered by edge id, extended with
+        the default value of the attribute if edges were added since it was
+        last set.
+        '''
+        num_edges = self.parent().number_of_edges()
+        column    = self._columns[name]
+        if len(column) < num_edges:
+            value_type = super(_NxEProperty, self).__getitem__(name)
+            new_column = np.empty(num_edges, dtype=column.dtype)
+            new_column[:len(column)] = column
+            new_column[len(column):] = _default_values.get(value_type, None)
+            self._columns[name] = new_column
+            self._write(name, np.arange(len(column), num_edges))
+            column = new_column
+        return column
+
+    def _stored_slice(self, edges):
+        return {k: self._column(k)[edges] for k in self._stored_keys()}
+
+    def _extend(self):
+        '''
+        Give their default value to the stored attributes which were not set
+        for the last edges added.
+        '''
+        for name in self._stored_keys():
+            self._column(name)
+
+    def _write(self, name, eids=None):
+        '''
+        Record that the values of stored attribute `name` were modified for
+        the edges of ids `eids` (default: all edges); they are written to the
+        networkx edge dicts by the next call to :func:`_sync`.
+        '''
+        if eids is None:
+            self._dirty[name] = None
+        elif self._dirty.get(name, []) is not None:
+            self._dirty.setdefault(name, []).append(np.ravel(eids))
+        self._written(name, eids)
+
+    def _sync(self):
+        '''
+        Write the values which were modified since the last call to the
+        networkx edge dicts, before they are used by networkx functions.
+        '''
+        # default values of the edges added since the last write
+        self._extend()
+        if not self._dirty:
+            return
+        g = self.parent()
+        for name, eids in self._dirty.items():
+            column = self._columns[name]
+            if eids is None:
+                values = column.tolist()
+                for u, v, eid in g.edges(data="eid"):
+                    g._succ[u][v][name] = values[eid]
+            else:
+                eids  = np.unique(np.concatenate(eids))
+                edges = g._edges_by_id()[eids].tolist()
+                for (u, v), value in zip(edges, column[eids].tolist()):
+                    g._succ[u][v][name] = value
+        self._dirty.clear()
+
+    def _memory(self, name, num_values, deep=False):
+        if deep and name not in self._computed:
+            column = self._columns.get(name, np.array([]))
+            if column.dtype == object:
+                seen = set()
+                return column.nbytes + sum(_deep_sizeof(v, seen)
+                                           for v in column)
+            return column.nbytes
+        return super(_NxEProperty, self)._memory(name, num_values, deep)
+
 
 # ----- #
 # Graph #
@@ -227,16 +334,25 @@ class _NxGraph(GraphInterface):
     
     di_value = { "string": "", "double": 0., "int": int(0) }
 
+    # edges ordered by id (built on demand)
+    _edge_arr = None
+
     #-------------------------------------------------------------------------#
     # Constructor and instance properties
     
-    def __init__(self, nodes=0, g=None, directed=True, weighted=False):
+    def __init__(self, nodes=0, g=None, directed=True, weighted=False,
+                 **kwargs):
         self._directed = directed
         self._weighted = weighted
         self._nattr = _NxNProperty(self)
         self._eattr = _NxEProperty(self)
         super(_NxGraph, self).__init__(g)
-        if g is not None:
+        if isinstance(g, _NxGraph):
+            # networkx copies the edge dicts, the columns are copied with the
+            # attribute containers
+            self._nattr = g._nattr._copy(self)
+            self._eattr = g._eattr._copy(self)
+        elif g is not None:
             edges = nngt.analyze_graph["get_edges"](g)
         elif nodes:
             self.add_nodes_from(range(nodes))
@@ -263,19 +379,45 @@ class _NxGraph(GraphInterface):
         if is_integer(edge[0]):
             return self[edge[0]][edge[1]]["eid"]
         elif nonstring_container(edge[0]):
-            return [self[e[0]][e[1]]["eid"] for e in edge]
+            return self._edge_ids(edge)
         else:
             raise AttributeError("`edge` must be either a 2-tuple of ints or "
                                  "an array of 2-tuples of ints.")
-    
+
+    def _edges_by_id(self):
+        ''' Edges ordered by id (cached array which must not be modified). '''
+        num_edges = self.number_of_edges()
+        if self._edge_arr is None or len(self._edge_arr) != num_edges:
+            edges = np.zeros((num_edges, 2), dtype=self._index_dtype)
+            for weighted_edge in self.edges(data="eid"):
+                edges[weighted_edge[2], :] = weighted_edge[:2]
+            self._edge_arr = edges
+        return self._edge_arr
+
+    def _append_edges(self, edges, first_eid):
+        ''' Extend the cached edges with `edges`, of ids from `first_eid`. '''
+        if self._edge_arr is not None and len(self._edge_arr) == first_eid:
+            edges = np.asarray(edges, dtype=self._index_dtype).reshape(-1, 2)
+            self._edge_arr = np.concatenate((self._edge_arr, edges))
+
     @property
     def edges_array(self):
         ''' Edges of the graph, sorted by order of creation, as an array of
         2-tuple. '''
-        edges = np.zeros((self.edge_nb(), 2), dtype=int)
-        for weighted_edge in self.edges(data="eid"):
-            edges[weighted_edge[2], :] = weighted_edge[:2]
-        return edges
+        return self._edges_by_id().copy()
+
+    def _edges_from(self, first_eid):
+        return self._edges_by_id()[first_eid:].copy()
+
+    def _memory_edges(self, deep=False):
+        if deep:
+            # the adjacency dicts contain the edge data dicts, where the edge
+            # ids are stored; attribute values are reported separately
+            seen = set()
+            for e in self.edges(data=True):
+                seen.update(id(v) for k, v in e[2].items() if k != "eid")
+            return _deep_sizeof((self._succ, self._pred), seen), 0
+        return super(_NxGraph, self)._memory_edges(deep)
     
     def new_node(self, n=1, ntype=1, attributes=None, value_types=None,
                  positions=None, groups=None):
@@ -360,22 +502,23 @@ class _NxGraph(GraphInterface):
             if not ignore:
                 raise InvalidArgument("Trying to add existing edge.")
         else:
+            attributes = {} if attributes is None else attributes
             for attr in attributes:
                 if "_corr" in attr:
                     raise NotImplementedError("Correlated attributes are not "
                                               "available with networkx.")
             if self._weighted and "weight" not in attributes:
                 attributes["weight"] = 1.
-            self.add_edge(source, target)
-            self[source][target]["eid"] = self.number_of_edges()
+            eid = self.number_of_edges()
+            self.add_edge(source, target, eid=eid)
+            self._append_edges((source, target), eid)
             # call parent function to set the attributes
             self.attr_new_edges([(source, target)], attributes=attributes)
             if not self._directed:
-                self.add_edge(target,source)
-                self[source][target]["eid"] = self.number_of_edges()
-                for key, val in attributes.items():
-                    self[target][source][key] = val
+                self.add_edge(target, source, eid=eid + 1)
+                self._append_edges((target, source), eid + 1)
                 self.attr_new_edges([(target, source)], attributes=attributes)
+            self._eattr._extend()
         return (source, target)
 
     def new_edges(self, edge_list, attributes=None):
@@ -405,22 +548,22 @@ class _NxGraph(GraphInterface):
                                           "available with networkx.")
         initial_edges = self.number_of_edges()
         edge_list = np.array(edge_list)
+        if not self._directed:
+            # add the reciprocal edges which are not present
+            unique    = _missing_reciprocals(edge_list)
+            edge_list = np.concatenate((edge_list, edge_list[unique, ::-1]))
+            for key, val in attributes.items():
+                attributes[key] = np.concatenate((val, val[unique]))
         num_added = len(edge_list)
         arr_edges = np.zeros((num_added, 3), dtype=int)
         arr_edges[:, :2] = edge_list
         arr_edges[:, 2] = np.arange(initial_edges, initial_edges + num_added)
-        if not self._directed:
-            recip_edges = edge_list[:, ::-1]
-            # slow but works
-            unique = ~(recip_edges[..., np.newaxis]
-                      == edge_list[..., np.newaxis].T).all(1).any(1)
-            edge_list = np.concatenate((edge_list, recip_edges[unique]))
-            for key, val in attributes.items():
-                attributes[key] = np.concatenate((val, val[unique]))
         # create the edges with an eid attribute
         super(_NxGraph, self).add_weighted_edges_from(arr_edges, weight="eid")
+        self._append_edges(edge_list, initial_edges)
         # call parent function to set the attributes
         self.attr_new_edges(edge_list, attributes=attributes)
+        self._eattr._extend()
         return edge_list
 
     def clear_all_edges(self):
@@ -428,6 +571,8 @@ class _NxGraph(GraphInterface):
         ebunch = [e for e in self.edges()]
         self.remove_edges_from(ebunch)
         self._eattr.clear()
+        self._edge_arr   = None
+        self._edge_index = None
 
     def set_node_property(self):
         #@todo: do it...
@@ -444,6 +589,8 @@ class _NxGraph(GraphInterface):
     
     def degree_list(self, node_list=None, deg_type="total", use_weights=False):
         weight = 'weight' if use_weights else None
+        if use_weights:
+            self._eattr._sync()
         di_deg = None
         if deg_type == 'total':
             di_deg = self.degree(node_list, weight=weight)
@@ -456,14 +603,20 @@ class _NxGraph(GraphInterface):
     def betweenness_list(self, btype="both", use_weights=False, **kwargs):
         nx = nngt._config["library"]
         di_nbetw, di_ebetw = None, None
-        w = BWEIGHT if use_weights else None
+        w = None
+        if use_weights:
+            # bweight is computed: store it temporarily on the edges
+            w  = BWEIGHT
+            bw = self._eattr[BWEIGHT]
+            for e in self.edges(data="eid"):
+                self[e[0]][e[1]][BWEIGHT] = bw[e[2]]
         if btype in ("both", "node"):
-            di_nbetw = nx.betweenness_centrality(self, weight=BWEIGHT)
+            di_nbetw = nx.betweenness_centrality(self, weight=w)
         if btype in ("both", "edge"):
-            di_ebetw = nx.edge_betweenness_centrality(self, weight=BWEIGHT)
-        else:
-            di_nbetw = nx.betweenness_centrality(self)
-            di_ebetw = nx.edge_betweenness_centrality(self)
+            di_ebetw = nx.edge_betweenness_centrality(self, weight=w)
+        if use_weights:
+            for e in self.edges():
+                del self[e[0]][e[1]][BWEIGHT]
         if btype == "node":
             return np.array(tuple(di_nbetw.values()))
         elif btype == "edge":
@@ -0,0 +1,575 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+#
+# This file is part of the NNGT project to generate and analyze
+# neuronal networks and their activity.
+# Copyright (C) 2015-2017  Tanguy Fardet
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" Export of graphs to shared memory for multiprocessing workers """
+
+from collections import OrderedDict
+from copy import deepcopy
+import logging
+import pickle
+
+import numpy as np
+import scipy.sparse as ssp
+
+from nngt.lib import InvalidArgument
+from nngt.lib.graph_helpers import _graph_from_arrays
+from nngt.lib.logger import _log_message
+from .graph_view import GraphView
+
+
+__all__ = ["MappedGraph", "SharedGraph", "SharedGraphHandle"]
+
+logger = logging.getLogger(__name__)
+
+# alignment of the arrays inside the shared memory block (in bytes)
+_ALIGN = 64
+
+
+def _shared_memory():
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise RuntimeError("Shared memory graphs require Python 3.8 or "
+                           "newer (`multiprocessing.shared_memory`).")
+    return shared_memory
+
+
+class _SharedBlock(np.ndarray):
+
+    '''
+    Bytes of a shared memory block, used as the base of the arrays of a
+    :class:`SharedGraph`: it references the block, which is therefore only
+    closed once the last array using it is deleted.
+    '''
+
+    @classmethod
+    def attach(cls, shm):
+        # created directly on the buffer (not as a view) so that numpy
+        # keeps it as the base of the arrays
+        block = np.ndarray.__new__(cls, shm.size, dtype=np.uint8,
+                                   buffer=shm.buf)
+        block._shm = shm
+        return block
+
+
+# ------ #
+# Handle #
+# ------ #
+
+class SharedGraphHandle(object):
+
+    """
+    Small picklable description of a graph stored in shared memory, returned
+    by :func:`~nngt.Graph.to_shared_memory` and passed to the workers, which
+    call :func:`~nngt.Graph.from_shared_memory` on it.
+
+    The process that created the handle owns the memory block and must
+    release it with :func:`~SharedGraphHandle.unlink` (or use the handle as a
+    context manager) once all workers are done.
+
+    .. versionadded:: 1.0
+    """
+
+    def __init__(self, shm, layout, meta):
+        self._shm    = shm
+        self._name   = shm.name
+        self._layout = layout
+        self._meta   = meta
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+    def __repr__(self):
+        return "<SharedGraphHandle '{}' ({} nodes, {} edges, {} " \
+               "bytes)>".format(self._name, self._meta["nodes"],
+                                self._meta["edges"], self.nbytes)
+
+    @property
+    def name(self):
+        ''' Name of the shared memory block. '''
+        return self._name
+
+    @property
+    def nbytes(self):
+        ''' Size of the arrays stored in the shared memory block. '''
+        return sum(np.dtype(dtype).itemsize*int(np.prod(shape))
+                   for _, shape, dtype in self._layout.values())
+
+    def close(self):
+        ''' Close the access of the owner to the memory block. '''
+        if self._shm is not None:
+            self._shm.close()
+
+    def unlink(self):
+        '''
+        Free the memory block (owner only). The workers keep a valid access
+        until they close their graph.
+        '''
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _graph_arrays(graph, index_dtype=None):
+    '''
+    Arrays (edges, CSR index, attributes, types and positions) and metadata
+    describing `graph`, as used by :class:`SharedGraph`.
+
+    Parameters
+    ----------
+    graph : :class:`~nngt.Graph` or subclass
+        The graph to convert.
+    index_dtype : numpy integer type, optional (default: graph policy)
+        Type of the edges and of the CSR index (int64 is used if the graph
+        is too large for it).
+
+    Returns
+    -------
+    arrays : OrderedDict
+        The arrays, with keys "edges", "indptr", "indices", "csr_eids",
+        "eattr:<name>", "nattr:<name>", "csr_weight", "node_types",
+        "edge_types" and "positions".
+    meta : dict
+        Properties of the graph; non-numeric attribute values are stored in
+        ``meta["objects"]``.
+    '''
+    num_nodes = graph.node_nb()
+    num_edges = graph.edge_nb()
+    idx_dtype = np.dtype(graph._index_dtype if index_dtype is None
+                         else index_dtype)
+    if max(num_nodes, num_edges) >= np.iinfo(idx_dtype).max:
+        idx_dtype = np.dtype(np.int64)
+    arrays = OrderedDict()
+    meta   = {
+        "nodes": num_nodes,
+        "edges": num_edges,
+        "name": graph.name,
+        "type": graph._graph_type,
+        "directed": graph.is_directed(),
+        "weighted": graph.is_weighted(),
+        "index_dtype": graph._index_dtype,
+        "attr_dtype": graph._attr_dtype,
+        "edge_attributes": OrderedDict(),
+        "node_attributes": OrderedDict(),
+        "computed": OrderedDict(),
+        "objects": {},
+    }
+    # edges and CSR index
+    edges = np.asarray(graph.edges_array, dtype=idx_dtype).reshape(-1, 2)
+    indptr, indices, order, meta["canonical"] = _csr_index(
+        edges, num_nodes, idx_dtype)
+    arrays["edges"]    = edges
+    arrays["indptr"]   = indptr
+    arrays["indices"]  = indices
+    arrays["csr_eids"] = order
+    # attributes (non-numeric values are pickled with the handle)
+    eattr = graph.edges_attributes
+    for name in eattr._stored_keys():
+        meta["edge_attributes"][name] = eattr.value_type(name)
+        values = np.asarray(graph.get_edge_attributes(name=name))
+        if values.dtype.kind in "biuf":
+            arrays["eattr:" + name] = values
+        else:
+            meta["objects"][("edge", name)] = list(values)
+    for name in graph.nodes_attributes:
+        meta["node_attributes"][name] = graph.get_attribute_type(name, "node")
+        values = np.asarray(graph.get_node_attributes(name=name))
+        if values.dtype.kind in "biuf":
+            arrays["nattr:" + name] = values
+        else:
+            meta["objects"][("node", name)] = list(values)
+    for name, (func, _) in eattr._computed.items():
+        try:
+            pickle.dumps(func)
+            meta["computed"][name] = (eattr.value_type(name), func)
+        except Exception:
+            _log_message(logger, "WARNING",
+                         "Computed attribute '{}' cannot be shared because "
+                         "its function cannot be pickled.".format(name))
+    if graph.is_weighted():
+        arrays["csr_weight"] = arrays["eattr:weight"][order]
+    arrays["node_types"] = graph._get_node_types().astype(np.int8)
+    arrays["edge_types"] = np.sign(graph.get_edge_types()).astype(np.int8)
+    if graph.is_spatial():
+        arrays["positions"] = np.asarray(graph.get_positions(), dtype=float)
+    return arrays, meta
+
+
+def _csr_index(edges, num_nodes, idx_dtype):
+    '''
+    CSR index of an array of `edges` (sorted by source, then target).
+
+    Returns
+    -------
+    indptr, indices : arrays
+        The CSR index.
+    order : array
+        Ids of the edges in CSR order.
+    canonical : bool
+        Whether there are no multiple edges, in which case the CSR index can
+        be used without copy by scipy.
+    '''
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    canonical = not np.any(np.all(np.diff(edges[order], axis=0) == 0, axis=1))
+    indptr = np.concatenate(([0], np.cumsum(
+        np.bincount(edges[:, 0], minlength=num_nodes)))).astype(idx_dtype)
+    return indptr, edges[order, 1], order.astype(idx_dtype), canonical
+
+
+def _to_shared_memory(graph):
+    '''
+    Copy the arrays of `graph` into a shared memory block, see
+    :func:`~nngt.Graph.to_shared_memory`.
+    '''
+    shared_memory = _shared_memory()
+    arrays, meta  = _graph_arrays(graph)
+    # allocate the block and copy the arrays
+    layout, size = OrderedDict(), 0
+    for key, arr in arrays.items():
+        layout[key] = (size, arr.shape, arr.dtype.str)
+        size += arr.nbytes + (-arr.nbytes) % _ALIGN
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for key, arr in arrays.items():
+        offset, shape, dtype = layout[key]
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        view[...] = arr
+    return SharedGraphHandle(shm, layout, meta)
+
+
+# ------------ #
+# Shared graph #
+# ------------ #
+
+class SharedGraph(GraphView):
+
+    """
+    Read-only graph whose arrays are zero-copy views on a shared memory
+    block, obtained through :func:`~nngt.Graph.from_shared_memory`.
+
+    It provides the same methods as :class:`~nngt.core.GraphView` (edges,
+    attributes, degrees, adjacency matrix) and :func:`~SharedGraph.csr`;
+    :func:`~SharedGraph.materialize` returns a normal graph.
+    Call :func:`~SharedGraph.close` (or use the graph as a context manager)
+    once the arrays are no longer used.
+
+    .. versionadded:: 1.0
+    """
+
+    def __init__(self, handle):
+        '''
+        Attach to the shared memory block described by `handle`.
+
+        Parameters
+        ----------
+        handle : :class:`~nngt.core.SharedGraphHandle`
+            Handle returned by :func:`~nngt.Graph.to_shared_memory`.
+        '''
+        if not isinstance(handle, SharedGraphHandle):
+            raise InvalidArgument("`handle` must be a SharedGraphHandle.")
+        shared_memory = _shared_memory()
+        # the arrays keep the block open through their base
+        self._shm = _SharedBlock.attach(
+            shared_memory.SharedMemory(name=handle.name))
+        arrays    = {}
+        for key, (offset, shape, dtype) in handle._layout.items():
+            arrays[key] = np.ndarray(shape, dtype=dtype, buffer=self._shm,
+                                     offset=offset)
+        self._attach(arrays, handle._meta)
+
+    def _attach(self, arrays, meta):
+        ''' Use `arrays` (made read-only) and `meta` as graph data. '''
+        for arr in arrays.values():
+            arr.flags.writeable = False
+        self._arrays   = arrays
+        self._meta     = meta
+        self._parent   = None
+        self._edges    = self._arrays["edges"]
+        self._pos      = self._arrays.get("positions", None)
+        self._node_ids = np.arange(self._meta["nodes"])
+        self._edge_ids = np.arange(self._meta["edges"])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "<SharedGraph '{}' with {} nodes and {} edges at 0x{}>".format(
+            self.name, self.node_nb(), self.edge_nb(), id(self))
+
+    def close(self):
+        '''
+        Release the access of the graph to the shared memory block. The
+        arrays obtained from the graph remain valid: the block is closed
+        once they are all deleted.
+        '''
+        self._arrays, self._edges, self._pos = {}, None, None
+        self._shm = None
+
+    # ---------- #
+    # Properties #
+    # ---------- #
+
+    @property
+    def name(self):
+        ''' Name of the shared graph. '''
+        return self._meta["name"]
+
+    @property
+    def edges_attributes(self):
+        ''' Names of the edge attributes. '''
+        return (list(self._meta["edge_attributes"])
+                + list(self._meta["computed"]))
+
+    @property
+    def nodes_attributes(self):
+        ''' Names of the node attributes. '''
+        return list(self._meta["node_attributes"])
+
+    def csr(self, weights=True):
+        '''
+        Adjacency matrix as a :class:`scipy.sparse.csr_matrix` sharing the
+        index arrays of the memory block (and the weights if `weights` is
+        True).
+        '''
+        num_nodes = self.node_nb()
+        if weights and self.is_weighted():
+            data = self._arrays["csr_weight"]
+        else:
+            data = np.ones(self.edge_nb())
+        canonical = self._meta["canonical"]
+        mat = ssp.csr_matrix(
+            (data, self._arrays["indices"], self._arrays["indptr"]),
+            shape=(num_nodes, num_nodes), copy=not canonical)
+        mat.has_canonical_format = canonical
+        return mat
+
+    # ------- #
+    # Getters #
+    # ------- #
+
+    def node_nb(self):
+        ''' Number of nodes. '''
+        return self._meta["nodes"]
+
+    def edge_nb(self):
+        ''' Number of edges. '''
+        return self._meta["edges"]
+
+    def is_directed(self):
+        ''' Whether the graph is directed or not '''
+        return self._meta["directed"]
+
+    def is_weighted(self):
+        ''' Whether the edges have weights '''
+        return self._meta["weighted"]
+
+    def is_spatial(self):
+        ''' Whether the graph has positions. '''
+        return "positions" in self._arrays
+
+    def get_edge_attributes(self, edges=None, name=None):
+        '''
+        Attributes of the edges.
+
+        Parameters
+        ----------
+        edges : slice or array of ints, optional (default: all edges)
+            Ids of the edges whose attributes should be returned.
+        name : str, optional (default: ``None``)
+            Name of the desired attribute.
+
+        Returns
+        -------
+        A dict containing all the attributes if `name` is ``None``, otherwise
+        the values of attribute `name`.
+        '''
+        if name is None:
+            return {k: self.get_edge_attributes(edges, k)
+                    for k in self.edges_attributes}
+        if name in self._meta["computed"]:
+            values = np.asarray(self._meta["computed"][name][1](self, None))
+        elif "eattr:" + name in self._arrays:
+            values = self._arrays["eattr:" + name]
+        elif ("edge", name) in self._meta["objects"]:
+            values = np.array(self._meta["objects"][("edge", name)],
+                              dtype=object)
+        else:
+            raise InvalidArgument("Unknown edge attribute '{}'.".format(name))
+        return values if edges is None else values[edges]
+
+    def get_node_attributes(self, nodes=None, name=None):
+        '''
+        Attributes of the nodes.
+
+        Parameters
+        ----------
+        nodes : slice or array of ints, optional (default: all nodes)
+            Nodes whose attributes should be returned.
+        name : str, optional (default: ``None``)
+            Name of the desired attribute.
+        '''
+        if name is None:
+            return {k: self.get_node_attributes(nodes, k)
+                    for k in self.nodes_attributes}
+        if "nattr:" + name in self._arrays:
+            values = self._arrays["nattr:" + name]
+        elif ("node", name) in self._meta["objects"]:
+            values = np.array(self._meta["objects"][("node", name)],
+                              dtype=object)
+        else:
+            raise InvalidArgument("Unknown node attribute '{}'.".format(name))
+        return values if nodes is None else values[nodes]
+
+    def get_edge_types(self):
+        ''' Types of the edges (1 or -1). '''
+        return self._arrays["edge_types"]
+
+    def _get_node_types(self):
+        return self._arrays["node_types"]
+
+    def get_positions(self, neurons=None):
+        ''' Positions of the nodes (spatial graphs only). '''
+        if not self.is_spatial():
+            raise InvalidArgument("The graph has no positions.")
+        if neurons is not None:
+            return self._pos[neurons]
+        return self._pos
+
+    def adjacency_matrix(self, types=True, weights=True):
+        '''
+        Adjacency matrix of the graph, see
+        :func:`~nngt.core.GraphView.adjacency_matrix`.
+        '''
+        if weights in (True, False, "weight") and not types:
+            return self.csr(weights=bool(weights))
+        return super(SharedGraph, self).adjacency_matrix(types, weights)
+
+    def materialize(self, name=None):
+        '''
+        Create a normal graph from the shared arrays (copy).
+        '''
+        meta = self._meta
+        data = {
+            "nodes": meta["nodes"],
+            "name": self.name if name is None else name,
+            "type": meta["type"],
+            "directed": meta["directed"],
+            "weighted": meta["weighted"],
+            "index_dtype": meta["index_dtype"],
+            "attr_dtype": meta["attr_dtype"],
+            "edges": np.array(self._edges),
+            "edge_attributes": {
+                k: (vtype, np.array(self.get_edge_attributes(name=k)))
+                for k, vtype in meta["edge_attributes"].items()},
+            "node_attributes": {
+                k: (vtype, np.array(self.get_node_attributes(name=k)))
+                for k, vtype in meta["node_attributes"].items()},
+        }
+        node_types = self._get_node_types()
+        if meta.get("population", None) is not None:
+            data["population"] = deepcopy(meta["population"])
+        elif "type" not in data["node_attributes"] and np.any(node_types < 0):
+            # keep the types of the neurons (population is not shared)
+            data["node_attributes"]["type"] = ("int", np.array(node_types))
+        if self.is_spatial():
+            data["positions"] = np.array(self._pos)
+        if meta.get("shape", None) is not None:
+            data["shape"] = deepcopy(meta["shape"])
+        graph = _graph_from_arrays(data)
+        for k, (vtype, func) in meta["computed"].items():
+            if k not in graph.edges_attributes:
+                graph.new_computed_edge_attribute(k, vtype, func)
+        return graph
+
+
+# ------------ #
+# Mapped graph #
+# ------------ #
+
+class MappedGraph(SharedGraph):
+
+    """
+    Read-only graph whose arrays are memory-mapped from a file in the binary
+    "nngt" format, obtained through ``nngt.Graph.from_file(filename,
+    mmap=True)``: opening the file only reads its description, the arrays
+    are loaded by the system when they are used.
+
+    It provides the same methods as :class:`~nngt.core.SharedGraph`;
+    :func:`~MappedGraph.materialize` returns a normal graph, with the
+    population and shape stored in the file.
+
+    .. versionadded:: 1.0
+    """
+
+    def __init__(self, filename):
+        '''
+        Map the arrays of `filename`.
+
+        Parameters
+        ----------
+        filename : str
+            Path to a file saved in the "nngt" format.
+        '''
+        from nngt.lib.io_tools import _load_binary
+        self._shm      = None
+        self._filename = filename
+        arrays, meta   = _load_binary(filename, mmap=True)
+        self._attach(arrays, meta)
+
+    def __repr__(self):
+        return "<MappedGraph '{}' with {} nodes and {} edges at 0x{}>".format(
+            self.name, self.node_nb(), self.edge_nb(), id(self))
+
+    @property
+    def filename(self):
+        ''' Path of the mapped file. '''
+        return self._filename
+
+    @property
+    def population(self):
+        ''' Population stored in the file (None if absent). '''
+        from nngt.lib.io_tools import _LazyPopulation
+        pop = self._meta["population"]
+        if isinstance(pop, _LazyPopulation):
+            self._meta["population"] = pop = pop.load()
+        return pop
+
+    @property
+    def shape(self):
+        ''' Shape stored in the file (None if absent). '''
+        return self._meta["shape"]
+
+    def close(self):
+        '''
+        Release the mapped arrays (the file is unmapped once all the arrays
+        obtained from the graph are deleted).
+        '''
+        self._arrays, self._edges, self._pos = {}, None, None
@@ -4,14 +4,16 @@
 """ Store results into a database """
 
 from collections import namedtuple
+import zlib
 
 from peewee import *
 from playhouse.csv_loader import load_csv, dump_csv
-from playhouse.fields import PickledField, CompressedField
+from playhouse.fields import PickledField
 from playhouse.migrate import *
 from playhouse.db_url import connect
 
 from nngt import config
+from nngt.lib.io_tools import _compress, _decompress
 
 
 __all__ = [
@@ -44,9 +46,44 @@ main_db = connect(config['db_url'], fields={'longblob': 'longblob'}) #: Object r
 #------------------------
 #
 
-class LongCompressedField(CompressedField):
+class LongCompressedField(BlobField):
+    '''
+    Field storing a string compressed with the codecs used by
+    :func:`~nngt.Graph.to_file` ("bz2" by default, "gzip", or "xz"); the
+    codec is detected when the value is read.
+    Values written by the former zlib-based field are also read.
+
+    The `compression` and `compression_level` arguments must be passed as
+    keywords; the positional arguments are those of the peewee fields.
+    '''
     db_field = 'longblob'
 
+    def __init__(self, *args, **kwargs):
+        self.compression = kwargs.pop("compression", "bz2")
+        self.compression_level = kwargs.pop("compression_level", None)
+        super(LongCompressedField, self).__init__(*args, **kwargs)
+
+    def db_value(self, value):
+        if value is not None:
+            if not isinstance(value, bytes):
+                value = str(value).encode("utf-8")
+            value = _compress(value, self.compression,
+                              self.compression_level)
+        return super(LongCompressedField, self).db_value(value)
+
+    def python_value(self, value):
+        value = super(LongCompressedField, self).python_value(value)
+        if value is not None:
+            value = bytes(value)
+            if value.startswith(b"\x78"):
+                # zlib stream written by peewee's CompressedField
+                try:
+                    value = zlib.decompress(value)
+                except zlib.error:
+                    pass
+            return _decompress(value).decode("utf-8")
+        return value
+
     
 class BaseModel(Model):
     class Meta:
@@ -29,10 +29,14 @@ from .graph_connectivity import *
 __all__ = [
     'connect_neural_groups',
     'connect_neural_types',
+    'connect_pathways',
 	'distance_rule',
 	'erdos_renyi',
     'fixed_degree',
     'gaussian_degree',
+    'generate_edge_chunks',
+    'generate_ensemble',
+    'generate_to_file',
 	'random_scale_free',
 	'price_scale_free',
 	'newman_watts'
@@ -55,14 +55,16 @@ EPS = 0.00001
 # ---------------------- #
 
 def _all_to_all(source_ids, target_ids, directed=True, multigraph=False,
-                distance=None, **kwargs):
+                distance=None, index_dtype=int, **kwargs):
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_sources, num_targets = len(source_ids), len(target_ids)
     # find common nodes
     edges  = None
     common = set(source_ids).intersection(target_ids)
     if common:
         num_edges     = num_sources*num_targets - len(common)
-        edges         = np.empty((num_edges, 2))
+        edges         = np.empty((num_edges, 2), dtype=index_dtype)
         current_edges = 0
         next_enum     = 0
         for s in source_ids:
@@ -79,7 +81,8 @@ def _all_to_all(source_ids, target_ids, directed=True, multigraph=False,
                 edges[current_edges:next_enum, 1] = target_ids
                 current_edges = next_enum
     else:
-        edges       = np.empty((num_sources*num_targets, 2))
+        edges       = np.empty((num_sources*num_targets, 2),
+                               dtype=index_dtype)
         edges[:, 0] = np.repeat(source_ids, num_targets)
         edges[:, 1] = np.tile(target_ids, num_sources)
 
@@ -95,12 +98,12 @@ def _all_to_all(source_ids, target_ids, directed=True, multigraph=False,
 
 def _fixed_degree(source_ids, target_ids, degree=-1, degree_type="in",
                   reciprocity=-1, directed=True, multigraph=False,
-                  existing_edges=None, **kwargs):
+                  existing_edges=None, index_dtype=int, **kwargs):
     degree = int(degree)
     assert degree >= 0, "A positive value is required for `degree`."
 
-    source_ids = np.array(source_ids).astype(int)
-    target_ids = np.array(target_ids).astype(int)
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_source, num_target = len(source_ids), len(target_ids)
     # type of degree
     b_out = (degree_type == "out")
@@ -111,20 +114,23 @@ def _fixed_degree(source_ids, target_ids, degree=-1, degree_type="in",
         source_ids, target_ids, edges, directed, multigraph)
     
     existing = 0 if existing_edges is None else existing_edges.shape[0]
-    ia_edges = np.zeros((existing+edges, 2), dtype=int)
+    ia_edges = np.zeros((existing+edges, 2), dtype=index_dtype)
     if existing:
         ia_edges[:existing,:] = existing_edges
     idx = 0 if b_out else 1 # differenciate source / target
+    # the degree is set for the sources if `degree_type` is "out", for the
+    # targets otherwise
     variables  = target_ids if b_out else source_ids  # nodes picked randomly
+    fixed      = source_ids if b_out else target_ids  # nodes with set degree
     
-    for i,v in enumerate(target_ids):
+    for i,v in enumerate(fixed):
         edges_i, ecurrent, variables_i = np.zeros((degree,2)), 0, []
         if existing_edges is not None:
             with_v = np.where(ia_edge[:,idx] == v)
             variables_i.extend(ia_edge[with_v:int(not idx)])
             ecurrent = len(variables_i)
         ia_edges[i*degree:(i+1)*degree, idx] = v
-        rm = np.argwhere(variables == v)[0]
+        rm = np.where(variables == v)[0]
         rm = rm[0] if len(rm) else -1
         var_tmp = ( np.array(variables, copy=True) if rm == -1 else
                     np.concatenate((variables[:rm], variables[rm+1:])) )
@@ -141,7 +147,7 @@ def _fixed_degree(source_ids, target_ids, degree=-1, degree_type="in",
 
 def _gaussian_degree(source_ids, target_ids, avg=-1, std=-1, degree_type="in",
                      reciprocity=-1, directed=True, multigraph=False,
-                     existing_edges=None, **kwargs):
+                     existing_edges=None, index_dtype=int, **kwargs):
     ''' Connect nodes with a Gaussian distribution '''
     # switch values to float
     avg = float(avg)
@@ -149,8 +155,8 @@ def _gaussian_degree(source_ids, target_ids, avg=-1, std=-1, degree_type="in",
     assert avg >= 0, "A positive value is required for `avg`."
     assert std >= 0, "A positive value is required for `std`."
 
-    source_ids = np.array(source_ids).astype(int)
-    target_ids = np.array(target_ids).astype(int)
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_source, num_target = len(source_ids), len(target_ids)
     # type of degree
     b_out = (degree_type == "out")
@@ -164,20 +170,23 @@ def _gaussian_degree(source_ids, target_ids, avg=-1, std=-1, degree_type="in",
         source_ids, target_ids, edges, directed, multigraph)
     
     num_etotal = 0 if existing_edges is None else existing_edges.shape[0]
-    ia_edges = np.zeros((num_etotal+edges, 2), dtype=int)
+    ia_edges = np.zeros((num_etotal+edges, 2), dtype=index_dtype)
     if num_etotal:
         ia_edges[:num_etotal,:] = existing_edges
     idx = 0 if b_out else 1 # differenciate source / target
+    # the degree is set for the sources if `degree_type` is "out", for the
+    # targets otherwise
     variables = target_ids if b_out else source_ids  # nodes picked randomly
+    fixed     = source_ids if b_out else target_ids  # nodes with set degree
     
-    for i,v in enumerate(target_ids):
+    for i,v in enumerate(fixed):
         degree_i = lst_deg[i]
         edges_i, ecurrent, variables_i = np.zeros((degree_i,2)), 0, []
         if existing_edges is not None:
             with_v = np.where(ia_edge[:,idx] == v)
             variables_i.extend(ia_edge[with_v:int(not idx)])
             ecurrent = len(variables_i)
-        rm = np.argwhere(variables == v)[0]
+        rm = np.where(variables == v)[0]
         rm = rm[0] if len(rm) else -1
         var_tmp = ( np.array(variables, copy=True) if rm == -1 else
                     np.concatenate((variables[:rm], variables[rm+1:])) )
@@ -196,17 +205,18 @@ def _gaussian_degree(source_ids, target_ids, avg=-1, std=-1, degree_type="in",
 
 def _random_scale_free(source_ids, target_ids, in_exp=-1, out_exp=-1,
                        density=-1, edges=-1, avg_deg=-1, reciprocity=-1,
-                       directed=True, multigraph=False, **kwargs):
+                       directed=True, multigraph=False, index_dtype=int,
+                       **kwargs):
     ''' Connect the nodes with power law distributions '''
-    source_ids = np.array(source_ids).astype(int)
-    target_ids = np.array(target_ids).astype(int)
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_source, num_target = len(source_ids), len(target_ids)
     edges, pre_recip_edges = _compute_connections(num_source, num_target,
                                 density, edges, avg_deg, directed, reciprocity)
     b_one_pop = _check_num_edges(
         source_ids, target_ids, edges, directed, multigraph)
     
-    ia_edges = np.zeros((edges,2),dtype=int)
+    ia_edges = np.zeros((edges,2),dtype=index_dtype)
     num_ecurrent, num_test = 0, 0
     edges_hash = {}
 
@@ -261,14 +271,15 @@ def _random_scale_free(source_ids, target_ids, in_exp=-1, out_exp=-1,
     
 
 def _erdos_renyi(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
-                 reciprocity=-1, directed=True, multigraph=False, **kwargs):
+                 reciprocity=-1, directed=True, multigraph=False,
+                 index_dtype=int, **kwargs):
     '''
     Returns a numpy array of dimension (2,edges) that describes the edge list
     of an Erdos-Renyi graph.
     @todo: perform all the calculations here
     '''
-    source_ids = np.array(source_ids).astype(int)
-    target_ids = np.array(target_ids).astype(int)
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_source, num_target = len(source_ids), len(target_ids)
     edges, pre_recip_edges = _compute_connections(num_source, num_target,
                                 density, edges, avg_deg, directed, reciprocity)
@@ -276,7 +287,7 @@ def _erdos_renyi(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
     b_one_pop = _check_num_edges(
         source_ids, target_ids, edges, directed, multigraph)
     
-    ia_edges = np.zeros((edges,2), dtype=int)
+    ia_edges = np.zeros((edges,2), dtype=index_dtype)
     num_test, num_ecurrent = 0, 0 # number of tests and current number of edges
     edges_hash = {}
     
@@ -322,17 +333,18 @@ def _circular_graph(node_ids, coord_nb):
     ia_targets = np.tile(ia_base, nodes)+ia_sources
     ia_targets[ia_targets<-0.5] += nodes
     ia_targets[ia_targets>nodes-0.5] -= nodes
-    return np.array([node_ids[ia_sources], node_ids[ia_targets]]).astype(int).T
+    return np.array([node_ids[ia_sources], node_ids[ia_targets]]).T
 
 
 def _newman_watts(source_ids, target_ids, coord_nb=-1, proba_shortcut=-1,
-                  directed=True, multigraph=False, **kwargs):
+                  directed=True, multigraph=False, index_dtype=int,
+                  **kwargs):
     '''
     Returns a numpy array of dimension (num_edges,2) that describes the edge 
     list of a Newmaan-Watts graph.
     '''
-    node_ids = np.array(source_ids, dtype=int)
-    target_ids = np.array(target_ids, dtype=int)
+    node_ids = np.array(source_ids, dtype=index_dtype)
+    target_ids = np.array(target_ids, dtype=index_dtype)
     nodes = len(node_ids)
     circular_edges = nodes*coord_nb
     num_edges = int(circular_edges*(1+proba_shortcut))
@@ -345,7 +357,7 @@ def _newman_watts(source_ids, target_ids, coord_nb=-1, proba_shortcut=-1,
         raise InvalidArgument("This graph model can only be used if source "
                               "and target populations are the same.")
     # generate the initial circular graph
-    ia_edges = np.zeros((num_edges,2),dtype=int)
+    ia_edges = np.zeros((num_edges,2),dtype=index_dtype)
     ia_edges[:circular_edges,:] = _circular_graph(node_ids, coord_nb)
     # add the random connections
     num_test, num_ecurrent = 0, circular_edges
@@ -364,15 +376,15 @@ def _newman_watts(source_ids, target_ids, coord_nb=-1, proba_shortcut=-1,
 def _distance_rule(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
                    scale=-1, rule="exp", max_proba=-1, shape=None,
                    positions=None, directed=True, multigraph=False,
-                   distance=None, **kwargs):
+                   distance=None, index_dtype=int, **kwargs):
     '''
     Returns a distance-rule graph
     '''
     distance = [] if distance is None else distance
     edges_hash = {}
     # compute the required values
-    source_ids = np.array(source_ids).astype(int)
-    target_ids = np.array(target_ids).astype(int)
+    source_ids = np.asarray(source_ids, dtype=index_dtype)
+    target_ids = np.asarray(target_ids, dtype=index_dtype)
     num_source, num_target = len(source_ids), len(target_ids)
     num_edges = 0
     if max_proba <= 0:
@@ -417,7 +429,7 @@ def _distance_rule(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
     num_ecurrent = 0
 
     if max_proba <= 0:
-        ia_edges = np.zeros((num_edges, 2), dtype=int)
+        ia_edges = np.zeros((num_edges, 2), dtype=index_dtype)
         while num_ecurrent < num_edges:
             trials = []
             for tgt_list in list_targets:
@@ -436,8 +448,8 @@ def _distance_rule(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
                     t = np.random.randint(0, len(tgts), num_try)
                     local_targets.extend(tgts[t])
                     local_sources.extend((s for _ in range(num_try)))
-            local_targets = np.array(local_targets, dtype=int)
-            local_sources = np.array(local_sources, dtype=int)
+            local_targets = np.array(local_targets, dtype=index_dtype)
+            local_sources = np.array(local_sources, dtype=index_dtype)
             test = dist_rule(rule, scale, positions[:, local_sources],
                              positions[:, local_targets], dist=dist_tmp)
             test = np.greater(test, np.random.uniform(size=len(test)))
@@ -468,7 +480,7 @@ def _distance_rule(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
     else:
         sources, targets = [], []
         for i, s in enumerate(source_ids):
-            local_tgts = np.array(list_targets[i], dtype=int)
+            local_tgts = np.array(list_targets[i], dtype=index_dtype)
             if len(local_tgts):
                 dist_tmp = []
                 test = max_proba_dist_rule(
@@ -479,7 +491,7 @@ def _distance_rule(source_ids, target_ids, density=-1, edges=-1, avg_deg=-1,
                 sources.extend((s for _ in range(added)))
                 targets.extend(local_tgts[test])
                 distance.extend(np.array(dist_tmp)[test])
-        ia_edges = np.array([sources, targets]).T
+        ia_edges = np.array([sources, targets], dtype=index_dtype).T
 
     return ia_edges
 
@@ -24,18 +24,26 @@
 
 from copy import deepcopy
 import logging
+import struct
 
 import numpy as np
 
 import nngt
 from nngt.geometry.geom_utils import conversion_magnitude
-from nngt.lib.connect_tools import _set_options
+from nngt.lib import InvalidArgument
+from nngt.lib.cache_tools import (_cache_enabled, _cache_key,
+                                  _load_from_cache, _save_to_cache)
+from nngt.lib.connect_tools import _no_self_loops, _set_options, _unique_rows
+from nngt.lib.graph_helpers import (_check_index_dtype, _edge_prop,
+                                    _graph_from_arrays, _graph_to_arrays)
 from nngt.lib.logger import _log_message
+from nngt.lib.rng_tools import _eprop_distribution
 from nngt.lib.test_functions import mpi_checker, mpi_random
 
 # do default import
 
 from .connect_algorithms import *
+from .connect_algorithms import MAXTESTS
 
 # try to import multithreaded or mpi algorithms
 
@@ -79,10 +87,14 @@ __all__ = [
     'connect_neural_groups',
     'connect_neural_types',
     'connect_nodes',
+    'connect_pathways',
 	'distance_rule',
 	'erdos_renyi',
     'fixed_degree',
     'gaussian_degree',
+    'generate_edge_chunks',
+    'generate_ensemble',
+    'generate_to_file',
 	'newman_watts',
 	'random_scale_free',
 	'price_scale_free',
@@ -141,7 +153,8 @@ def all_to_all(nodes=0, weighted=True, directed=True, multigraph=False,
     # add edges
     if nodes > 1:
         ids = np.arange(nodes, dtype=np.uint)
-        edges = _all_to_all(ids, ids, directed, multigraph)
+        ia_edges = _all_to_all(ids, ids, directed, multigraph,
+                               index_dtype=graph_all._index_dtype)
         graph_all.new_edges(ia_edges)
     graph_all._graph_type = "all_to_all"
     return graph_all
@@ -216,7 +229,8 @@ def fixed_degree(degree, degree_type='in', nodes=0, reciprocity=-1.,
     if nodes > 1:
         ids = np.arange(nodes, dtype=np.uint)
         ia_edges = _fixed_degree(ids, ids, degree, degree_type, reciprocity,
-                                 directed, multigraph)
+                                 directed, multigraph,
+                                 index_dtype=graph_fd._index_dtype)
         graph_fd.new_edges(ia_edges)
     graph_fd._graph_type = "fixed_{}_degree".format(degree_type)
     return graph_fd
@@ -292,7 +306,8 @@ def gaussian_degree(avg, std, degree_type='in', nodes=0, reciprocity=-1.,
     if nodes > 1:
         ids = np.arange(nodes, dtype=np.uint)
         ia_edges = _gaussian_degree(ids, ids, avg, std, degree_type,
-                                    reciprocity, directed, multigraph)
+                                    reciprocity, directed, multigraph,
+                                    index_dtype=graph_gd._index_dtype)
         # check for None if MPI
         if ia_edges is not None:
             graph_gd.new_edges(ia_edges)
@@ -373,7 +388,8 @@ def erdos_renyi(density=-1., nodes=0, edges=-1, avg_deg=-1., reciprocity=-1.,
     if nodes > 1:
         ids = range(nodes)
         ia_edges = _erdos_renyi(ids, ids, density, edges, avg_deg, reciprocity,
-                                directed, multigraph)
+                                directed, multigraph,
+                                index_dtype=graph_er._index_dtype)
         graph_er.new_edges(ia_edges)
     graph_er._graph_type = "erdos_renyi"
     return graph_er
@@ -456,7 +472,8 @@ def random_scale_free(in_exp, out_exp, nodes=0, density=-1, edges=-1,
     if nodes > 1:
         ids = range(nodes)
         ia_edges = _random_scale_free(ids, ids, in_exp, out_exp, density,
-                          edges, avg_deg, reciprocity, directed, multigraph)
+                          edges, avg_deg, reciprocity, directed, multigraph,
+                          index_dtype=graph_rsf._index_dtype)
         graph_rsf.new_edges(ia_edges)
     graph_rsf._graph_type = "random_scale_free"
     return graph_rsf
@@ -596,7 +613,8 @@ def newman_watts(coord_nb, proba_shortcut, nodes=0, weighted=True,
     if nodes > 1:
         ids = range(nodes)
         ia_edges = _newman_watts(ids, ids, coord_nb, proba_shortcut, directed,
-                                 multigraph)
+                                 multigraph,
+                                 index_dtype=graph_nw._index_dtype)
         graph_nw.new_edges(ia_edges)
     graph_nw._graph_type = "newman_watts"
     return graph_nw
@@ -695,6 +713,7 @@ def distance_rule(scale, rule="exp", shape=None, neuron_density=1000.,
         positions = np.multiply(conversion_factor, positions, dtype=np.float32)
     if nodes > 1:
         ids = np.arange(0, nodes, dtype=np.uint)
+        kwargs["index_dtype"] = graph_dr._index_dtype
         ia_edges = _distance_rule(
             ids, ids, density, edges, avg_deg, scale, rule, max_proba, shape,
             positions, directed, multigraph, distance=distance, **kwargs)
@@ -745,9 +764,276 @@ def generate(di_instructions, **kwargs):
     graph_type = di_instructions["graph_type"]
     instructions = deepcopy(di_instructions)
     instructions.update(kwargs)
+    if _cache_enabled():
+        key  = _cache_key("generate", instructions)
+        data = _load_from_cache(key)
+        if data is not None:
+            return _graph_from_arrays(data)
+        graph = _di_generator[graph_type](**instructions)
+        _save_to_cache(key, _graph_to_arrays(graph))
+        return graph
     return _di_generator[graph_type](**instructions)
 
 
+def generate_ensemble(instructions_list, n_jobs=1, reduce=None,
+                      return_arrays=False, **kwargs):
+    '''
+    Generate an ensemble of graphs (e.g. replicates or parameter scans) from
+    a list of instructions, using several processes.
+
+    Each task is seeded with its own seed, derived from the master seed
+    (``nngt.get_config("msd")``), so that the ensemble is reproducible and
+    does not depend on `n_jobs`.
+    Graphs are sent back from the workers as compact arrays (int32 edges and
+    attribute arrays) and not as pickled :class:`~nngt.Graph` objects.
+
+    .. versionadded:: 1.0
+
+    Parameters
+    ----------
+    instructions_list : list of dicts
+        Instructions for each graph (see :func:`~nngt.generate`).
+    n_jobs : int, optional (default: 1)
+        Number of processes used to generate the graphs. If 1, the graphs are
+        generated in the current process.
+    reduce : function, optional (default: None)
+        Function taking a graph as argument and returning summary statistics,
+        called inside the workers; only the results are sent back, so full
+        graphs are never transferred. Must be picklable (i.e. defined at the
+        top level of a module).
+    return_arrays : bool, optional (default: False)
+        Return the compact representation of the graphs (dicts containing the
+        ``"edges"`` array and attributes) instead of building the graphs.
+    kwargs : keyword arguments
+        Additional arguments passed to all generators.
+
+    Returns
+    -------
+    ensemble : list
+        List of :class:`~nngt.Graph` (or of `reduce` results, or of dicts if
+        `return_arrays` is True), in the same order as `instructions_list`.
+
+    Example
+    -------
+    ::
+
+        instructions = [
+            {"graph_type": "erdos_renyi", "nodes": 1000, "avg_deg": k}
+            for k in range(10, 110, 10)
+        ]
+        graphs = nngt.generation.generate_ensemble(instructions, n_jobs=4)
+    '''
+    if nngt.get_config("mpi"):
+        raise NotImplementedError("`generate_ensemble` is not available "
+                                  "with MPI.")
+    msd = nngt.get_config("msd")
+    rng = np.random.RandomState(msd)
+    seeds = rng.randint(0, 2**31 - 1, len(instructions_list))
+    tasks = []
+    for instructions, seed in zip(instructions_list, seeds):
+        instructions = deepcopy(instructions)
+        instructions.update(kwargs)
+        tasks.append((instructions, int(seed), reduce))
+
+    if n_jobs == 1:
+        # the workers reseed the generator: restore the main process state
+        rng_state = np.random.get_state()
+        results = [_ensemble_worker(task) for task in tasks]
+        np.random.set_state(rng_state)
+        nngt._config["msd"] = msd
+    else:
+        import multiprocessing as mp
+        pool = mp.Pool(n_jobs)
+        try:
+            results = pool.map(_ensemble_worker, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+    if reduce is not None or return_arrays:
+        return results
+    return [_graph_from_arrays(data) for data in results]
+
+
+def _ensemble_worker(task):
+    ''' Generate a graph, then return its compact form or reduction. '''
+    instructions, seed, reduce = task
+    nngt.seed(msd=seed)
+    graph = generate(instructions)
+    if reduce is not None:
+        return reduce(graph)
+    return _graph_to_arrays(graph)
+
+
+#-----------------------------------------------------------------------------#
+# Out-of-core generation
+#------------------------
+#
+
+_chunk_models = ("all_to_all", "erdos_renyi", "fixed_degree",
+                 "gaussian_degree")
+
+
+def generate_edge_chunks(graph_model, nodes, chunk_size=10000,
+                         dtype=np.int32, multigraph=False, **kwargs):
+    '''
+    Generate the edges of a graph chunk by chunk so that the memory footprint
+    is bounded by the size of the chunks.
+
+    Edges are generated for successive blocks of `chunk_size` target nodes,
+    which is exact for models where the incoming edges of each node are drawn
+    independently of the other nodes.
+
+    .. versionadded:: 1.0
+
+    Parameters
+    ----------
+    graph_model : str
+        Name of the connectivity model, among "all_to_all", "erdos_renyi",
+        "fixed_degree" and "gaussian_degree" (for the two last models, only
+        ``degree_type="in"`` is supported).
+    nodes : int
+        Number of nodes in the graph.
+    chunk_size : int, optional (default: 10000)
+        Number of target nodes processed in each chunk.
+    dtype : numpy integer type, optional (default: int32)
+        Type of the node ids in the chunks.
+    multigraph : bool, optional (default: False)
+        Whether the graph can contain multiple edges between two nodes.
+    **kwargs : model parameters
+        Parameters of the model (e.g. `density`, `edges`, or `avg_deg` for
+        "erdos_renyi"; `degree` for "fixed_degree"...).
+
+    Yields
+    ------
+    edges : :class:`numpy.ndarray` of shape (e, 2)
+        The edges whose targets belong to the current block of nodes.
+
+    See also
+    --------
+    :func:`~nngt.generation.generate_to_file`
+    '''
+    if graph_model not in _chunk_models:
+        raise NotImplementedError(
+            "Chunked generation is only available for the following models: "
+            "{}.".format(", ".join(_chunk_models)))
+    if not kwargs.get("directed", True) or kwargs.get("reciprocity", -1) > 0:
+        raise InvalidArgument("Chunked generation does not support "
+                              "undirected graphs or reciprocity.")
+    if kwargs.get("degree_type", "in") != "in":
+        raise InvalidArgument("Only `degree_type='in'` is supported by "
+                              "chunked generation.")
+    nodes   = int(nodes)
+    _check_index_dtype(nodes, dtype)
+    sources = np.arange(nodes, dtype=np.uint)
+    density = -1.
+    if graph_model == "erdos_renyi":
+        # the total number of edges is spread uniformly over the blocks
+        density = kwargs.get("density", -1.)
+        if kwargs.get("avg_deg", -1.) > 0:
+            density = kwargs["avg_deg"] / float(nodes)
+        elif kwargs.get("edges", -1) > 0:
+            density = kwargs["edges"] / float(nodes*nodes)
+        assert density > 0, "At leat one of the following entries must " +\
+            "be specified: 'density', 'edges', 'avg_deg'."
+    for key in ("density", "edges", "avg_deg", "directed", "reciprocity"):
+        kwargs.pop(key, None)
+
+    for start in range(0, nodes, chunk_size):
+        targets = np.arange(start, min(start + chunk_size, nodes),
+                            dtype=np.uint)
+        if graph_model == "erdos_renyi":
+            elist = _erdos_renyi_block(sources, targets, density, multigraph,
+                                       dtype)
+        else:
+            elist = _di_gen_edges[graph_model](
+                sources, targets, directed=True, multigraph=multigraph,
+                index_dtype=dtype, **kwargs)
+        yield np.asarray(elist).astype(dtype, copy=False)
+
+
+def generate_to_file(filename, graph_model, nodes, chunk_size=10000,
+                     dtype=np.int32, multigraph=False, **kwargs):
+    '''
+    Generate the edges of a graph and store them directly into a ``.npy``
+    file, without keeping the whole edge list in memory.
+
+    The resulting file can be memory-mapped via ``numpy.load(filename,
+    mmap_mode="r")`` or used to build a graph with
+    :func:`~nngt.Graph.from_edge_file`.
+
+    .. versionadded:: 1.0
+
+    Parameters
+    ----------
+    filename : str
+        Path of the file where the edges will be saved (should end with
+        ".npy").
+    graph_model : str
+        Name of the connectivity model (see
+        :func:`~nngt.generation.generate_edge_chunks`).
+    nodes : int
+        Number of nodes in the graph.
+    chunk_size : int, optional (default: 10000)
+        Number of target nodes processed in each chunk.
+    dtype : numpy integer type, optional (default: int32)
+        Type used to store the node ids.
+    multigraph : bool, optional (default: False)
+        Whether the graph can contain multiple edges between two nodes.
+    **kwargs : model parameters
+        Parameters of the model.
+
+    Returns
+    -------
+    num_edges : int
+        Number of edges written to the file.
+    '''
+    num_edges = 0
+    header    = _npy_header((0, 2), dtype)
+    with open(filename, "wb") as f_edges:
+        # reserve the header, its final version is written at the end
+        f_edges.write(header)
+        for elist in generate_edge_chunks(
+                graph_model, nodes, chunk_size=chunk_size, dtype=dtype,
+                multigraph=multigraph, **kwargs):
+            f_edges.write(np.ascontiguousarray(elist).tobytes())
+            num_edges += len(elist)
+        f_edges.seek(0)
+        f_edges.write(_npy_header((num_edges, 2), dtype))
+    return num_edges
+
+
+def _erdos_renyi_block(sources, targets, density, multigraph, dtype=int):
+    '''
+    Erdos-Renyi edges targeting a subset of the nodes, without self-loops.
+    '''
+    num_edges = int(density * len(sources) * len(targets))
+    elist     = np.zeros((0, 2), dtype=dtype)
+    num_test  = 0
+    while len(elist) < num_edges and num_test < MAXTESTS:
+        new_edges = _erdos_renyi(sources, targets, edges=num_edges-len(elist),
+                                 directed=True, multigraph=multigraph,
+                                 index_dtype=dtype)
+        elist = np.concatenate((elist, _no_self_loops(new_edges)))
+        if not multigraph:
+            elist = _unique_rows(elist)
+        num_test += 1
+    return elist
+
+
+def _npy_header(shape, dtype, length=128):
+    '''
+    Fixed-length header for a ``.npy`` file (format version 1.0), which can
+    be overwritten once the final shape is known.
+    '''
+    header = "{{'descr': '{}', 'fortran_order': False, 'shape': {}, }}".format(
+        np.dtype(dtype).str, tuple(int(i) for i in shape))
+    hlen   = length - 10
+    header = header.ljust(hlen - 1) + "\n"
+    return (np.lib.format.magic(1, 0) + struct.pack("<H", hlen) +
+            header.encode("latin1"))
+
+
 #-----------------------------------------------------------------------------#
 # Connecting groups
 #------------------------
@@ -796,14 +1082,32 @@ def connect_nodes(network, sources, targets, graph_model, density=-1.,
     if network.is_spatial() and 'shape' not in kwargs:
         kwargs['shape'] = network.shape
 
+    _check_index_dtype(network.node_nb(), network._index_dtype)
+
     sources  = np.array(sources, dtype=np.uint)
     targets  = np.array(targets, dtype=np.uint)
     distance = []
 
-    elist = _di_gen_edges[graph_model](
-        sources, targets, density=density, edges=edges,
-        avg_deg=avg_deg, weighted=weighted, directed=directed,
-        multigraph=multigraph, distance=distance, **kwargs)
+    cached, key = None, None
+    if _cache_enabled():
+        key = _cache_key(
+            "connect_nodes", sources, targets, graph_model, density=density,
+            edges=edges, avg_deg=avg_deg, weighted=weighted,
+            directed=directed, multigraph=multigraph, **kwargs)
+        cached = _load_from_cache(key)
+
+    if cached is None:
+        elist = _di_gen_edges[graph_model](
+            sources, targets, density=density, edges=edges,
+            avg_deg=avg_deg, weighted=weighted, directed=directed,
+            multigraph=multigraph, distance=distance,
+            index_dtype=network._index_dtype, **kwargs)
+        if key is not None:
+            _save_to_cache(key, (np.asarray(elist), distance))
+    else:
+        elist, distance = cached
+
+    elist = np.asarray(elist, dtype=network._index_dtype).reshape(-1, 2)
 
     # Attributes are not set by subfunctions
     attr = {}
@@ -858,7 +1162,7 @@ def connect_neural_types(network, source_type, target_type, graph_model,
     if network.is_spatial() and 'shape' not in kwargs:
         kwargs['shape'] = network.shape
 
-    for group in iter(network._population.values()):
+    for group in iter(network.population.values()):
         if group.neuron_type == source_type:
             source_ids.extend(group.ids)
         if group.neuron_type == target_type:
@@ -906,25 +1210,19 @@ def connect_neural_groups(network, source_groups, target_groups, graph_model,
     kwargs : keyword arguments
         Specific model parameters. or edge attributes specifiers such as
         `weights` or `delays`.
+
+    See also
+    --------
+    :func:`~nngt.generation.connect_pathways` to connect several groups at
+    once.
     '''
-    elist, source_ids, target_ids = None, [], []
     if network.is_spatial() and 'positions' not in kwargs:
         kwargs['positions'] = network.get_positions().astype(np.float32).T
     if network.is_spatial() and 'shape' not in kwargs:
         kwargs['shape'] = network.shape
 
-    if isinstance(source_groups, str):
-        source_groups = [source_groups]
-    if isinstance(target_groups, str):
-        target_groups = [target_groups]
-    for name, group in network.population.items():
-        if name in source_groups:
-            source_ids.extend(group.ids)
-        if name in target_groups:
-            target_ids.extend(group.ids)
-
-    source_ids = np.array(source_ids, dtype=np.uint)
-    target_ids = np.array(target_ids, dtype=np.uint)
+    source_ids = _get_group_ids(network, source_groups)
+    target_ids = _get_group_ids(network, target_groups)
 
     connect_nodes(network, source_ids, target_ids, graph_model,
                   density=density, edges=edges, avg_deg=avg_deg, unit=unit,
@@ -933,3 +1231,200 @@ def connect_neural_groups(network, source_groups, target_groups, graph_model,
 
     if not network._graph_type.endswith('_neural_group_connect'):
         network._graph_type += "_neural_group_connect"
+
+
+def connect_pathways(network, pathways, unit='um', weighted=True,
+                     directed=True, multigraph=False):
+    '''
+    Function to connect several groups of a network at once from a list of
+    pathways.
+
+    All pathways are first compiled into a single connection plan (group ids,
+    generation parameters and edge attributes), then the edges of each
+    pathway are generated and concatenated so that they can be added to the
+    network with a single call to :func:`~nngt.Graph.new_edges`.
+
+    .. versionadded:: 1.0
+
+    Parameters
+    ----------
+    network : :class:`Network` or :class:`SpatialNetwork`
+        The network to connect.
+    pathways : list of tuples
+        Each pathway is a tuple of the form
+        ``(source_groups, target_groups, graph_model[, params[, weights[,
+        delays]]])``, where `source_groups` and `target_groups` are the names
+        of the groups (str or tuple of str), `graph_model` is the name of the
+        connectivity model, `params` is a dict containing the model-specific
+        parameters (e.g. `density`, `avg_deg`...), and `weights` and `delays`
+        are the edge attributes specifiers (see
+        :func:`~nngt.generation.connect_nodes`).
+    unit : str, optional (default: 'um')
+        Unit of the positions for spatial networks.
+    weighted : bool, optional (default: True)
+        Whether the edges are weighted.
+    directed : bool, optional (default: True)
+        Whether the edges are directed.
+    multigraph : bool, optional (default: False)
+        Whether multiple edges between two nodes are allowed. If False,
+        duplicate edges coming from overlapping pathways are removed (the
+        first occurrence is kept).
+
+    Returns
+    -------
+    elist : :class:`numpy.ndarray` of shape (E, 2)
+        The edges that were added to the network.
+
+    Example
+    -------
+    ::
+
+        pathways = [
+            ("excitatory", "excitatory", "erdos_renyi", {"avg_deg": 80}),
+            ("excitatory", "inhibitory", "erdos_renyi", {"avg_deg": 20},
+             {"distribution": "gaussian", "avg": 1., "std": 0.1}),
+            ("inhibitory", ("excitatory", "inhibitory"), "fixed_degree",
+             {"degree": 20, "degree_type": "out"}, 2., 1.),
+        ]
+        nngt.generation.connect_pathways(net, pathways)
+    '''
+    _check_index_dtype(network.node_nb(), network._index_dtype)
+    plan = _compile_pathways(network, pathways)
+
+    positions, shape = None, None
+    if network.is_spatial():
+        positions = network.get_positions().astype(np.float32).T
+        shape     = network.shape
+
+    elists, distances, weights, delays = [], [], [], []
+    set_weights = np.any([p["weights"] is not None for p in plan])
+    set_delays  = np.any([p["delays"] is not None for p in plan])
+
+    for pathway in plan:
+        kwargs   = pathway["params"].copy()
+        distance = []
+        if positions is not None:
+            kwargs.setdefault('positions', positions)
+            kwargs.setdefault('shape', shape)
+
+        elist = _di_gen_edges[pathway["graph_model"]](
+            pathway["sources"], pathway["targets"], weighted=weighted,
+            directed=directed, multigraph=multigraph, distance=distance,
+            index_dtype=network._index_dtype, **kwargs)
+        elist = np.array(elist, dtype=network._index_dtype).reshape(-1, 2)
+
+        if positions is not None:
+            if len(distance) != len(elist):
+                # model does not compute the distances
+                vectors  = positions[:, elist[:, 1]] - \
+                           positions[:, elist[:, 0]]
+                distance = np.linalg.norm(vectors, axis=0)
+            distances.append(np.asarray(distance, dtype=float))
+
+        if set_weights:
+            weights.append(
+                _pathway_attribute(network, elist, "weight",
+                                   pathway["weights"], distance))
+        if set_delays:
+            delays.append(
+                _pathway_attribute(network, elist, "delay",
+                                   pathway["delays"], distance))
+        elists.append(elist)
+
+    elist = (np.concatenate(elists) if elists
+             else np.zeros((0, 2), dtype=network._index_dtype))
+
+    keep = None
+    if not multigraph and len(elists) > 1:
+        # remove the duplicates between overlapping pathways
+        _, keep = _unique_rows(elist, return_index=True)
+        keep    = np.sort(keep)
+        elist   = elist[keep]
+
+    attr = {}
+    for name, values in (("distance", distances), ("weight", weights),
+                         ("delay", delays)):
+        if values:
+            values = np.concatenate(values)
+            attr[name] = values if keep is None else values[keep]
+
+    network.new_edges(elist, attributes=attr)
+
+    if not network._graph_type.endswith('_pathways_connect'):
+        network._graph_type += "_pathways_connect"
+
+    return elist
+
+
+# ----- #
+# Tools #
+# ----- #
+
+def _get_group_ids(network, groups):
+    ''' Return the ids of the neurons belonging to `groups`. '''
+    if isinstance(groups, str):
+        groups = [groups]
+    ids = [group.ids for name, group in network.population.items()
+           if name in groups]
+    if ids:
+        return np.concatenate(ids).astype(np.uint)
+    return np.array([], dtype=np.uint)
+
+
+def _compile_pathways(network, pathways):
+    '''
+    Convert a list of pathways into a list of dicts containing the source and
+    target ids, as well as the generation parameters and attributes of each
+    pathway.
+    '''
+    plan = []
+    for pathway in pathways:
+        num_items = len(pathway)
+        if num_items < 3 or num_items > 6:
+            raise InvalidArgument(
+                "Pathways must be tuples containing 3 to 6 items: "
+                "(source_groups, target_groups, graph_model[, params[, "
+                "weights[, delays]]]), got {}.".format(pathway))
+        graph_model = pathway[2]
+        if graph_model not in _di_gen_edges:
+            raise InvalidArgument(
+                "Unknown graph model '{}', available models are {}.".format(
+                    graph_model, ", ".join(_di_gen_edges.keys())))
+        params = {} if num_items < 4 or pathway[3] is None else pathway[3]
+        plan.append({
+            "sources": _get_group_ids(network, pathway[0]),
+            "targets": _get_group_ids(network, pathway[1]),
+            "graph_model": graph_model,
+            "params": params,
+            "weights": None if num_items < 5 else pathway[4],
+            "delays": None if num_items < 6 else pathway[5],
+        })
+    return plan
+
+
+def _pathway_attribute(network, elist, attribute, prop, distance):
+    '''
+    Generate the values of an edge attribute for the edges of a pathway.
+
+    Note
+    ----
+    The inhibitory weight factor is not applied here since the values are
+    passed to :func:`~nngt.Graph.new_edges` afterwards.
+    '''
+    if prop is None:
+        default = {"distribution": "constant"}
+        prop    = getattr(network, "_w" if attribute == "weight" else "_d",
+                          default)
+    prop   = _edge_prop(prop)
+    params = {k: v for (k, v) in prop.items() if k != "distribution"}
+    if (prop["distribution"] in ("lin_corr", "log_corr")
+            and params.get("correl_attribute", None) == "distance"
+            and 'distance' not in params and not network.is_spatial()):
+        raise InvalidArgument(
+            "The '{}' distribution of the {}s is correlated to the distance "
+            "between the neurons, which requires a spatial network with "
+            "positions.".format(prop["distribution"], attribute))
+    if prop["distribution"] == "lin_corr" and 'distance' not in params:
+        params['distance'] = np.array(distance, dtype=float)
+    return _eprop_distribution(
+        network, prop["distribution"], elist=elist, **params)
@@ -22,6 +22,7 @@
 Various tools for random number generation, array searching and type testing.
 """
 
+from .cache_tools import clear_cache
 from .constants import *
 from .errors import *
 from .rng_tools import *
@@ -30,6 +31,7 @@ from .test_functions import *
 
 
 __all__ = [
+    "clear_cache",
     "delta_distrib",
     "find_idx_nearest",
     "gaussian_distrib",
@@ -0,0 +1,293 @@
+#!/usr/bin/env python
+#-*- coding:utf-8 -*-
+#
+# This file is part of the NNGT project to generate and analyze
+# neuronal networks and their activity.
+# Copyright (C) 2015-2017  Tanguy Fardet
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+""" On-disk cache for generated graphs """
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import numpy as np
+
+import nngt
+from .logger import _log_message
+
+
+logger = logging.getLogger(__name__)
+
+
+__all__ = ["clear_cache"]
+
+
+# ---------------- #
+# Public functions #
+# ---------------- #
+
+def clear_cache():
+    '''
+    Remove all the entries stored in the generation cache.
+
+    .. versionadded:: 1.0
+
+    See also
+    --------
+    The ``generation_cache``, ``cache_folder`` and ``cache_max_size`` entries
+    of :func:`~nngt.set_config`.
+    '''
+    folder = _cache_folder()
+    if os.path.isdir(folder):
+        for fname in os.listdir(folder):
+            if fname.endswith(".cache"):
+                os.remove(os.path.join(folder, fname))
+
+
+# ----------- #
+# Cache tools #
+# ----------- #
+
+def _cache_enabled():
+    return (nngt.get_config("generation_cache") and
+            not nngt.get_config("mpi"))
+
+
+def _cache_folder():
+    return os.path.expanduser(nngt.get_config("cache_folder"))
+
+
+def _cache_key(*args, **kwargs):
+    '''
+    Compute the hash associated to a set of generation arguments.
+
+    The key also depends on the current state of the random number generator
+    (thus on the seed), on the parallelism options which influence the
+    generation, and on the NNGT version.
+    '''
+    rng_state = np.random.get_state()
+    context = (
+        nngt.__version__,
+        nngt.get_config("multithreading"),
+        nngt.get_config("omp"),
+        nngt.get_config("seeds"),
+        rng_state[0], rng_state[1], rng_state[2:],
+    )
+    sha = hashlib.sha1()
+    sha.update(repr(_normalize((context, args, kwargs))).encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _normalize(obj):
+    ''' Convert `obj` to a hashable and reproducible representation. '''
+    if isinstance(obj, nngt.NeuralPop):
+        # canonical description, independent of the pickle protocol
+        from .io_tools import _population_description
+        return ("NeuralPop", _normalize(_population_description(obj)))
+    elif isinstance(obj, dict):
+        return tuple(sorted((str(k), _normalize(v)) for k, v in obj.items()))
+    elif isinstance(obj, (list, tuple)):
+        return tuple(_normalize(v) for v in obj)
+    elif isinstance(obj, np.ndarray):
+        arr = np.ascontiguousarray(obj)
+        return ("ndarray", arr.dtype.str, arr.shape,
+                hashlib.sha1(arr.tobytes()).hexdigest())
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    elif obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        return obj
+    elif hasattr(obj, "wkt"):  # shapes
+        return (obj.__class__.__name__, obj.wkt)
+    # other objects are hashed through their pickled version
+    return (obj.__class__.__name__,
+            hashlib.sha1(pickle.dumps(obj, protocol=2)).hexdigest())
+
+
+def _load_from_cache(key):
+    '''
+    Load the data associated to `key` and set the random number generator to
+    the state it had after the generation, or return None if the entry does
+    not exist.
+    '''
+    path = os.path.join(_cache_folder(), key + ".cache")
+    if not os.path.isfile(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as entry:
+            arrays = {k: entry[k] for k in entry.files}
+        header    = json.loads(str(arrays.pop("header")))
+        data      = _from_cache_arrays(header, arrays)
+        rng_state = (header["rng"][0], arrays["rng_keys"]) \
+                    + tuple(header["rng"][1:])
+    except Exception as e:
+        _log_message(logger, "WARNING",
+                     "Could not read cache entry {}: {}.".format(key, e))
+        return None
+    # update access time for LRU eviction
+    os.utime(path, None)
+    np.random.set_state(rng_state)
+    _log_message(logger, "DEBUG", "Loaded cache entry " + key + ".")
+    return data
+
+
+def _save_to_cache(key, data):
+    '''
+    Store `data` with the current state of the random number generator, then
+    evict the least recently used entries if the cache exceeds its maximum
+    size.
+
+    Entries are ".npz" archives (read without pickle) containing the arrays
+    and a JSON header; data which cannot be stored that way is not cached.
+    '''
+    try:
+        header, arrays = _to_cache_arrays(data)
+    except (TypeError, ValueError) as e:
+        _log_message(logger, "DEBUG", "Not caching {}: {}.".format(key, e))
+        return
+    rng_state = np.random.get_state()
+    header["rng"]      = [rng_state[0]] + list(rng_state[2:])
+    arrays["rng_keys"] = rng_state[1]
+    arrays["header"]   = np.array(json.dumps(header, default=_json_default))
+    folder = _cache_folder()
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    path = os.path.join(folder, key + ".cache")
+    tmp  = path + ".tmp"
+    with open(tmp, "wb") as fcache:
+        np.savez(fcache, **arrays)
+    os.rename(tmp, path)
+    _evict(folder, 1e6*nngt.get_config("cache_max_size"))
+
+
+def _to_cache_arrays(data):
+    '''
+    Split `data`, either the dict of :func:`~nngt.lib.graph_helpers.\
+_graph_to_arrays` or a tuple of arrays, into a JSON-compatible header and
+    a dict of numeric or string arrays.
+
+    Raises a TypeError or ValueError if some data cannot be stored.
+    '''
+    arrays = {}
+    if not isinstance(data, dict):
+        for i, values in enumerate(data):
+            arrays["item_" + str(i)] = _plain_array(values)
+        return {"kind": "tuple", "size": len(data)}, arrays
+    header = {
+        "kind": "graph",
+        "attributes": {},
+    }
+    for k in ("nodes", "name", "type", "directed", "weighted"):
+        header[k] = data[k]
+    for k in ("index_dtype", "attr_dtype"):
+        header[k] = np.dtype(data[k]).str
+    arrays["edges"] = data["edges"]
+    for kind in ("edge", "node"):
+        header[kind + "_attributes"] = []
+        for i, (name, (value_type, values)) in enumerate(
+                data[kind + "_attributes"].items()):
+            header[kind + "_attributes"].append([name, value_type])
+            arrays[kind + "_" + str(i)] = _plain_array(values)
+    for k in ("weights", "delays", "inh_weight_factor"):
+        if k in data:
+            header["attributes"][k] = data[k]
+    if "shape" in data:
+        from nngt.geometry import _shapely_support
+        if not _shapely_support:
+            raise ValueError("Shapely is required to store the shape")
+        shape = data["shape"]
+        min_x, _, max_x, _ = shape.bounds
+        header["shape"] = {"wkt": shape.wkt, "unit": shape.unit,
+                           "min_x": min_x, "max_x": max_x}
+        arrays["positions"] = np.asarray(data["positions"], dtype=float)
+    if "population" in data:
+        from .io_tools import _population_description
+        desc, ids = _population_description(data["population"])
+        header["population"] = desc
+        for i, gids in enumerate(ids):
+            arrays["population_" + str(i)] = gids
+    # check that the header can be written
+    header = json.loads(json.dumps(header, default=_json_default))
+    return header, arrays
+
+
+def _from_cache_arrays(header, arrays):
+    ''' Rebuild the data stored by :func:`_to_cache_arrays`. '''
+    if header["kind"] == "tuple":
+        return tuple(arrays["item_" + str(i)] for i in range(header["size"]))
+    data = {k: header[k] for k in ("nodes", "name", "type", "directed",
+                                   "weighted")}
+    for k in ("index_dtype", "attr_dtype"):
+        data[k] = np.dtype(header[k])
+    data["edges"] = arrays["edges"]
+    for kind in ("edge", "node"):
+        data[kind + "_attributes"] = {
+            name: (value_type, arrays[kind + "_" + str(i)])
+            for i, (name, value_type) in enumerate(
+                header[kind + "_attributes"])
+        }
+    data.update(header["attributes"])
+    if "shape" in header:
+        from nngt.geometry import Shape
+        shape = header["shape"]
+        data["shape"] = Shape.from_wtk(
+            shape["wkt"], min_x=shape["min_x"], max_x=shape["max_x"],
+            unit=shape["unit"])
+        data["positions"] = arrays["positions"]
+    if "population" in header:
+        from .io_tools import _population_from_description
+        desc = header["population"]
+        ids  = [arrays["population_" + str(i)]
+                for i in range(len(desc["groups"]))]
+        data["population"] = _population_from_description(desc, ids)
+    return data
+
+
+def _plain_array(values):
+    ''' Numeric or string array, which can be saved without pickle. '''
+    values = np.asarray(values)
+    if values.dtype.kind == "O":
+        if all(isinstance(v, str) for v in values.flat):
+            return values.astype(str)
+        raise TypeError("arrays of objects cannot be cached")
+    return values
+
+
+def _json_default(obj):
+    ''' Convert numpy objects for :func:`json.dumps`. '''
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    elif isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError("{} cannot be cached".format(type(obj).__name__))
+
+
+def _evict(folder, max_size):
+    ''' Remove the oldest entries until the cache is smaller than max_size '''
+    entries = []
+    for fname in os.listdir(folder):
+        if fname.endswith(".cache"):
+            stat = os.stat(os.path.join(folder, fname))
+            entries.append((stat.st_mtime, stat.st_size, fname))
+    entries.sort()
+    total = np.sum([e[1] for e in entries])
+    while entries and total > max_size:
+        _, size, fname = entries.pop(0)
+        os.remove(os.path.join(folder, fname))
+        total -= size
+        _log_message(logger, "DEBUG", "Evicted cache entry " + fname + ".")
@@ -93,7 +93,9 @@ def _unique_rows(arr, return_index=False):
     b = np.ascontiguousarray(arr).view(
         np.dtype((np.void, arr.dtype.itemsize * arr.shape[1])))
     b, idx = np.unique(b, return_index=True)
-    unique = b.view(arr.dtype).reshape(-1, arr.shape[1]).astype(int)
+    unique = b.view(arr.dtype).reshape(-1, arr.shape[1])
+    if unique.dtype.kind not in "iu":
+        unique = unique.astype(int)
     if return_index:
         return unique, idx
     return unique
@@ -103,10 +105,13 @@ def _no_self_loops(array, return_test=False):
     '''
     Remove self-loops
     '''
-    test = array[:, 0] != array[:, 1]
+    test  = array[:, 0] != array[:, 1]
+    array = array[test, :]
+    if array.dtype.kind not in "iu":
+        array = array.astype(int)
     if return_test:
-        return array[test, :].astype(int), test
-    return array[test, :].astype(int)
+        return array, test
+    return array
 
 
 #~ def _filter(ia_edges, ia_edges_tmp, num_ecurrent, b_one_pop, multigraph,
@@ -183,7 +183,11 @@ def _set_graph_tool():
     # defining the adjacency function
     def adj_mat(graph, weight=None):
         if weight not in (None, False):
-            weight = graph.edge_properties[weight]
+            if graph.edges_attributes.is_computed(weight):
+                weight = graph.new_edge_property(
+                    "double", vals=graph.get_edge_attributes(name=weight))
+            else:
+                weight = graph.edge_properties[weight]
             return _adj(graph, weight).T
         return _adj(graph).T
     def get_edges(graph):
@@ -228,7 +232,7 @@ def _set_igraph():
             xs, ys = xs.T, ys.T
             data = np.ones(xs.shape)
             if weight in graph.edges_attributes:
-                data *= np.array(graph.es[weight])
+                data *= graph.get_edge_attributes(name=weight)
             elif nonstring_container(weight):
                 data *= np.array(weight)
             elif weight:
@@ -268,9 +272,16 @@ def _set_networkx():
     from networkx.algorithms import ( diameter, 
         strongly_connected_components, weakly_connected_components,
         degree_assortativity_coefficient )
+    def _synced(func):
+        ''' Write the edge attributes to the networkx dicts before `func` '''
+        def wrapper(graph, *args, **kwargs):
+            if hasattr(graph, "_eattr"):
+                graph._eattr._sync()
+            return func(graph, *args, **kwargs)
+        return wrapper
     def _closeness(graph, nodes, weights):
         if weights is True and graph.is_weighted():
-            weights = graph.edge_properties[weight]
+            weights = "weight"
         else:
             weights=None
         if nodes is None:
@@ -296,21 +307,29 @@ def _set_networkx():
                                        "the latest version.")
     def local_clustering(g, nodes=None):
         return np.array(glib.clustering(g, nodes).values())
-    # defining the adjacency function
-    from networkx import to_scipy_sparse_matrix
+    # defining the adjacency function (from the arrays of the graph)
     def adj_mat(graph, weight=None):
-        return to_scipy_sparse_matrix(graph, weight=weight)
+        edges     = graph.edges_array
+        num_nodes = graph.node_nb()
+        if weight in graph.edges_attributes:
+            data = graph.get_edge_attributes(name=weight)
+        else:
+            data = np.ones(len(edges))
+        mat = ssp.coo_matrix((data, (edges[:, 0], edges[:, 1])),
+                             shape=(num_nodes, num_nodes))
+        return mat.tocsr()
     def get_edges(graph):
         return graph.edges(data=False)
     # store functions
-    nngt.analyze_graph["assortativity"] = degree_assortativity_coefficient
-    nngt.analyze_graph["diameter"] = diameter
-    nngt.analyze_graph["closeness"] = _closeness
-    nngt.analyze_graph["clustering"] = glib.transitivity
-    nngt.analyze_graph["local_clustering"] = local_clustering
-    nngt.analyze_graph["reciprocity"] = overall_reciprocity
-    nngt.analyze_graph["scc"] = strongly_connected_components
-    nngt.analyze_graph["wcc"] = diameter
+    nngt.analyze_graph["assortativity"] = \
+        _synced(degree_assortativity_coefficient)
+    nngt.analyze_graph["diameter"] = _synced(diameter)
+    nngt.analyze_graph["closeness"] = _synced(_closeness)
+    nngt.analyze_graph["clustering"] = _synced(glib.transitivity)
+    nngt.analyze_graph["local_clustering"] = _synced(local_clustering)
+    nngt.analyze_graph["reciprocity"] = _synced(overall_reciprocity)
+    nngt.analyze_graph["scc"] = _synced(strongly_connected_components)
+    nngt.analyze_graph["wcc"] = _synced(diameter)
     nngt.analyze_graph["adjacency"] = adj_mat
     nngt.analyze_graph["get_edges"] = get_edges
     return True
@@ -324,19 +343,18 @@ def _set_nngt():
     def _notimplemented(*args, **kwargs):
         raise NotImplementedError("Install a graph library to use.")
     def adj_mat(graph, weight=None):
-        if weight in graph.edges_attributes and weight != "weight":
-            edges     = graph.edges_array
+        # the values stored in `_adj_mat` are those given when the edges were
+        # created, so the current attribute is used for the weights
+        if weight in graph.edges_attributes:
+            edges     = graph.edges_array.reshape(-1, 2)
             prop      = graph.get_edge_attributes(name=weight)
             num_nodes = graph.node_nb()
             mat       = ssp.coo_matrix((prop, (edges[:, 0], edges[:, 1])),
                                        shape=(num_nodes, num_nodes))
             return mat.tocsr()
-        elif weight is False:
-            mat = graph._adj_mat.tocsr()
-            mat.data = np.ones(len(mat.data))
-            return mat
-        else:
-            return graph._adj_mat.tocsr()
+        mat = graph._adj_mat.tocsr()
+        mat.data = np.ones(len(mat.data))
+        return mat
     def get_edges(graph):
         return graph.edges_array()
     # store functions
@@ -2,6 +2,7 @@
 #-*- coding:utf-8 -*-
 
 from copy import deepcopy
+import sys
 
 import numpy as np
 
@@ -62,7 +63,7 @@ def _get_edge_attr(graph, elist, attribute, prop=None, last_edges=False):
 
         # if dealing with network, check inhibitory weight factor
         if graph.is_network() and not np.isclose(graph._iwf, 1.):
-            keep = graph.nodes_attributes['type'][elist[:, 0]] < 0
+            keep = graph._get_node_types()[elist[:, 0]] < 0
             weights[keep] *= graph._iwf
 
         return weights
@@ -91,6 +92,100 @@ def _get_edge_attr(graph, elist, attribute, prop=None, last_edges=False):
         **params)
 
 
+def _edge_bweights(graph, edges=None):
+    '''
+    Computed "bweight" attribute: maximum weight minus the weight of each
+    edge (used as a length for the shortest paths).
+    '''
+    weights = graph.get_weights()
+    if not len(weights):
+        return weights
+    wmax = np.max(weights)
+    if edges is not None:
+        weights = graph.get_edge_attributes(edges=edges, name="weight")
+    return wmax - weights
+
+
+def _edge_distances(graph, edges=None):
+    '''
+    Computed "distance" attribute: euclidean distance between the positions
+    of the source and target of each edge.
+    '''
+    edges = graph.edges_array if edges is None else edges
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    pos   = graph._pos
+    if not len(edges):
+        return np.array([], dtype=float)
+    return np.sqrt(np.sum(
+        np.square(pos[edges[:, 0]] - pos[edges[:, 1]]), axis=1))
+
+
+def _check_index_dtype(num_nodes, index_dtype):
+    ''' Check that the ids of `num_nodes` nodes fit in `index_dtype`. '''
+    if num_nodes >= np.iinfo(index_dtype).max:
+        raise InvalidArgument(
+            "The ids of {} nodes cannot be stored with `index_dtype` "
+            "{}.".format(num_nodes, np.dtype(index_dtype).name))
+
+
+def _missing_reciprocals(edge_list):
+    '''
+    Boolean mask of the edges of `edge_list` whose reciprocal edge is not in
+    the list (used to add the reverse edges of undirected graphs).
+    '''
+    if not len(edge_list):
+        return np.zeros(0, dtype=bool)
+    sources   = edge_list[:, 0].astype(np.int64)
+    targets   = edge_list[:, 1].astype(np.int64)
+    num_nodes = int(max(sources.max(), targets.max())) + 1
+    return ~np.isin(targets*num_nodes + sources, sources*num_nodes + targets)
+
+
+def _csr_is_symmetric(indptr, indices, data=None):
+    '''
+    Check that the matrix given by the CSR arrays is symmetric (same entries,
+    and same values if `data` is given), without building the transpose.
+    '''
+    num_nodes = len(indptr) - 1
+    rows   = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(indptr))
+    cols   = np.asarray(indices, dtype=np.int64)
+    direct = rows*num_nodes + cols
+    transp = cols*num_nodes + rows
+    if data is None:
+        return np.array_equal(np.sort(direct), np.sort(transp))
+    data   = np.asarray(data)
+    order1 = np.lexsort((data, direct))
+    order2 = np.lexsort((data, transp))
+    return (np.array_equal(direct[order1], transp[order2])
+            and np.array_equal(data[order1], data[order2]))
+
+
+def _deep_sizeof(obj, seen=None):
+    '''
+    Memory footprint of `obj` in bytes, including the objects it contains
+    (the buffer of numpy arrays, the items of containers and the attributes of
+    instances). Objects shared between several containers are counted once.
+    '''
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        size = sys.getsizeof(obj) if obj.base is None else obj.nbytes
+        if obj.dtype == object:
+            size += sum(_deep_sizeof(item, seen) for item in obj.flat)
+        return size
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_sizeof(k, seen) + _deep_sizeof(v, seen)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), seen)
+    return size
+
+
 def _get_syn_param(src_name, src_group, tgt_name, tgt_group, syn_spec,
                    key=None):
     '''
@@ -125,3 +220,163 @@ def _get_syn_param(src_name, src_group, tgt_name, tgt_group, syn_spec,
         return deepcopy(key_prop)
     else:
         return deepcopy(dict_prop)
+
+
+def _graph_to_arrays(graph, index_dtype=np.int32):
+    '''
+    Compact representation of a graph as a dict of numpy arrays and simple
+    python objects, which can be sent to other processes or stored without
+    pickling the :class:`~nngt.Graph` object itself.
+
+    Parameters
+    ----------
+    graph : :class:`~nngt.Graph` or subclass
+        The graph to convert.
+    index_dtype : numpy integer type, optional (default: int32)
+        Type used to store the edges.
+
+    Returns
+    -------
+    data : dict
+        Dictionary containing the graph properties, the (E, 2) `edges` array,
+        and the edge and node attributes as ``{name: (value_type, values)}``.
+    '''
+    edges = graph.edges_array
+    data  = {
+        "nodes": graph.node_nb(),
+        "name": graph.name,
+        "type": graph._graph_type,
+        "directed": graph._directed,
+        "weighted": graph._weighted,
+        "edges": np.asarray(edges, dtype=index_dtype).reshape(-1, 2),
+        "edge_attributes": {},
+        "node_attributes": {},
+        "index_dtype": graph._index_dtype,
+        "attr_dtype": graph._attr_dtype,
+    }
+    for attr in graph.edges_attributes._stored_keys():
+        data["edge_attributes"][attr] = (
+            graph.get_attribute_type(attr, "edge"),
+            np.asarray(graph.get_edge_attributes(name=attr)))
+    for attr in graph.nodes_attributes:
+        data["node_attributes"][attr] = (
+            graph.get_attribute_type(attr, "node"),
+            np.asarray(graph.get_node_attributes(name=attr)))
+    for key, attr in (("weights", "_w"), ("delays", "_d"),
+                      ("inh_weight_factor", "_iwf")):
+        if hasattr(graph, attr):
+            data[key] = getattr(graph, attr)
+    if graph.is_spatial():
+        data["shape"]     = graph.shape
+        data["positions"] = graph.get_positions()
+    if graph.is_network():
+        data["population"] = graph.population
+    return data
+
+
+def _graph_from_arrays(data):
+    '''
+    Rebuild a graph from the dict returned by :func:`_graph_to_arrays`.
+    '''
+    import nngt
+    kwargs = {k: data[k] for k in ("weights", "delays", "inh_weight_factor",
+                                   "index_dtype", "attr_dtype") if k in data}
+    graph = nngt.Graph(nodes=data["nodes"], name=data["name"],
+                       weighted=data["weighted"], directed=data["directed"],
+                       type=data["type"], **kwargs)
+    for name, (value_type, values) in data["node_attributes"].items():
+        if name not in graph.nodes_attributes:
+            graph.new_node_attribute(name, value_type, values=values)
+    edges = np.asarray(data["edges"], dtype=int)
+    eattr = data["edge_attributes"]
+    for name, (value_type, _) in eattr.items():
+        if name not in graph.edges_attributes:
+            graph.new_edge_attribute(name, value_type)
+    if len(edges):
+        # the edges and their values are complete: they are stored in bulk,
+        # without drawing random attributes or rebuilding the edges
+        graph._fill_edges(edges, {k: v[1] for k, v in eattr.items()})
+    if "population" in data:
+        nngt.Graph.make_network(graph, data["population"])
+    if "shape" in data or "positions" in data:
+        nngt.Graph.make_spatial(graph, shape=data.get("shape", None),
+                                positions=data.get("positions", None))
+        if ("distance" in data["edge_attributes"] and len(edges) and
+                not graph.edges_attributes.is_computed("distance")):
+            graph.set_edge_attribute(
+                "distance", values=data["edge_attributes"]["distance"][1])
+    return graph
+
+
+def _attribute_dicts(attributes, num):
+    '''
+    Dicts of attribute values of the `num` nodes or edges, from the
+    ``{name: (value_type, values)}`` `attributes`.
+    '''
+    names = list(attributes)
+    if not names:
+        return ({} for _ in range(num))
+    values = [attributes[k][1].tolist() for k in names]
+    return (dict(zip(names, row)) for row in zip(*values))
+
+
+# property types of graph-tool for the attribute types of NNGT
+_gt_types = {"int": "int64_t", "double": "double", "string": "string"}
+
+
+def _graph_to_library(graph, backend):
+    '''
+    Graph object of the library `backend` ("igraph", "networkx" or
+    "graph-tool") containing the nodes, the edges (in the same order) and the
+    stored attributes of `graph`, created with the bulk functions of the
+    library. Positions are stored as the "x" and "y" node attributes.
+    '''
+    if backend not in ("igraph", "networkx", "graph-tool"):
+        raise InvalidArgument("`backend` must be among 'igraph', "
+                              "'networkx', and 'graph-tool'.")
+    data  = _graph_to_arrays(graph, index_dtype=np.int64)
+    edges = data["edges"]
+    eattr = dict(data["edge_attributes"])
+    nattr = dict(data["node_attributes"])
+    if "positions" in data:
+        for i, axis in enumerate(("x", "y")):
+            nattr.setdefault(axis, ("double", data["positions"][:, i]))
+    if not data["directed"] and len(edges):
+        # keep each undirected edge once
+        num_nodes = data["nodes"]
+        keys      = np.min(edges, axis=1)*num_nodes + np.max(edges, axis=1)
+        _, first  = np.unique(keys, return_index=True)
+        keep      = np.sort(first)
+        edges     = edges[keep]
+        eattr     = {k: (vt, v[keep]) for k, (vt, v) in eattr.items()}
+    if backend == "igraph":
+        import igraph
+        return igraph.Graph(
+            n=data["nodes"], edges=edges.tolist(), directed=data["directed"],
+            graph_attrs={"name": data["name"]},
+            vertex_attrs={k: v.tolist() for k, (_, v) in nattr.items()},
+            edge_attrs={k: v.tolist() for k, (_, v) in eattr.items()})
+    elif backend == "networkx":
+        import networkx as nx
+        g = nx.DiGraph(name=data["name"]) if data["directed"] \
+            else nx.Graph(name=data["name"])
+        g.add_nodes_from(zip(range(data["nodes"]),
+                             _attribute_dicts(nattr, data["nodes"])))
+        g.add_edges_from(
+            (u, v, d) for (u, v), d in zip(edges.tolist(),
+                                           _attribute_dicts(eattr, len(edges))))
+        return g
+    else:
+        import graph_tool as gt
+        g = gt.Graph(directed=data["directed"])
+        g.gp["name"] = g.new_graph_property("string", data["name"])
+        g.add_vertex(data["nodes"])
+        g.add_edge_list(edges)
+        for props, attrs, new_prop in (
+                (g.vp, nattr, g.new_vertex_property),
+                (g.ep, eattr, g.new_edge_property)):
+            for name, (value_type, values) in attrs.items():
+                props[name] = new_prop(
+                    _gt_types.get(value_type, "python::object"),
+                    vals=values)
+        return g
@@ -20,15 +20,33 @@
 
 """ IO tools for NNGT """
 
+from array import array
+from collections import OrderedDict
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
 import codecs
+import io
+import json
 import logging
+import os
 import pickle
+import re
+import struct
+import warnings
+import zipfile
 
 import numpy as np
 import scipy.sparse as ssp
 
+try:
+    from html import unescape as _unescape
+except ImportError:  # Python 2
+    from HTMLParser import HTMLParser
+    _unescape = HTMLParser().unescape
+
 import nngt
 from nngt.lib import InvalidArgument
+from nngt.lib.graph_helpers import _graph_from_arrays
 from nngt.lib.logger import _log_message
 from .test_functions import graph_tool_check, on_master_process
 from ..geometry import Shape, _shapely_support
@@ -43,10 +61,17 @@ logger = logging.getLogger(__name__)
 
 @graph_tool_check('2.22')
 def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
-                   attributes=None, notifier="@", ignore="#"):
+                   attributes=None, notifier="@", ignore="#", mmap=False,
+                   n_jobs=1):
     '''
     Load the main properties (edges, attributes...) from a file.
 
+    .. versionchanged:: 1.0
+        Added the binary "nngt" format and the `mmap` and `n_jobs` arguments.
+        Files compressed with gzip, bz2, or xz are detected and decompressed
+        on the fly. GraphML and GML files are read incrementally, without
+        the graph library.
+
     .. warning::
         To import a graph directly from a file, use the
         :func:`~nngt.Graph.from_file` classmethod.
@@ -64,7 +89,8 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
         (graphml format, default if `filename` ends with '.graphml' or '.xml'),
         "dot" (dot format, default if `filename` ends with '.dot'), "gt" (only
         when using `graph_tool`<http://graph-tool.skewed.de/>_ as library,
-        detected if `filename` ends with '.gt').
+        detected if `filename` ends with '.gt'), "nngt" (binary format,
+        detected if `filename` ends with '.nngt').
     separator : str, optional (default " ")
         separator used to separate inputs in the case of custom formats (namely
         "neighbour" and "edge_list")
@@ -86,6 +112,15 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
         ``@population``, and ``@graph``.
     ignore : str, optional (default: "#")
         Ignore lines starting with the `ignore` string.
+    mmap : bool, optional (default: False)
+        For the "nngt" format, whether the arrays should be memory-mapped
+        from the file (read-only) instead of read into memory.
+    n_jobs : int, optional (default: 1)
+        Number of processes used to parse the edges of "neighbour" and
+        "edge_list" files. If larger than 1, the data is split into ranges of
+        lines which are parsed in parallel, then gathered through shared
+        memory (requires Python 3.8 or newer). Edges and attributes are
+        returned in the same order as with a single process.
 
     Returns
     -------
@@ -95,7 +130,9 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
         Dictionary containing the attribute name as key and its value as a
         list sorted in the same order as `edges`.
     pop : :class:`~nngt.NeuralPop`
-        Population (``None`` if not present in the file).
+        Population (``None`` if not present in the file). Its description is
+        only parsed when it is needed, see
+        :attr:`~nngt.Network.population`.
     shape : :class:`~nngt.geometry.Shape`
         Shape of the graph (``None`` if not present in the file).
     positions : array-like of shape (N, d)
@@ -105,35 +142,36 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
     if nngt.get_config("mpi"):
         raise NotImplementedError("This function is not ready for MPI yet.")
     # load
-    lst_lines, di_notif, pop, shape, positions = None, None, None, None, None
+    di_notif, pop, shape, positions = None, None, None, None
     fmt = _get_format(fmt, filename)
-    with open(filename, "r") as filegraph:
-        lst_lines = [line.strip() for line in filegraph.readlines()]
-    # notifier lines
-    di_notif = _get_notif(lst_lines, notifier)
-    # data
-    lst_lines = lst_lines[::-1][:-len(di_notif)]
-    while not lst_lines[-1] or lst_lines[-1].startswith(ignore):
-        lst_lines.pop()
-    # get nodes attributes
-    di_nattributes  = _get_node_attr(di_notif, separator)
-    # make edges and attributes
-    edges           = []
-    eattributes     = (di_notif["edge_attributes"] if attributes is None
-                       else attributes)
-    di_eattributes  = {name: [] for name in di_notif["edge_attributes"]}
-    di_edge_convert = _gen_convert(di_notif["edge_attributes"],
-                                   di_notif["edge_attr_types"])
-    line            = None
-
-    while lst_lines:
-        line = lst_lines.pop()
-        if line and not line.startswith(notifier):
-            di_get_edges[fmt](
-                line, eattributes, separator, secondary, edges, di_eattributes,
-                di_edge_convert)
-        else:
-            break
+    if fmt == "nngt":
+        return _binary_as_loaded(filename, attributes, mmap)
+    if fmt in di_parse:
+        # GraphML and GML
+        with _open_file(filename, "rb") as filegraph:
+            di_notif, edges, di_nattributes, di_eattributes, positions = \
+                di_parse[fmt](filegraph, attributes)
+    else:
+        if n_jobs != 1 and _detect_compression(filename) is not None:
+            _log_message(logger, "WARNING", "Compressed files cannot be "
+                         "split between processes, loading with a single "
+                         "process.")
+            n_jobs = 1
+        with _open_file(filename, "rb") as filegraph:
+            # notifier lines
+            di_notif, line = _read_notif(filegraph, notifier, ignore)
+            args = (fmt, di_notif, attributes, separator, secondary,
+                    notifier, ignore)
+            start = filegraph.tell() - len(line)
+            # make edges and attributes
+            if n_jobs == 1:
+                edges, di_eattributes, _ = _read_edges(filegraph, line,
+                                                       *args)
+        if n_jobs != 1:
+            edges, di_eattributes = _read_edges_parallel(
+                filename, start, n_jobs, args)
+        # get nodes attributes
+        di_nattributes = _get_node_attr(di_notif, separator)
     # check whether a shape is present
     if 'shape' in di_notif:
         if _shapely_support:
@@ -145,14 +183,9 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
             _log_message(logger, "WARNING",
                          'A Shape object was present in the file but could '
                          'not be loaded because Shapely is not installed.')
-    # check whether a population is present
+    # check whether a population is present (it is only built when needed)
     if 'population' in di_notif:
-        str_enc = di_notif['population'].replace('~', '\n').encode()
-        str_dec = codecs.decode(str_enc, "base64")
-        try:
-            pop = pickle.loads(str_dec)
-        except UnicodeError:
-            pop = pickle.loads(str_dec, encoding="latin1")
+        pop = _LazyPopulation(di_notif['population'])
     if 'x' in di_notif:
         x = np.fromstring(di_notif['x'], sep=separator)
         y = np.fromstring(di_notif['y'], sep=separator)
@@ -167,7 +200,9 @@ def load_from_file(filename, fmt="auto", separator=" ", secondary=";",
 
 @graph_tool_check('2.22')
 def save_to_file(graph, filename, fmt="auto", separator=" ",
-                 secondary=";", attributes=None, notifier="@"):
+                 secondary=";", attributes=None, notifier="@",
+                 compression="auto", compression_level=None,
+                 target_index=False):
     '''
     Save a graph to file.
 
@@ -175,7 +210,7 @@ def save_to_file(graph, filename, fmt="auto", separator=" ",
         Added support to write position and Shape when saving
         :class:`~nngt.SpatialGraph`. Note that saving Shape requires shapely.
 
-    @todo: implement population and shape saving, implement gml, dot, xml, gt
+    @todo: implement dot and gt
 
     Parameters
     ----------
@@ -192,7 +227,8 @@ def save_to_file(graph, filename, fmt="auto", separator=" ",
         (graphml format, default if `filename` ends with '.graphml' or '.xml'),
         "dot" (dot format, default if `filename` ends with '.dot'), "gt" (only
         when using `graph_tool`<http://graph-tool.skewed.de/>_ as library,
-        detected if `filename` ends with '.gt').
+        detected if `filename` ends with '.gt'), "nngt" (binary format,
+        default if `filename` ends with '.nngt').
     separator : str, optional (default " ")
         separator used to separate inputs in the case of custom formats (namely
         "neighbour" and "edge_list")
@@ -210,6 +246,18 @@ def save_to_file(graph, filename, fmt="auto", separator=" ",
         Additional notifiers are ``@type=SpatialGraph/Network/SpatialNetwork``,
         which are followed by the relevant notifiers among ``@shape``,
         ``@population``, and ``@graph`` to separate the sections.
+    compression : str, optional (default: "auto")
+        Compression of the file, among "gzip", "bz2", and "xz". By default,
+        it is deduced from the extension of `filename` (".gz", ".bz2", or
+        ".xz"), and no compression is used otherwise. For the "nngt" format,
+        the arrays are compressed individually inside the archive.
+    compression_level : int, optional (default: default level of the codec)
+        Level of the compression, between 1 (fastest) and 9 (smallest file).
+    target_index : bool, optional (default: False)
+        For the "nngt" format, also store the edges sorted by target, which
+        speeds up :func:`~nngt.load_subgraph` when the selected nodes have
+        fewer incoming than outgoing edges (the edges sorted by source are
+        always stored).
 
     .. warning ::
         For now, all formats lead to
@@ -219,8 +267,36 @@ def save_to_file(graph, filename, fmt="auto", separator=" ",
 
     .. note ::
         Positions are saved as bytes by :func:`numpy.nparray.tostring`
+
+    .. versionchanged:: 1.0
+        Added the binary "nngt" format (one typed array per edge or node
+        attribute, positions, shape and population), which can be loaded
+        without parsing or memory-mapped, see :func:`~nngt.Graph.from_file`.
+        Added the `compression`, `compression_level`, and `target_index`
+        arguments. GraphML and GML files are written by blocks of rows,
+        without the graph library; positions are saved as the "x" and "y"
+        node attributes and the population and shape as graph data.
     '''
-    fmt = _get_format(fmt, filename)
+    fmt         = _get_format(fmt, filename)
+    compression = _get_compression(compression, filename)
+
+    if fmt == "nngt":
+        if nngt.get_config("mpi"):
+            raise NotImplementedError("The 'nngt' format is not available "
+                                      "with MPI yet.")
+        return _save_binary(graph, filename, attributes, compression,
+                            compression_level, target_index)
+
+    if fmt not in di_format:
+        raise InvalidArgument("Saving to the '{}' format is not "
+                              "supported.".format(fmt))
+
+    if compression is not None and nngt.get_config("mpi"):
+        raise NotImplementedError("Compression is not available with MPI.")
+
+    if fmt in di_parse and nngt.get_config("mpi"):
+        raise NotImplementedError("The '{}' format is not available with "
+                                  "MPI.".format(fmt))
 
     # check for mpi
     if nngt.get_config("mpi"):
@@ -255,14 +331,161 @@ def save_to_file(graph, filename, fmt="auto", separator=" ",
         fh.Write_at_all(offset[rank], str_local.encode('utf-8'))
         fh.Close()
     else:
-        str_graph, di_notif = _as_string(
-            graph, separator=separator, fmt=fmt, secondary=secondary,
-            attributes=attributes, notifier=notifier, return_info=True)
-        with open(filename, "w") as f_graph:
-            for key, val in iter(di_notif.items()):
-                f_graph.write("{}{}={}\n".format(notifier, key, val))
-            f_graph.write("\n")
-            f_graph.write(str_graph)
+        di_notif = _make_notif(graph, separator, secondary, attributes,
+                               notifier)
+        if attributes is None:
+            attributes = graph.edges_attributes._stored_keys()
+        # stream the data by blocks
+        with _open_file(filename, "wb", compression,
+                        compression_level) as f_graph:
+            if fmt not in di_parse:
+                for key, val in iter(di_notif.items()):
+                    f_graph.write("{}{}={}\n".format(
+                        notifier, key, val).encode("utf-8"))
+                f_graph.write(b"\n")
+            for block in di_format[fmt](graph, separator=separator,
+                                        secondary=secondary,
+                                        attributes=attributes):
+                f_graph.write(block)
+
+
+def load_subgraph(filename, nodes=None, groups=None, bbox=None):
+    '''
+    Load the subgraph induced by some of the nodes of a graph saved in the
+    binary "nngt" format, without reading the rest of the file.
+
+    .. versionadded:: 1.0
+
+    The file is memory-mapped and the edges of the selected nodes are found
+    through the index of the edges sorted by source (or by target, if it was
+    saved with `target_index` and is smaller for this selection), so that
+    only the blocks containing these edges are read from disk.
+
+    Parameters
+    ----------
+    filename : str
+        Path to a file saved with the "nngt" format.
+    nodes : array-like, optional (default: all nodes)
+        Ids of the nodes that are kept.
+    groups : str or list of str, optional (default: all groups)
+        Names of the groups of the population whose nodes are kept (only
+        for networks).
+    bbox : tuple, optional (default: whole space)
+        Bounding box ``(xmin, ymin, xmax, ymax)`` containing the positions of
+        the nodes that are kept (only for spatial graphs).
+
+    If several selections are given, the nodes belonging to all of them are
+    kept.
+
+    Returns
+    -------
+    graph : :class:`~nngt.Graph` or subclass
+        The subgraph, where the nodes are renumbered from 0 following their
+        order in the file and the edges are in the same order as in the file.
+        Its population only contains the groups which still have nodes.
+
+    Example
+    -------
+    >>> net.to_file("net.nngt", target_index=True)
+    >>> inhib = nngt.load_subgraph("net.nngt", groups="inhibitory")
+    '''
+    arrays, meta = _load_binary(filename, mmap=True)
+    num_nodes    = meta["nodes"]
+    keep         = np.ones(num_nodes, dtype=bool)
+    # selected nodes
+    if nodes is not None:
+        selected = np.zeros(num_nodes, dtype=bool)
+        selected[np.asarray(nodes, dtype=np.int64)] = True
+        keep &= selected
+    pop = meta["population"]
+    if pop is not None:
+        desc, ids = _population_parts(pop)
+    if groups is not None:
+        if pop is None:
+            raise InvalidArgument("`groups` can only be used for networks.")
+        groups   = [groups] if isinstance(groups, str) else list(groups)
+        names    = [gdesc["name"] for gdesc in desc["groups"]]
+        selected = np.zeros(num_nodes, dtype=bool)
+        for name in groups:
+            if name not in names:
+                raise InvalidArgument("Unknown group '{}'.".format(name))
+            selected[ids[names.index(name)]] = True
+        keep &= selected
+    if bbox is not None:
+        if "positions" not in arrays:
+            raise InvalidArgument("`bbox` can only be used for spatial "
+                                  "graphs.")
+        xmin, ymin, xmax, ymax = bbox
+        x, y  = arrays["positions"][:, 0], arrays["positions"][:, 1]
+        keep &= (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    node_ids = np.where(keep)[0]
+    new_ids  = np.full(num_nodes, -1, dtype=np.int64)
+    new_ids[node_ids] = np.arange(len(node_ids))
+    eids     = _induced_edges(arrays, node_ids, keep)
+
+    # gather the values of the selection
+    def values(kind, name, idx):
+        if kind[0] + "attr:" + name in arrays:
+            return np.asarray(arrays[kind[0] + "attr:" + name][idx])
+        objects = meta["objects"][(kind, name)]
+        return np.array([objects[i] for i in idx], dtype=object)
+
+    data = {
+        "nodes": len(node_ids),
+        "name": meta["name"],
+        "type": meta["type"],
+        "directed": meta["directed"],
+        "weighted": meta["weighted"],
+        "index_dtype": meta["index_dtype"],
+        "attr_dtype": meta["attr_dtype"],
+        "edges": new_ids[np.asarray(arrays["edges"][eids], dtype=np.int64)],
+        "edge_attributes": {
+            k: (vtype, values("edge", k, eids))
+            for k, vtype in meta["edge_attributes"].items()},
+        "node_attributes": {
+            k: (vtype, values("node", k, node_ids))
+            for k, vtype in meta["node_attributes"].items()},
+    }
+    if pop is not None:
+        data["population"] = _subpopulation(desc, ids, keep, new_ids)
+    if "positions" in arrays:
+        data["positions"] = np.array(arrays["positions"][node_ids])
+    if meta["shape"] is not None:
+        data["shape"] = meta["shape"]
+    graph = _graph_from_arrays(data)
+    for k, (vtype, func) in meta["computed"].items():
+        if k not in graph.edges_attributes:
+            graph.new_computed_edge_attribute(k, vtype, func)
+    return graph
+
+
+def _induced_edges(arrays, node_ids, keep):
+    '''
+    Ids of the edges between the nodes where `keep` is True, in the order of
+    the file, read from the CSR index (or from the target index if it exists
+    and contains fewer edges for `node_ids`).
+    '''
+    prefix = ""
+    starts = np.asarray(arrays["indptr"][node_ids], dtype=np.int64)
+    counts = np.asarray(arrays["indptr"][node_ids + 1], dtype=np.int64) \
+        - starts
+    if "csc_indptr" in arrays:
+        csc_starts = np.asarray(arrays["csc_indptr"][node_ids],
+                                dtype=np.int64)
+        csc_counts = np.asarray(arrays["csc_indptr"][node_ids + 1],
+                                dtype=np.int64) - csc_starts
+        if csc_counts.sum() < counts.sum():
+            prefix, starts, counts = "csc_", csc_starts, csc_counts
+    # positions of the edges in the index: one range per selected node
+    offsets   = np.cumsum(counts) - counts
+    positions = np.arange(counts.sum(), dtype=np.int64) \
+        + np.repeat(starts - offsets, counts)
+    others    = np.asarray(arrays[prefix + "indices"][positions],
+                           dtype=np.int64)
+    eids      = np.asarray(
+        arrays[(prefix if prefix else "csr_") + "eids"][positions],
+        dtype=np.int64)
+    return np.sort(eids[keep[others]])
 
 
 # --------------------- #
@@ -316,6 +539,31 @@ def _as_string(graph, fmt="neighbour", separator=" ", secondary=";",
     str_graph : string
         The full graph representation as a string.
     '''
+    additional_notif = _make_notif(graph, separator, secondary, attributes,
+                                   notifier)
+
+    if attributes is None:
+        attributes = graph.edges_attributes._stored_keys()
+
+    str_graph = b"".join(di_format[fmt](
+        graph, separator=separator, secondary=secondary,
+        attributes=attributes)).decode()
+
+    # remove the final newline
+    str_graph = str_graph[:-1] if str_graph.endswith("\n") else str_graph
+
+    if return_info:
+        return str_graph, additional_notif
+    else:
+        return str_graph
+
+
+def _make_notif(graph, separator, secondary, attributes, notifier):
+    '''
+    Return the dict containing the notifiers (information on the graph,
+    node attributes, positions, shape and population) as keys and their
+    string representation as values.
+    '''
     # checks
     if separator == secondary:
         raise InvalidArgument("`separator` and `secondary` strings must be "
@@ -323,12 +571,9 @@ def _as_string(graph, fmt="neighbour", separator=" ", secondary=";",
     if notifier == separator or notifier == secondary:
         raise InvalidArgument("`notifier` string should differ from "
                               "`separator` and `secondary`.")
-    # temporarily disable numpy cut threshold to save string
-    old_threshold = np.get_printoptions()['threshold']
-    np.set_printoptions(threshold=np.NaN)
     # data
     if attributes is None:
-        attributes = [a for a in graph.edges_attributes if a != "bweight"]
+        attributes = graph.edges_attributes._stored_keys()
     nattributes = [a for a in graph.nodes_attributes]
     additional_notif = {
         "directed": graph._directed,
@@ -346,12 +591,8 @@ def _as_string(graph, fmt="neighbour", separator=" ", secondary=";",
     # add node attributes to the notifications
     for nattr in additional_notif["node_attributes"]:
         key                   = "na_" + nattr
-        additional_notif[key] = np.array2string(
-                graph.get_node_attributes(name=nattr), max_line_width=np.NaN,
-                separator=separator)[1:-1]
-        # ~ additional_notif[key] = codecs.encode(
-            # ~ graph.get_node_attributes(name=nattr).tobytes(),
-            # ~ "base64").decode().replace('\n', '~')
+        additional_notif[key] = _join_values(
+            graph.get_node_attributes(name=nattr), separator)
     # save positions for SpatialGraph (and shape if Shapely is available)
     if graph.is_spatial():
         if _shapely_support:
@@ -365,42 +606,37 @@ def _as_string(graph, fmt="neighbour", separator=" ", secondary=";",
                          'The `shape` attribute of the graph could not be '
                          'saved to file because Shapely is not installed.')
         pos = graph.get_positions()
-        additional_notif['x'] = np.array2string(
-            pos[:, 0], max_line_width=np.NaN, separator=separator)[1:-1]
-        additional_notif['y'] = np.array2string(
-            pos[:, 1], max_line_width=np.NaN, separator=separator)[1:-1]
+        additional_notif['x'] = _join_values(pos[:, 0], separator)
+        additional_notif['y'] = _join_values(pos[:, 1], separator)
         if pos.shape[1] == 3:
-            additional_notif['z'] = np.array2string(
-                pos[:, 2], max_line_width=np.NaN, separator=separator)[1:-1]
+            additional_notif['z'] = _join_values(pos[:, 2], separator)
 
     if graph.is_network():
         if nngt.get_config("mpi"):
             if nngt.get_config("mpi_comm").Get_rank() == 0:
-                additional_notif["population"] = codecs.encode(
-                    pickle.dumps(graph.population, protocol=2),
-                                 "base64").decode().replace('\n', '~')
+                additional_notif["population"] = _population_string(
+                    graph.population)
         else:
-            additional_notif["population"] = codecs.encode(
-                pickle.dumps(graph.population, protocol=2),
-                             "base64").decode().replace('\n', '~')
+            additional_notif["population"] = _population_string(
+                graph.population)
 
-    str_graph = di_format[fmt](graph, separator=separator,
-                               secondary=secondary, attributes=attributes)
+    return additional_notif
 
-    # set numpy cut threshold back on
-    np.set_printoptions(threshold=old_threshold)
 
-    if return_info:
-        return str_graph, additional_notif
-    else:
-        return str_graph
+def _join_values(values, separator):
+    ''' String representation of a 1D array (full precision). '''
+    return separator.join(np.asarray(values).astype(str))
 
 
 # ------------ #
 # Saving tools #
 # ------------ #
 
+# number of lines formatted at once when saving text files
+_BLOCK_SIZE = 1 << 16
+
 def _get_format(fmt, filename):
+    filename = _strip_compression(filename)
     if fmt == "auto":
         if filename.endswith('.gml'):
             fmt = 'gml'
@@ -415,6 +651,8 @@ def _get_format(fmt, filename):
             fmt = 'neighbour'
         elif filename.endswith('.el'):
             fmt = 'edge_list'
+        elif filename.endswith('.nngt'):
+            fmt = 'nngt'
         else:
             raise InvalidArgument('Could not determine format from filename '
                                   'please specify `fmt`.')
@@ -423,58 +661,156 @@ def _get_format(fmt, filename):
 
 def _neighbour_list(graph, separator, secondary, attributes):
     '''
-    Generate a string containing the neighbour list of the graph as well as a
-    dict containing the notifiers as key and the associated values.
-    @todo: speed this up!
+    Generate the blocks of bytes containing the neighbour list of the graph:
+    one line per node, with the node followed by its targets (sorted) and
+    the attributes of the associated edges.
     '''
-    lst_neighbours = list(graph.adjacency_matrix().tolil().rows)
-    attributes = {
-        k: v for k, v in graph.edges_attributes.items()
-        if k != 'bweight'
+    edges = np.asarray(graph.edges_array, dtype=int).reshape(-1, 2)
+    num_nodes, num_edges = graph.node_nb(), len(edges)
+
+    # sort the edges by source then target and add the nodes without edges
+    order   = np.lexsort((edges[:, 1], edges[:, 0]))
+    lonely  = np.where(np.bincount(edges[:, 0], minlength=num_nodes) == 0)[0]
+    sources = np.concatenate((edges[order, 0], lonely))
+    rows    = np.argsort(sources, kind="mergesort")
+    sources = sources[rows]
+    is_edge = rows < num_edges
+
+    # the first row of a node contains the node, the last one ends the line
+    first = np.ones(len(rows), dtype=bool)
+    first[1:] = sources[1:] != sources[:-1]
+    last = np.ones(len(rows), dtype=bool)
+    last[:-1] = first[1:]
+
+    # edge ids associated to each row (only relevant for actual edges)
+    eids = order[np.where(is_edge, rows, 0)] if num_edges else rows
+
+    values = {
+        name: _attribute_column(graph, name) for name in attributes
     }
-    for v1 in range(graph.node_nb()):
-        for i, v2 in enumerate(lst_neighbours[v1]):
-            str_edge = str(v2)
-            for attr in attributes:
-                str_edge += "{}{}".format(secondary,
-                                          attributes[(v1, v2)][attr])
-            lst_neighbours[v1][i] = str_edge
-        lst_neighbours[v1] = "{}{}{}".format(
-            v1, separator, separator.join(lst_neighbours[v1]))
-    str_neighbours = "\n".join(lst_neighbours)
-    return str_neighbours
+
+    for start in range(0, len(rows), _BLOCK_SIZE):
+        block  = slice(start, start + _BLOCK_SIZE)
+        num    = len(rows[block])
+        edge   = is_edge[block]
+        bstart = first[block]
+        ids    = eids[block][edge]
+        cols   = [
+            _byte_column(sources[block][bstart], bstart, num),
+            _const_column(separator, bstart & edge),
+            _byte_column(edges[ids, 1], edge, num),
+        ]
+        for name in attributes:
+            cols.append(_const_column(secondary, edge))
+            cols.append(_byte_column(values[name][ids], edge, num))
+        cols.append(_const_column(separator, ~last[block]))
+        cols.append(_const_column("\n", last[block]))
+        yield _format_rows(cols)
 
 
 def _edge_list(graph, separator, secondary, attributes):
-    ''' Generate a string containing the edge list and their properties. '''
-    edges = graph.edges_array
-    attributes = {
-        k: v for k, v in graph.edges_attributes.items()
-        if k != 'bweight'
+    '''
+    Generate the blocks of bytes containing the edge list and the edge
+    attributes.
+    '''
+    edges  = np.asarray(graph.edges_array, dtype=int).reshape(-1, 2)
+    values = {
+        name: _attribute_column(graph, name) for name in attributes
     }
-    end_strings = [secondary for _ in range(len(attributes) - 1)]
-    end_strings.append('')
-    lst_edges = []
-    for i, e in enumerate(edges):
-        str_edge = "{}{}{}".format(e[0], separator, e[1])
-        if attributes:
-            str_edge += separator
-        for end, attr in zip(end_strings, attributes):
-            str_edge += "{}{}".format(attributes[attr][i], end)
-        lst_edges.append(str_edge)
-    str_edges = "\n".join(lst_edges)
-    return str_edges
 
+    for start in range(0, len(edges), _BLOCK_SIZE):
+        block = slice(start, start + _BLOCK_SIZE)
+        every = np.ones(len(edges[block]), dtype=bool)
+        cols  = [
+            _byte_column(edges[block, 0]),
+            _const_column(separator, every),
+            _byte_column(edges[block, 1]),
+        ]
+        for i, name in enumerate(attributes):
+            cols.append(_const_column(secondary if i else separator, every))
+            cols.append(_byte_column(values[name][block]))
+        cols.append(_const_column("\n", every))
+        yield _format_rows(cols)
+
+
+def _attribute_column(graph, name):
+    ''' Values of an edge attribute as an array (strings for objects). '''
+    values = np.asarray(graph.get_edge_attributes(name=name))
+    if values.dtype.kind not in "biuf":
+        values = values.astype(str)
+    return values
+
+
+def _byte_column(values, mask=None, num=None):
+    '''
+    Text representation of `values` as a 2D array of bytes padded with
+    zeros, with one row per entry.
+    If `mask` is given, `values` are placed on the `num` rows where `mask` is
+    True and the other rows are left empty.
+    '''
+    if values.dtype.kind == "U":
+        data = _string_bytes(np.char.encode(values, "utf-8"))
+    elif values.dtype.kind in "iu":
+        data = _int_bytes(values)
+    else:
+        # floats are written with their full precision, in strings of fixed
+        # size which are cut after the longest representation
+        data = _string_bytes(values.astype("S"))
+        used = np.flatnonzero(data.any(axis=0))
+        data = data[:, :used[-1] + 1] if len(used) else data
+    if mask is None:
+        return data
+    res = np.zeros((num, data.shape[1]), dtype=np.uint8)
+    res[mask] = data
+    return res
 
-def _dot(graph, attributes, **kwargs):
-    pass
 
+def _string_bytes(values):
+    ''' 2D array of bytes from an array of bytes strings. '''
+    width = max(values.dtype.itemsize, 1)
+    return values.view(np.uint8).reshape(len(values), width)
 
-def _gml(graph, attributes, **kwargs):
-    pass
+
+def _int_bytes(values):
+    '''
+    Decimal representation of the integer `values` as a 2D array of bytes
+    (padded with zeros).
+    '''
+    # the magnitude of the smallest int64 only fits in an unsigned integer
+    mag   = np.abs(values).astype(np.uint64)
+    width = len(str(int(mag.max()))) if len(mag) else 1
+    data  = np.zeros((len(values), width + 1), dtype=np.uint8)
+    if values.dtype.kind == "i":
+        data[values < 0, 0] = ord("-")
+    for i in range(width):
+        power = np.uint64(10**(width - 1 - i))
+        digit = ((mag // power) % np.uint64(10)).astype(np.uint8) + 48
+        # no leading zeros, but the last digit is always written
+        data[:, i + 1] = digit if i == width - 1 else \
+            np.where(mag >= power, digit, 0)
+    return data
+
+
+def _const_column(string, mask):
+    '''
+    2D array of bytes containing `string` on the rows where `mask` is True,
+    and zeros elsewhere.
+    '''
+    const = np.frombuffer(string.encode(), dtype=np.uint8)
+    return np.outer(mask, const).astype(np.uint8)
 
 
-def _xml(graph, attributes, **kwargs):
+def _format_rows(cols):
+    '''
+    Concatenate the rows of the byte columns, removing the padding zeros.
+    '''
+    if not len(cols[0]):
+        return b""
+    data = np.concatenate(cols, axis=1)
+    return data[data != 0].tobytes()
+
+
+def _dot(graph, attributes, **kwargs):
     pass
 
 
@@ -486,6 +822,13 @@ def _gt(graph, attributes, **kwargs):
 # Loading tools #
 # ------------- #
 
+# size of the chunks read when loading text files
+_CHUNK_SIZE = 1 << 22
+
+# whitespace bytes ending the tokens of a chunk
+_WHITESPACE = np.array([ord(c) for c in " \t\n\r"], dtype=np.uint8)
+
+
 def _format_notif(notif_name, notif_val):
     attr = (
         "node_attributes", "edge_attributes", "node_attr_types",
@@ -505,6 +848,28 @@ def _format_notif(notif_name, notif_val):
         return notif_val    
 
 
+def _read_notif(filegraph, notifier, ignore):
+    '''
+    Read the notifier lines at the beginning of a file opened in binary mode.
+
+    Returns
+    -------
+    di_notif : dict
+        The notifiers.
+    line : bytes
+        First data line (empty if the file contains no edges).
+    '''
+    lines = []
+    line  = filegraph.readline()
+    while line.startswith(notifier.encode()):
+        lines.append(line.decode().strip())
+        line = filegraph.readline()
+    # skip empty and ignored lines before the data
+    while line and (not line.strip() or line.startswith(ignore.encode())):
+        line = filegraph.readline()
+    return _get_notif(lines, notifier), line
+
+
 def _get_notif(lines, notifier):
     di_notif = {
         "node_attributes": [], "edge_attributes": [], "node_attr_types": [],
@@ -615,6 +980,322 @@ def _get_edges_elist(line, attributes, separator, secondary, edges,
             di_attributes[name].append(di_convert[name](val))
 
 
+def _read_edges(filegraph, first_line, fmt, di_notif, attributes, separator,
+                secondary, notifier, ignore, size=None):
+    '''
+    Read the edges and their attributes from the data section of a file, from
+    `first_line` to the next empty or notifier line, or after `size` bytes.
+
+    The data is read by chunks of ``_CHUNK_SIZE`` bytes which are parsed in
+    bulk by :func:`_parse_chunk` when all the attributes are numbers; other
+    chunks are parsed line by line.
+
+    Returns
+    -------
+    edges : array of shape (E, 2)
+    di_eattributes : dict
+        Attribute values, as arrays for numbers, as lists otherwise.
+    ended : bool
+        Whether the end of the data section was found.
+    '''
+    eattributes = (di_notif["edge_attributes"] if attributes is None
+                   else attributes)
+    attr_types  = dict(zip(di_notif["edge_attributes"],
+                           di_notif["edge_attr_types"]))
+    attr_types  = [attr_types.get(name, "double") for name in eattributes]
+    di_convert  = _gen_convert(eattributes, attr_types)
+    numeric     = all(_np_dtype(t) is not object for t in attr_types)
+    num_attr    = len(eattributes)
+
+    lst_edges = []
+    lst_attr  = {name: [] for name in eattributes}
+
+    encoding = [s.encode() for s in (separator, secondary, notifier, ignore)]
+
+    remainder = first_line
+    finished  = ended = False
+
+    while not finished:
+        if size is None:
+            chunk = filegraph.read(_CHUNK_SIZE)
+        else:
+            chunk = filegraph.read(min(_CHUNK_SIZE, size))
+            size -= len(chunk)
+        data = remainder + chunk
+        if chunk:
+            # keep the last incomplete line for the next chunk
+            last = data.rfind(b"\n") + 1
+            data, remainder = data[:last], data[last:]
+        else:
+            remainder, finished = b"", True
+        end = _data_end(data, encoding[2])
+        if end is not None:
+            data, finished, ended = data[:end], True, True
+        if not data:
+            continue
+        parsed = None
+        if numeric and encoding[3] not in data:
+            parsed = _parse_chunk(data, fmt, encoding[0], encoding[1],
+                                  num_attr)
+        if parsed is None:
+            edges, di_attr = [], {name: [] for name in eattributes}
+            for line in data.decode().splitlines():
+                line = line.strip()
+                if line and not line.startswith(ignore):
+                    di_get_edges[fmt](line, eattributes, separator, secondary,
+                                      edges, di_attr, di_convert)
+            lst_edges.append(np.array(edges, dtype=int).reshape(-1, 2))
+            for name in eattributes:
+                lst_attr[name].append(di_attr[name])
+        else:
+            lst_edges.append(parsed[0])
+            if parsed[1] is not None:
+                for i, name in enumerate(eattributes):
+                    lst_attr[name].append(parsed[1][:, i])
+
+    edges = (np.concatenate(lst_edges) if lst_edges
+             else np.zeros((0, 2), dtype=int))
+
+    di_eattributes = {}
+
+    for name, attr_type in zip(eattributes, attr_types):
+        dtype = _np_dtype(attr_type)
+        if dtype is object:
+            di_eattributes[name] = [v for chunk in lst_attr[name]
+                                    for v in chunk]
+        else:
+            di_eattributes[name] = np.concatenate(
+                [np.asarray(chunk, dtype=float) for chunk in lst_attr[name]]
+                + [[]]).astype(dtype)
+
+    return edges, di_eattributes, ended
+
+
+def _read_edges_parallel(filename, start, n_jobs, args):
+    '''
+    Read the edges from the data section of a file, starting at byte `start`,
+    with `n_jobs` processes.
+
+    The data is split into ranges of bytes aligned on line starts, which are
+    parsed by :func:`_read_edges` in the workers. The resulting arrays are
+    sent back through shared memory and concatenated in the order of the
+    ranges, so edges and attributes are ordered as in the file.
+    '''
+    import multiprocessing as mp
+    from multiprocessing import resource_tracker
+    from nngt.core.shared_graph import _shared_memory
+
+    shared_memory = _shared_memory()
+
+    size   = os.path.getsize(filename)
+    num    = int(min(4*n_jobs, max(1, (size - start) // _CHUNK_SIZE)))
+    bounds = [start]
+
+    with open(filename, "rb") as filegraph:
+        for i in range(1, num):
+            filegraph.seek(start + i*(size - start) // num)
+            filegraph.readline()
+            if bounds[-1] < filegraph.tell() < size:
+                bounds.append(filegraph.tell())
+
+    bounds.append(size)
+
+    tasks = [(filename, b0, b1, args) for b0, b1 in zip(bounds, bounds[1:])]
+
+    # the blocks created by the workers are registered with the tracker of
+    # the main process, which unlinks them
+    resource_tracker.ensure_running()
+
+    pool = mp.Pool(min(n_jobs, len(tasks)))
+    try:
+        results = pool.map(_edges_worker, tasks)
+    finally:
+        pool.close()
+        pool.join()
+
+    # ranges after the end of the data section are ignored
+    num_used = len(results)
+    for i, res in enumerate(results):
+        if res[3]:
+            num_used = i + 1
+            break
+
+    blocks = [shared_memory.SharedMemory(name=res[0]) for res in results]
+
+    try:
+        parts = []
+        for block, res in zip(blocks[:num_used], results):
+            parts.append({
+                key: np.ndarray(shape, dtype, buffer=block.buf, offset=offset)
+                for key, (dtype, shape, offset) in res[1].items()
+            })
+        edges = np.concatenate([p["edges"] for p in parts])
+        di_eattributes = {}
+        for name in results[0][1]:
+            if name != "edges":
+                di_eattributes[name] = np.concatenate(
+                    [p[name] for p in parts])
+        for name in results[0][2]:
+            di_eattributes[name] = [v for res in results[:num_used]
+                                    for v in res[2][name]]
+        del parts
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return edges, di_eattributes
+
+
+def _edges_worker(task):
+    '''
+    Parse a range of bytes and put the resulting arrays in a shared memory
+    block.
+
+    Returns
+    -------
+    name : str
+        Name of the shared memory block.
+    layout : dict
+        Dtype, shape, and offset of each array in the block.
+    objects : dict
+        Attributes that are not stored as numbers.
+    ended : bool
+        Whether the end of the data section was found.
+    '''
+    from nngt.core.shared_graph import _shared_memory
+
+    filename, start, stop, args = task
+
+    with open(filename, "rb") as filegraph:
+        filegraph.seek(start)
+        edges, di_attr, ended = _read_edges(filegraph, b"", *args,
+                                            size=stop - start)
+
+    arrays  = [("edges", edges)]
+    objects = {}
+
+    for name, values in di_attr.items():
+        if isinstance(values, np.ndarray):
+            arrays.append((name, values))
+        else:
+            objects[name] = values
+
+    layout, nbytes = {}, 0
+
+    for key, arr in arrays:
+        layout[key] = (arr.dtype.str, arr.shape, nbytes)
+        nbytes     += arr.nbytes
+
+    shm = _shared_memory().SharedMemory(create=True, size=max(nbytes, 1))
+
+    for key, arr in arrays:
+        dtype, shape, offset = layout[key]
+        np.ndarray(shape, dtype, buffer=shm.buf, offset=offset)[...] = arr
+
+    shm.close()
+
+    return shm.name, layout, objects, ended
+
+
+def _data_end(data, notifier):
+    '''
+    Position at which the data section ends in `data` (an empty or notifier
+    line), or None if it does not end in this chunk.
+    '''
+    if data.startswith((b"\n", b"\r\n", notifier)):
+        return 0
+    ends = [data.find(b"\n\n") + 1]
+    if b"\r" in data:
+        ends.append(data.find(b"\n\r\n") + 1)
+    # the notifier is rare, look for it first then check the line start
+    idx = data.find(notifier)
+    while idx > 0 and data[idx - 1:idx] != b"\n":
+        idx = data.find(notifier, idx + 1)
+    ends.append(idx)
+    ends = [e for e in ends if e > 0]
+    return min(ends) if ends else None
+
+
+def _parse_chunk(data, fmt, separator, secondary, num_attr):
+    '''
+    Parse a chunk of complete lines containing only numbers in bulk.
+
+    Returns
+    -------
+    ``(edges, attributes)`` with the (E, 2) edges and the (E, `num_attr`)
+    attribute values (None if the lines contain no attributes), or None if
+    the chunk is not regular enough to be parsed in bulk.
+    '''
+    for delim in (separator, secondary):
+        if delim.strip():
+            data = data.replace(delim, b" ")
+
+    if fmt == "edge_list" and not num_attr:
+        # only integers: parse them directly
+        num_lines = data.count(b"\n") + (not data.endswith(b"\n"))
+        values    = _fromstring(data, int)
+        if values is None or len(values) != 2*num_lines:
+            return None
+        return values.reshape(num_lines, 2), None
+    elif fmt == "edge_list":
+        # regular columns: use the C parser of loadtxt
+        dtype = [("source", int), ("target", int)]
+        dtype.extend((str(i), float) for i in range(num_attr))
+        try:
+            values = np.loadtxt(io.BytesIO(data), dtype=dtype, comments=None,
+                                ndmin=1)
+        except ValueError:
+            return None
+        edges = np.array((values["source"], values["target"])).T
+        attr  = None
+        if num_attr:
+            attr = np.array([values[str(i)] for i in range(num_attr)]).T
+        return edges, attr
+
+    values = _fromstring(data, float)
+    if values is None:
+        return None
+
+    # neighbour format: one source followed by (1 + num_attr) per target
+    arr     = np.frombuffer(data, dtype=np.uint8)
+    spaces  = np.in1d(arr, _WHITESPACE)
+    starts  = ~spaces
+    starts[1:] &= spaces[:-1]
+    if np.sum(starts) != len(values):
+        return None
+
+    token_line = np.cumsum(arr == ord("\n"))[starts]
+    counts     = np.bincount(token_line - token_line[0])
+    counts     = counts[counts > 0]
+    stride     = 1 + num_attr
+    if np.any((counts - 1) % stride):
+        # attributes are missing for some targets
+        return None
+
+    first   = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    mask    = np.ones(len(values), dtype=bool)
+    mask[first] = False
+    targets = values[mask].reshape(-1, stride)
+    sources = np.repeat(values[first], (counts - 1) // stride)
+    edges   = np.array((sources, targets[:, 0]), dtype=int).T
+    return edges, (targets[:, 1:] if num_attr else None)
+
+
+def _fromstring(data, dtype):
+    '''
+    Parse whitespace-separated numbers, return None if `data` contains
+    something else.
+    '''
+    try:
+        with warnings.catch_warnings():
+            # unparsable data is reported through a DeprecationWarning
+            warnings.simplefilter("error", DeprecationWarning)
+            return np.fromstring(data, dtype=dtype, sep=" ")
+    except (DeprecationWarning, ValueError):
+        return None
+
+
 def _get_node_attr(di_notif, separator):
     '''
     Return node attributes.
@@ -637,6 +1318,1388 @@ def _str_bytes_len(s):
     return len(s.encode('utf-8'))
 
 
+# ------------- #
+# GraphML & GML #
+# ------------- #
+
+_GRAPHML_NS = "http://graphml.graphdrawing.org/xmlns"
+
+# value types of the GraphML keys
+_graphml_types = {"int": "long", "double": "double"}
+
+_graphml_convert = {
+    "boolean": ("int", lambda s: int(s.strip().lower() in ("true", "1"))),
+    "int": ("int", int),
+    "long": ("int", int),
+    "float": ("double", float),
+    "double": ("double", float),
+    "string": ("string", str),
+}
+
+# characters replaced by entities in the strings of each format
+_xml_escapes = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"))
+_gml_escapes = (("&", "&amp;"), ('"', "&quot;"))
+
+# valid GML keys and tokens (strings, list delimiters, and other values)
+_GML_KEY     = re.compile(r"^[A-Za-z][0-9A-Za-z_]*$")
+_GML_TOKEN   = re.compile(rb'"[^"]*"|\[|\]|[^\s\[\]"]+')
+_GML_COMMENT = re.compile(rb"(?m)^[ \t]*#[^\n]*")
+
+
+def _exchange_data(graph, attributes):
+    '''
+    Data written to the GraphML and GML formats: a dict of strings for the
+    graph (name, population, shape), and dicts associating the value type
+    and the values of each node and edge attribute. Positions are stored as
+    the "x", "y" (and "z") node attributes.
+    '''
+    gdata = OrderedDict([("name", graph.name)])
+    ndata, edata = OrderedDict(), OrderedDict()
+    for name in graph.nodes_attributes:
+        values = np.asarray(graph.get_node_attributes(name=name))
+        if values.dtype.kind not in "biuf":
+            values = values.astype(str)
+        ndata[name] = (graph.get_attribute_type(name, "node"), values)
+    if graph.is_spatial():
+        gdata["spatial"] = "true"
+        if _shapely_support:
+            min_x, min_y, max_x, max_y = graph.shape.bounds
+            gdata["shape"] = graph.shape.wkt
+            gdata["unit"]  = graph.shape.unit
+            gdata["min_x"] = min_x
+            gdata["max_x"] = max_x
+        else:
+            _log_message(logger, "WARNING",
+                         'The `shape` attribute of the graph could not be '
+                         'saved to file because Shapely is not installed.')
+        pos = graph.get_positions()
+        for i, coord in enumerate("xyz"[:pos.shape[1]]):
+            ndata[coord] = ("double", pos[:, i])
+    if graph.is_network():
+        gdata["population"] = _population_string(graph.population)
+    for name in attributes:
+        edata[name] = (graph.get_attribute_type(name, "edge"),
+                       _attribute_column(graph, name))
+    return gdata, ndata, edata
+
+
+def _escape_column(values, escapes, ascii=False):
+    '''
+    Replace the special characters of a column of strings, and the non-ASCII
+    characters by character references (``&#NNN;``) if `ascii` is True.
+    '''
+    if values.dtype.kind == "U":
+        for char, entity in escapes:
+            values = np.char.replace(values, char, entity)
+        if ascii and len(values) and values.dtype.itemsize:
+            codes = values.view(np.uint32).reshape(len(values), -1)
+            rows  = np.flatnonzero(np.any(codes > 127, axis=1))
+            if len(rows):
+                escaped = [v.encode("ascii", "xmlcharrefreplace").decode()
+                           for v in values[rows]]
+                width   = max(max(len(v) for v in escaped),
+                              values.dtype.itemsize // 4)
+                values  = values.astype("U{}".format(width))
+                values[rows] = escaped
+    return values
+
+
+def _graphml(graph, separator, secondary, attributes):
+    '''
+    Generate the blocks of bytes containing the GraphML representation of
+    the graph; the node and edge elements are formatted by blocks of rows.
+    '''
+    gdata, ndata, edata = _exchange_data(graph, attributes)
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<graphml xmlns="{0}" xmlns:xsi="http://www.w3.org/2001/XMLSchema-'
+        'instance" xsi:schemaLocation="{0} {0}/1.0/graphml.xsd">'.format(
+            _GRAPHML_NS),
+    ]
+    for prefix, domain, data in (("g", "graph", gdata), ("n", "node", ndata),
+                                 ("e", "edge", edata)):
+        for i, (name, value) in enumerate(data.items()):
+            vtype = "string" if domain == "graph" \
+                    else _graphml_types.get(value[0], "string")
+            lines.append(
+                '  <key id="{}{}" for="{}" attr.name={} attr.type="{}"/>'
+                ''.format(prefix, i, domain, quoteattr(name), vtype))
+    lines.append('  <graph id="G" edgedefault="{}">'.format(
+        "directed" if graph.is_directed() else "undirected"))
+    for i, value in enumerate(gdata.values()):
+        lines.append('    <data key="g{}">{}</data>'.format(
+            i, escape(str(value))))
+    yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def data_columns(prefix, data, block, every):
+        cols = []
+        for i, (_, values) in enumerate(data.values()):
+            cols.append(_const_column(
+                '<data key="{}{}">'.format(prefix, i), every))
+            cols.append(_byte_column(
+                _escape_column(values[block], _xml_escapes)))
+            cols.append(_const_column("</data>", every))
+        return cols
+
+    for start in range(0, graph.node_nb(), _BLOCK_SIZE):
+        ids   = np.arange(start, min(start + _BLOCK_SIZE, graph.node_nb()))
+        every = np.ones(len(ids), dtype=bool)
+        cols  = [
+            _const_column('    <node id="n', every), _byte_column(ids),
+            _const_column('">', every)
+        ]
+        cols.extend(data_columns("n", ndata, slice(start, start + len(ids)),
+                                 every))
+        cols.append(_const_column("</node>\n", every))
+        yield _format_rows(cols)
+
+    edges = np.asarray(graph.edges_array, dtype=int).reshape(-1, 2)
+
+    for start in range(0, len(edges), _BLOCK_SIZE):
+        block = slice(start, start + _BLOCK_SIZE)
+        every = np.ones(len(edges[block]), dtype=bool)
+        cols  = [
+            _const_column('    <edge source="n', every),
+            _byte_column(edges[block, 0]),
+            _const_column('" target="n', every),
+            _byte_column(edges[block, 1]),
+            _const_column('">', every),
+        ]
+        cols.extend(data_columns("e", edata, block, every))
+        cols.append(_const_column("</edge>\n", every))
+        yield _format_rows(cols)
+
+    yield b"  </graph>\n</graphml>\n"
+
+
+def _gml(graph, separator, secondary, attributes):
+    '''
+    Generate the blocks of bytes containing the GML representation of the
+    graph; the node and edge lists are formatted by blocks of rows.
+    '''
+    gdata, ndata, edata = _exchange_data(graph, attributes)
+    for name in list(gdata) + list(ndata) + list(edata):
+        if not _GML_KEY.match(name):
+            raise InvalidArgument("'{}' is not a valid GML key.".format(name))
+    if "id" in ndata or "source" in edata or "target" in edata:
+        raise InvalidArgument('"id", "source", and "target" attributes '
+                              'cannot be saved to GML.')
+    lines = ["graph [", "  directed {}".format(int(graph.is_directed()))]
+    for name, value in gdata.items():
+        value = _escape_column(np.array([value], dtype="U"), _gml_escapes,
+                               ascii=True)[0]
+        lines.append('  {} "{}"'.format(name, value))
+    yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    def data_columns(data, block, every):
+        cols = []
+        for name, (_, values) in data.items():
+            values = values[block]
+            quote  = every & (values.dtype.kind == "U")
+            cols.append(_const_column("    {} ".format(name), every))
+            cols.append(_const_column('"', quote))
+            cols.append(_byte_column(
+                _escape_column(values, _gml_escapes, ascii=True)))
+            cols.append(_const_column('"', quote))
+            cols.append(_const_column("\n", every))
+        return cols
+
+    for start in range(0, graph.node_nb(), _BLOCK_SIZE):
+        ids   = np.arange(start, min(start + _BLOCK_SIZE, graph.node_nb()))
+        every = np.ones(len(ids), dtype=bool)
+        cols  = [
+            _const_column("  node [\n    id ", every), _byte_column(ids),
+            _const_column("\n", every)
+        ]
+        cols.extend(data_columns(ndata, slice(start, start + len(ids)),
+                                 every))
+        cols.append(_const_column("  ]\n", every))
+        yield _format_rows(cols)
+
+    edges = np.asarray(graph.edges_array, dtype=int).reshape(-1, 2)
+
+    for start in range(0, len(edges), _BLOCK_SIZE):
+        block = slice(start, start + _BLOCK_SIZE)
+        every = np.ones(len(edges[block]), dtype=bool)
+        cols  = [
+            _const_column("  edge [\n    source ", every),
+            _byte_column(edges[block, 0]),
+            _const_column("\n    target ", every),
+            _byte_column(edges[block, 1]),
+            _const_column("\n", every),
+        ]
+        cols.extend(data_columns(edata, block, every))
+        cols.append(_const_column("  ]\n", every))
+        yield _format_rows(cols)
+
+    yield b"]\n"
+
+
+class _ColumnBuffer(object):
+
+    '''
+    Typed buffers storing the attributes of the nodes or edges read from a
+    file, with one row per node or edge. Missing values are replaced by the
+    default value of the attribute, and integer columns become double or
+    string columns if other values are found.
+    '''
+
+    _defaults = {"int": 0, "double": np.NaN, "string": ""}
+
+    def __init__(self):
+        self.size    = 0
+        self.columns = OrderedDict()
+
+    def add(self, name, value_type, default=None):
+        ''' Declare a column, filled with `default` for the previous rows. '''
+        if name not in self.columns:
+            default = self._defaults[value_type] if default is None \
+                      else default
+            if value_type == "int":
+                data = array("q", [default])*self.size
+            elif value_type == "double":
+                data = array("d", [default])*self.size
+            else:
+                data = [default]*self.size
+            self.columns[name] = [value_type, data, default]
+
+    def append(self, row):
+        ''' Add a row from a dict containing the values of the columns. '''
+        for name, value in row.items():
+            if name not in self.columns:
+                self.add(name, _value_type(value))
+        for name, column in self.columns.items():
+            value = row.get(name, column[2])
+            if column[0] == "string":
+                column[1].append(str(value))
+                continue
+            try:
+                column[1].append(value)
+            except (TypeError, OverflowError):
+                self._promote(column, _value_type(value))
+                column[1].append(
+                    str(value) if column[0] == "string" else value)
+        self.size += 1
+
+    def _promote(self, column, value_type):
+        if column[0] == "int" and value_type in ("int", "double"):
+            column[0], column[1] = "double", array("d", column[1])
+        else:
+            column[0], column[1] = "string", [str(v) for v in column[1]]
+            column[2] = str(column[2])
+
+    def pop(self, name):
+        ''' Remove a column and return its values. '''
+        return self.values(name, self.columns.pop(name))
+
+    def values(self, name, column=None):
+        value_type, data, _ = self.columns[name] if column is None \
+                              else column
+        if value_type == "string":
+            return np.array(data, dtype=object)
+        return np.array(data, dtype=int if value_type == "int" else float)
+
+
+def _value_type(value):
+    ''' Attribute type associated to a value read from a file. '''
+    if isinstance(value, (bool, int, np.integer)):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "double"
+    return "string"
+
+
+def _exchange_result(notif, directed, nodes, node_index, edges, sources,
+                     targets, attributes):
+    '''
+    Return the content of a GraphML or GML file in the format of
+    :func:`load_from_file` from the buffers filled by the parsers.
+    '''
+    num_nodes = len(node_index)
+    order     = np.argsort(np.array(node_index, dtype=np.int64),
+                           kind="mergesort")
+    positions = None
+    if str(notif.get("spatial", "")).lower() in ("true", "1"):
+        coords = [c for c in "xyz" if c in nodes.columns]
+        if coords:
+            positions = np.array([nodes.pop(c) for c in coords]).T[order]
+    nattr = list(nodes.columns)
+    eattr = [name for name in edges.columns
+             if attributes is None or name in attributes]
+    di_notif = {
+        "size": num_nodes,
+        "name": str(notif.pop("name", "Graph")),
+        "directed": directed,
+        "edge_attributes": eattr,
+        "edge_attr_types": [edges.columns[k][0] for k in eattr],
+        "node_attributes": nattr,
+        "node_attr_types": [nodes.columns[k][0] for k in nattr],
+    }
+    for key, value in notif.items():
+        di_notif.setdefault(key, str(value))
+    di_nattributes = {k: nodes.values(k)[order] for k in nattr}
+    di_eattributes = {k: edges.values(k) for k in eattr}
+    edge_array = np.array(
+        (np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64))
+    ).T.reshape(-1, 2)
+    return di_notif, edge_array, di_nattributes, di_eattributes, positions
+
+
+def _parse_graphml(filegraph, attributes):
+    '''
+    Read a GraphML file with an incremental parser: the values of the nodes
+    and edges are stored in typed buffers as they are read and the processed
+    elements are discarded, so the memory does not depend on the size of the
+    document.
+    '''
+    keys, notif, directed = {}, {}, True
+    nodes, edges = _ColumnBuffer(), _ColumnBuffer()
+    node_ids, node_index = {}, array("q")
+    sources, targets     = array("q"), array("q")
+    graph_elem, in_item  = None, False
+
+    def row(elem):
+        values = {}
+        for child in elem:
+            if child.tag.rpartition("}")[2] == "data" and child.text:
+                name, _, convert = keys[child.get("key")]
+                values[name] = convert(child.text)
+        return values
+
+    for event, elem in iterparse(filegraph, events=("start", "end")):
+        tag = elem.tag.rpartition("}")[2]
+        if event == "start":
+            if tag == "graph":
+                if graph_elem is not None:
+                    raise InvalidArgument("Nested graphs are not supported.")
+                graph_elem = elem
+                directed   = elem.get("edgedefault") != "undirected"
+            in_item = in_item or tag in ("node", "edge")
+        elif tag == "key":
+            value_type, convert = _graphml_convert[
+                elem.get("attr.type", "string")]
+            name, domain = elem.get("attr.name", elem.get("id")), \
+                elem.get("for", "all")
+            keys[elem.get("id")] = (name, domain, convert)
+            default = None
+            for child in elem:
+                if child.tag.rpartition("}")[2] == "default" and child.text:
+                    default = convert(child.text)
+            if domain in ("node", "all"):
+                nodes.add(name, value_type, default)
+            if domain in ("edge", "all"):
+                edges.add(name, value_type, default)
+        elif tag == "data" and not in_item and graph_elem is not None:
+            notif[keys[elem.get("key")][0]] = elem.text or ""
+        elif tag == "node":
+            node_index.append(
+                node_ids.setdefault(elem.get("id"), len(node_ids)))
+            nodes.append(row(elem))
+        elif tag == "edge":
+            sources.append(
+                node_ids.setdefault(elem.get("source"), len(node_ids)))
+            targets.append(
+                node_ids.setdefault(elem.get("target"), len(node_ids)))
+            edges.append(row(elem))
+        if event == "end" and tag in ("node", "edge"):
+            in_item = False
+            # discard the element
+            elem.clear()
+            graph_elem.clear()
+    if graph_elem is None:
+        raise InvalidArgument("No graph found in the GraphML file.")
+    if len(node_ids) != len(node_index):
+        raise InvalidArgument("Some edges refer to undeclared nodes.")
+    return _exchange_result(notif, directed, nodes, node_index, edges,
+                            sources, targets, attributes)
+
+
+def _gml_tokens(filegraph):
+    '''
+    Generate the lists of tokens of a GML file, read by chunks which end
+    with a complete line (and outside of a string).
+    '''
+    carry = b""
+    while True:
+        chunk = filegraph.read(_CHUNK_SIZE)
+        data  = carry + chunk
+        cut   = data.rfind(b"\n") + 1 if chunk else len(data)
+        if data.count(b'"', 0, cut) % 2:
+            # a string continues after the cut
+            cut = data.rfind(b"\n", 0, data.rfind(b'"', 0, cut)) + 1
+        piece, carry = data[:cut], data[cut:]
+        if b"#" in piece:
+            piece = _GML_COMMENT.sub(b"", piece)
+        yield _GML_TOKEN.findall(piece)
+        if not chunk:
+            if carry.strip():
+                raise InvalidArgument("Unterminated string in GML file.")
+            return
+
+
+def _gml_value(token):
+    ''' Value of a GML token (string, integer, or real). '''
+    if token.startswith(b'"'):
+        return _unescape(token[1:-1].decode("utf-8"))
+    if b"." not in token:
+        try:
+            return int(token)
+        except ValueError:
+            pass
+    return float(token)
+
+
+def _parse_gml(filegraph, attributes):
+    '''
+    Read a GML file by chunks of tokens; the values of the nodes and edges
+    are stored in typed buffers as they are read.
+    '''
+    notif, directed = {}, False
+    nodes, edges = _ColumnBuffer(), _ColumnBuffer()
+    node_ids, node_index = {}, array("q")
+    sources, targets     = array("q"), array("q")
+    stack, key, values   = [], None, None
+    found = False
+    for tokens in _gml_tokens(filegraph):
+        for token in tokens:
+            if key is None:
+                if token != b"]":
+                    key = token
+                    continue
+                if not stack:
+                    raise InvalidArgument("Unbalanced brackets in GML file.")
+                closed = stack.pop()
+                if stack == [b"graph"] and not found:
+                    if closed == b"node":
+                        node_index.append(node_ids.setdefault(
+                            values.pop("id"), len(node_ids)))
+                        nodes.append(values)
+                    elif closed == b"edge":
+                        sources.append(node_ids.setdefault(
+                            values.pop("source"), len(node_ids)))
+                        targets.append(node_ids.setdefault(
+                            values.pop("target"), len(node_ids)))
+                        edges.append(values)
+                elif not stack and closed == b"graph":
+                    found = True
+                continue
+            if token == b"[":
+                stack.append(key)
+                if stack[1:] in ([b"node"], [b"edge"]):
+                    values = {}
+            elif found:
+                pass  # only the first graph is read
+            elif stack == [b"graph"]:
+                if key == b"directed":
+                    directed = bool(_gml_value(token))
+                else:
+                    notif[key.decode()] = _gml_value(token)
+            elif stack in ([b"graph", b"node"], [b"graph", b"edge"]):
+                values[key.decode()] = _gml_value(token)
+            key = None
+    if stack:
+        raise InvalidArgument("Unbalanced brackets in GML file.")
+    if len(node_ids) != len(node_index):
+        raise InvalidArgument("Some edges refer to undeclared nodes.")
+    return _exchange_result(notif, directed, nodes, node_index, edges,
+                            sources, targets, attributes)
+
+
+# ----------- #
+# Compression #
+# ----------- #
+
+# extension and magic bytes of the supported compression formats
+_compressions = OrderedDict([
+    ("gzip", (".gz", b"\x1f\x8b")),
+    ("bz2", (".bz2", b"BZh")),
+    ("xz", (".xz", b"\xfd7zXZ\x00")),
+])
+
+
+def _codec(compression):
+    ''' Module implementing `compression`. '''
+    if compression == "gzip":
+        import gzip
+        return gzip
+    elif compression == "bz2":
+        import bz2
+        return bz2
+    elif compression == "xz":
+        import lzma
+        return lzma
+    raise InvalidArgument("Invalid `compression` '{}', valid values are "
+                          "{}.".format(compression, list(_compressions)))
+
+
+def _strip_compression(filename):
+    ''' Remove the compression extension of `filename`, if any. '''
+    for ext, _ in _compressions.values():
+        if filename.endswith(ext):
+            return filename[:-len(ext)]
+    return filename
+
+
+def _get_compression(compression, filename):
+    '''
+    Compression used to write `filename`: deduced from the extension if
+    `compression` is "auto", None for no compression.
+    '''
+    if compression == "auto":
+        for name, (ext, _) in _compressions.items():
+            if filename.endswith(ext):
+                return name
+        return None
+    if compression is not None:
+        _codec(compression)
+    return compression
+
+
+def _detect_compression(filename):
+    ''' Compression of an existing file, from its magic bytes. '''
+    with open(filename, "rb") as f:
+        start = f.read(6)
+    for name, (_, magic) in _compressions.items():
+        if start.startswith(magic):
+            return name
+    return None
+
+
+def _open_file(filename, mode, compression=None, level=None):
+    '''
+    Open a file in binary `mode`, with streaming (de)compression.
+
+    When reading, the compression is detected from the content of the file
+    and `compression` is ignored; `level` is the compression level when
+    writing (default level of the codec if None).
+    '''
+    if "r" in mode:
+        compression = _detect_compression(filename)
+    if compression is None:
+        return open(filename, mode)
+    codec = _codec(compression)
+    if compression == "xz":
+        return codec.open(filename, mode, preset=level)
+    if level is None:
+        return codec.open(filename, mode)
+    return codec.open(filename, mode, compresslevel=level)
+
+
+def _compress(data, compression="bz2", level=None):
+    ''' Compress bytes with one of the supported codecs. '''
+    codec = _codec(compression)
+    if level is None:
+        return codec.compress(data)
+    if compression == "xz":
+        return codec.compress(data, preset=level)
+    return codec.compress(data, level)
+
+
+def _decompress(data):
+    ''' Decompress bytes, the codec is detected from the magic bytes. '''
+    for name, (_, magic) in _compressions.items():
+        if data.startswith(magic):
+            return _codec(name).decompress(data)
+    return data
+
+
+# ---------- #
+# Population #
+# ---------- #
+
+def _population_description(pop):
+    '''
+    Structured description of a :class:`~nngt.NeuralPop`: a JSON-compatible
+    dict describing the groups and synaptic properties, and the list of the
+    arrays containing the ids of each group.
+    '''
+    groups, ids = [], []
+    for name, group in pop.items():
+        groups.append({
+            "name": name,
+            "neuron_type": int(group.neuron_type),
+            "neuron_model": group.neuron_model,
+            "neuron_param": group.neuron_param,
+        })
+        ids.append(np.asarray(group.ids, dtype=np.int64))
+    syn_spec = [
+        [list(k) if isinstance(k, tuple) else k, v]
+        for k, v in pop._syn_spec.items()
+    ]
+    desc = {
+        "groups": groups,
+        "syn_spec": syn_spec,
+        "with_models": pop.has_models,
+    }
+    return desc, ids
+
+
+def _population_from_description(desc, ids):
+    ''' Rebuild a population from :func:`_population_description`. '''
+    groups = [
+        nngt.NeuralGroup(nodes=[int(i) for i in gids],
+                         ntype=gdesc["neuron_type"],
+                         model=gdesc["neuron_model"],
+                         neuron_param=gdesc["neuron_param"])
+        for gdesc, gids in zip(desc["groups"], ids)
+    ]
+    names    = [gdesc["name"] for gdesc in desc["groups"]]
+    syn_spec = {tuple(k) if isinstance(k, list) else k: v
+                for k, v in desc["syn_spec"]}
+    return nngt.NeuralPop.from_groups(
+        groups, names=names, syn_spec=syn_spec if syn_spec else None,
+        with_models=desc["with_models"])
+
+
+def _population_parts(pop):
+    '''
+    Description and group ids of a :class:`~nngt.NeuralPop` or of a
+    :class:`_LazyPopulation` (without building the population if possible).
+    '''
+    if isinstance(pop, _LazyPopulation):
+        desc = pop._description()
+        if desc is not None:
+            return desc, pop._ids
+        pop = pop.load()
+    return _population_description(pop)
+
+
+def _subpopulation(desc, ids, keep, new_ids):
+    '''
+    Population restricted to the nodes where `keep` is True, with the ids
+    given by `new_ids`; groups without nodes are removed, together with the
+    synaptic properties referring to them.
+    '''
+    groups, sub_ids = [], []
+    for gdesc, gids in zip(desc["groups"], ids):
+        gids = np.asarray(gids, dtype=np.int64)
+        gids = new_ids[gids[keep[gids]]]
+        if len(gids):
+            groups.append(gdesc)
+            sub_ids.append(gids)
+    removed  = {gdesc["name"] for gdesc in desc["groups"]} \
+        - {gdesc["name"] for gdesc in groups}
+    syn_spec = [
+        [k, v] for k, v in desc["syn_spec"]
+        if not (isinstance(k, list) and removed.intersection(k))
+    ]
+    sub_desc = dict(desc, groups=groups, syn_spec=syn_spec)
+    return _population_from_description(sub_desc, sub_ids)
+
+
+def _population_string(pop):
+    '''
+    Single-line representation of a population for the text formats: a JSON
+    description (groups, models, parameters, and ids as ranges), or a base64
+    pickle if the parameters cannot be described in JSON.
+    '''
+    desc, ids = _population_description(pop)
+    desc["ids"] = [_id_ranges(gids) for gids in ids]
+    try:
+        return json.dumps(desc)
+    except (TypeError, ValueError):
+        return codecs.encode(pickle.dumps(pop, protocol=2),
+                             "base64").decode().replace('\n', '~')
+
+
+def _id_ranges(ids):
+    '''
+    Compact representation of an array of ids as a list of
+    ``[start, stop]`` ranges of consecutive ids, in the original order.
+    '''
+    if not len(ids):
+        return []
+    breaks = np.where(np.diff(ids) != 1)[0] + 1
+    starts = ids[np.concatenate(([0], breaks))]
+    stops  = ids[np.concatenate((breaks - 1, [len(ids) - 1]))] + 1
+    return np.array((starts, stops)).T.tolist()
+
+
+def _ids_from_ranges(ranges):
+    ''' Array of ids from :func:`_id_ranges`. '''
+    if not ranges:
+        return np.zeros(0, dtype=np.int64)
+    return np.concatenate(
+        [np.arange(start, stop, dtype=np.int64) for start, stop in ranges])
+
+
+class _LazyPopulation(object):
+
+    '''
+    Population read from a file, which is only turned into a
+    :class:`~nngt.NeuralPop` when :attr:`~nngt.Network.population` is
+    accessed. The types of the neurons can be obtained from its description
+    without building the population.
+    '''
+
+    def __init__(self, string=None, desc=None, ids=None):
+        '''
+        Create from a `string` written by :func:`_population_string`, or from
+        a description and the ids of the groups.
+        '''
+        self._string = string
+        self._desc   = desc
+        self._ids    = ids
+        # population and neuron types, once they have been built
+        self._pop    = None
+        self._types  = None
+
+    @property
+    def size(self):
+        return len(self._neuron_types())
+
+    @property
+    def is_valid(self):
+        return True
+
+    def _description(self):
+        ''' Parse the JSON description (None for pickled populations). '''
+        if self._desc is None and self._string.startswith("{"):
+            desc      = json.loads(self._string)
+            self._ids = [_ids_from_ranges(r) for r in desc.pop("ids")]
+            self._desc, self._string = desc, None
+        return self._desc
+
+    def _neuron_types(self):
+        ''' Cached types of the neurons (must not be modified). '''
+        if self._types is None:
+            desc = self._description()
+            if desc is None:
+                self._types = self.load()._get_neuron_types()
+            else:
+                size  = sum(len(gids) for gids in self._ids)
+                types = np.ones(size, dtype=np.int8)
+                for group, gids in zip(desc["groups"], self._ids):
+                    types[gids] = group["neuron_type"]
+                self._types = types
+        return self._types
+
+    def _get_neuron_types(self):
+        return self._neuron_types().copy()
+
+    def load(self):
+        '''
+        Build the :class:`~nngt.NeuralPop`; it is only built once, the same
+        object is returned by the following calls.
+        '''
+        if self._pop is None:
+            desc = self._description()
+            if desc is not None:
+                self._pop = _population_from_description(desc, self._ids)
+            else:
+                # base64 pickle
+                str_dec = codecs.decode(
+                    self._string.replace('~', '\n').encode(), "base64")
+                try:
+                    self._pop = pickle.loads(str_dec)
+                except UnicodeError:
+                    self._pop = pickle.loads(str_dec, encoding="latin1")
+        return self._pop
+
+
+# ------------- #
+# Binary format #
+# ------------- #
+
+# version of the binary "nngt" format
+_BINARY_VERSION = 1
+
+
+def _save_binary(graph, filename, attributes=None, compression=None,
+                 level=None, target_index=False):
+    '''
+    Save `graph` in the binary "nngt" format: a zip archive containing a
+    "meta.json" description and one ".npy" file per array (edges, CSR index,
+    attributes, types, positions, population ids), which can also be read
+    with :func:`numpy.load`. The members are stored uncompressed, so they
+    can be memory-mapped, unless a `compression` is given.
+    If `target_index` is True, the index of the edges sorted by target
+    ("csc_indptr", "csc_indices" and "csc_eids") is also stored.
+    '''
+    from nngt.core.shared_graph import _graph_arrays
+    arrays, meta = _graph_arrays(graph, index_dtype=np.int32)
+    num_nodes    = graph.node_nb()
+    edge_dtype   = np.uint32 if num_nodes < 2**32 else np.uint64
+    arrays["edges"] = arrays["edges"].astype(edge_dtype)
+    if target_index:
+        _target_index(arrays, num_nodes)
+    # selected attributes
+    eattr = list(meta["edge_attributes"])
+    if attributes is not None:
+        for name in eattr:
+            if name not in attributes:
+                del meta["edge_attributes"][name]
+                arrays.pop("eattr:" + name, None)
+                meta["objects"].pop(("edge", name), None)
+        if "weight" not in attributes:
+            arrays.pop("csr_weight", None)
+    # strings are stored as unicode arrays, other objects are pickled
+    objects = {}
+    for (kind, name), values in meta["objects"].items():
+        value_types = meta[kind + "_attributes"]
+        if value_types[name] == "string":
+            arrays[kind[0] + "attr:" + name] = np.array(values, dtype=str)
+        else:
+            objects[(kind, name)] = values
+    info = {
+        "format": "nngt",
+        "version": _BINARY_VERSION,
+        "nodes": meta["nodes"],
+        "edges": meta["edges"],
+        "name": meta["name"],
+        "type": meta["type"],
+        "directed": bool(meta["directed"]),
+        "weighted": bool(meta["weighted"]),
+        "canonical": bool(meta["canonical"]),
+        "index_dtype": np.dtype(meta["index_dtype"]).str,
+        "attr_dtype": np.dtype(meta["attr_dtype"]).str,
+        "edge_attributes": list(meta["edge_attributes"].items()),
+        "node_attributes": list(meta["node_attributes"].items()),
+        "computed": [],
+    }
+    for name, (value_type, _) in meta["computed"].items():
+        if name in _binary_computed():
+            info["computed"].append([name, value_type])
+        else:
+            _log_message(logger, "WARNING",
+                         "Computed attribute '{}' is not saved.".format(name))
+    if graph.is_spatial():
+        if _shapely_support:
+            min_x, min_y, max_x, max_y = graph.shape.bounds
+            info["shape"] = {
+                "wkt": graph.shape.wkt, "unit": graph.shape.unit,
+                "min_x": min_x, "max_x": max_x
+            }
+        else:
+            _log_message(logger, "WARNING",
+                         'The `shape` attribute of the graph could not be '
+                         'saved to file because Shapely is not installed.')
+    if graph.is_network():
+        desc, ids = _population_description(graph.population)
+        try:
+            info["population"] = json.loads(json.dumps(desc))
+            for i, gids in enumerate(ids):
+                arrays["population:" + str(i)] = gids
+        except (TypeError, ValueError):
+            # parameters which cannot be described in JSON
+            info["population_pickle"] = codecs.encode(
+                pickle.dumps(graph.population, protocol=2),
+                "base64").decode()
+    zip_compression = {
+        None: zipfile.ZIP_STORED, "gzip": zipfile.ZIP_DEFLATED,
+        "bz2": zipfile.ZIP_BZIP2, "xz": zipfile.ZIP_LZMA
+    }
+    with zipfile.ZipFile(filename, "w", zip_compression[compression],
+                         allowZip64=True, compresslevel=level) as archive:
+        archive.writestr("meta.json", json.dumps(info))
+        _write_arrays(archive, arrays)
+        if objects:
+            archive.writestr("objects.pkl", pickle.dumps(objects, protocol=2))
+
+
+def _write_arrays(archive, arrays, prefix=""):
+    ''' Write each array as a ".npy" member of a zip `archive`. '''
+    for key, arr in arrays.items():
+        member = prefix + key.replace(":", "/") + ".npy"
+        with archive.open(member, "w", force_zip64=True) as f:
+            np.lib.format.write_array(f, np.ascontiguousarray(arr),
+                                      allow_pickle=False)
+
+
+def _target_index(arrays, num_nodes):
+    '''
+    Add the index of the edges sorted by target ("csc_indptr", "csc_indices"
+    and "csc_eids") to the `arrays` of a binary file.
+    '''
+    edges = arrays["edges"]
+    order = np.lexsort((edges[:, 0], edges[:, 1]))
+    arrays["csc_indptr"]  = np.concatenate(([0], np.cumsum(
+        np.bincount(edges[:, 1], minlength=num_nodes)))).astype(
+            arrays["indptr"].dtype)
+    arrays["csc_indices"] = edges[order, 0]
+    arrays["csc_eids"]    = order.astype(arrays["csr_eids"].dtype)
+
+
+def _binary_computed():
+    ''' Computed attributes that are restored when loading binary files. '''
+    from nngt.lib.graph_helpers import _edge_bweights, _edge_distances
+    return {"bweight": _edge_bweights, "distance": _edge_distances}
+
+
+def _mapped_array(fileobj, filename, info):
+    '''
+    Memory-map the ".npy" member `info` of a zip archive; only possible for
+    uncompressed members, others are read.
+    '''
+    if info.compress_type != zipfile.ZIP_STORED:
+        return None
+    # skip the local header of the member to reach the npy data
+    fileobj.seek(info.header_offset)
+    header = fileobj.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fileobj.seek(info.header_offset + 30 + name_len + extra_len)
+    version = np.lib.format.read_magic(fileobj)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(fileobj)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(fileobj)
+    if dtype.hasobject:
+        return None
+    if int(np.prod(shape)) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="r", offset=fileobj.tell(),
+                     shape=shape, order="F" if fortran else "C")
+
+
+def _load_binary(filename, mmap=False):
+    '''
+    Load the arrays and the description of a file in the binary "nngt"
+    format.
+    The increments appended by :func:`_save_increment` are replayed, in
+    which case the arrays are held in memory.
+
+    Returns
+    -------
+    arrays : dict
+        Arrays of the graph, with the keys of
+        :func:`nngt.core.shared_graph._graph_arrays` (memory-mapped if `mmap`
+        is True).
+    meta : dict
+        Properties of the graph, in the format used by
+        :class:`~nngt.core.SharedGraph`, plus the "population" and "shape"
+        entries (None if absent).
+    '''
+    arrays, objects = {}, {}
+    # archives which were compressed as a whole are read as a stream
+    source = filename
+    if _detect_compression(filename) is not None:
+        source, mmap = _open_file(filename, "rb"), False
+    with zipfile.ZipFile(source, "r") as archive:
+        info = json.loads(archive.read("meta.json").decode())
+        if info.get("format", None) != "nngt":
+            raise InvalidArgument("'{}' is not a binary NNGT "
+                                  "file.".format(filename))
+        if info["version"] > _BINARY_VERSION:
+            raise InvalidArgument(
+                "'{}' was saved by a more recent version of NNGT (binary "
+                "format {}).".format(filename, info["version"]))
+        if "objects.pkl" in archive.namelist():
+            objects = pickle.loads(archive.read("objects.pkl"))
+        with open(filename, "rb") as fileobj:
+            for member in archive.infolist():
+                if (not member.filename.endswith(".npy")
+                        or member.filename.startswith("increments/")):
+                    continue
+                key = member.filename[:-4].replace("/", ":", 1)
+                arr = _mapped_array(fileobj, filename, member) if mmap \
+                      else None
+                if arr is None:
+                    with archive.open(member) as f:
+                        arr = np.lib.format.read_array(f, allow_pickle=False)
+                arrays[key] = arr
+        increments = _read_increments(archive)
+    if source is not filename:
+        source.close()
+    computed = _binary_computed()
+    meta = {
+        "nodes": info["nodes"],
+        "edges": info["edges"],
+        "name": info["name"],
+        "type": info["type"],
+        "directed": info["directed"],
+        "weighted": info["weighted"],
+        "canonical": info["canonical"],
+        "index_dtype": np.dtype(info["index_dtype"]),
+        "attr_dtype": np.dtype(info["attr_dtype"]),
+        "edge_attributes": OrderedDict(info["edge_attributes"]),
+        "node_attributes": OrderedDict(info["node_attributes"]),
+        "computed": OrderedDict(
+            (name, (value_type, computed[name]))
+            for name, value_type in info["computed"]),
+        "objects": objects,
+        "population": None,
+        "shape": None,
+    }
+    if "population" in info:
+        ids = [arrays.pop("population:" + str(i))
+               for i in range(len(info["population"]["groups"]))]
+        meta["population"] = _LazyPopulation(desc=info["population"],
+                                             ids=ids)
+    elif "population_pickle" in info:
+        meta["population"] = pickle.loads(codecs.decode(
+            info["population_pickle"].encode(), "base64"))
+    if "shape" in info:
+        if _shapely_support:
+            shape = info["shape"]
+            meta["shape"] = Shape.from_wtk(
+                shape["wkt"], min_x=shape["min_x"], max_x=shape["max_x"],
+                unit=shape["unit"])
+        else:
+            _log_message(logger, "WARNING",
+                         'A Shape object was present in the file but could '
+                         'not be loaded because Shapely is not installed.')
+    if increments:
+        _replay_increments(arrays, meta, increments)
+    return arrays, meta
+
+
+def _binary_as_loaded(filename, attributes=None, mmap=False):
+    '''
+    Return the content of a binary file in the format of
+    :func:`load_from_file`.
+    '''
+    arrays, meta = _load_binary(filename, mmap=mmap)
+    eattr = [name for name in meta["edge_attributes"]
+             if attributes is None or name in attributes]
+    nattr = list(meta["node_attributes"])
+    di_notif = {
+        "size": meta["nodes"],
+        "name": meta["name"],
+        "directed": meta["directed"],
+        "edge_attributes": eattr,
+        "edge_attr_types": [meta["edge_attributes"][k] for k in eattr],
+        "node_attributes": nattr,
+        "node_attr_types": [meta["node_attributes"][k] for k in nattr],
+    }
+
+    def values(kind, name):
+        if kind[0] + "attr:" + name in arrays:
+            return arrays[kind[0] + "attr:" + name]
+        return np.array(meta["objects"][(kind, name)], dtype=object)
+
+    di_eattributes = {k: values("edge", k) for k in eattr}
+    di_nattributes = {k: values("node", k) for k in nattr}
+    return (di_notif, arrays["edges"], di_nattributes, di_eattributes,
+            meta["population"], meta["shape"], arrays.get("positions", None))
+
+
+# ----------------- #
+# Incremental files #
+# ----------------- #
+
+# number of rows per block when looking for modified values
+_INCREMENT_BLOCK = 1 << 16
+
+
+def _save_increment(graph, filename, state=None, writes=None):
+    '''
+    Save `graph` in the binary "nngt" format, either as a full snapshot if
+    `state` is None, or by appending to `filename` the changes since the
+    checkpoint described by `state`.
+
+    The changes of checkpoint k are stored in the "increments/<k>/" folder of
+    the archive: an "info.json" description, the rows of the new edges and
+    nodes ("<key>.npy", keys as in the binary format), and the blocks of the
+    existing rows whose values were modified ("update/<key>.npy").
+    Appending to a zip archive only rewrites its central directory, which
+    indexes all the increments at the end of the file.
+
+    The new rows are those after the sizes saved in `state`, the modified
+    blocks are found from the `writes` recorded by the "edge" and "node"
+    attributes since the checkpoint (see :func:`BaseProperty._writes`).
+    A full snapshot is saved instead if the file was modified since the
+    checkpoint.
+
+    Returns the state of the new checkpoint.
+    '''
+    sizes = {"edge": graph.edge_nb(), "node": graph.node_nb()}
+    pop   = _population_string(graph.population) if graph.is_network() \
+            else None
+    eattr = graph.edges_attributes
+    columns = OrderedDict([("edges", ("edge", None, None))])
+    columns.update(
+        ("eattr:" + name, ("edge", name, eattr.value_type(name)))
+        for name in eattr._stored_keys())
+    columns.update(
+        ("nattr:" + name,
+         ("node", name, graph.get_attribute_type(name, "node")))
+        for name in graph.nodes_attributes)
+    if graph.is_spatial():
+        columns["positions"] = ("node", None, None)
+    if state is None or _file_stamp(filename) != state["stamp"]:
+        _save_binary(graph, filename)
+        return {"sizes": sizes, "columns": list(columns), "population": pop,
+                "count": 0, "stamp": _file_stamp(filename)}
+    if _detect_compression(filename) is not None:
+        raise InvalidArgument("Cannot append to '{}' because it is "
+                              "compressed.".format(filename))
+    writes = writes or {}
+    for kind, size in sizes.items():
+        if size < state["sizes"][kind] or None in writes.get(kind, {}):
+            raise InvalidArgument(
+                "Some {}s were removed since the last checkpoint of '{}', "
+                "use `compact=True` to rewrite the file.".format(
+                    kind, filename))
+    edge_dtype = np.uint32 if sizes["node"] < 2**32 else np.uint64
+    # values of the new edges
+    new_edges = {}
+    if sizes["edge"] > state["sizes"]["edge"]:
+        new_edges = graph._eattr._stored_slice(
+            slice(state["sizes"]["edge"], None))
+    arrays, objects, updates = OrderedDict(), {}, {}
+    for key, (kind, name, value_type) in columns.items():
+        saved = state["sizes"][kind]
+        data  = {}
+        # modified blocks: all of them for the columns created since the
+        # checkpoint or if the writes were not recorded
+        blocks = []
+        if key not in state["columns"]:
+            blocks = _written_blocks(None, saved)
+        elif key != "edges" and key != "positions":
+            if writes.get(kind, None) is None:
+                blocks = _written_blocks(None, saved)
+            elif name in writes[kind]:
+                blocks = _written_blocks(writes[kind][name], saved)
+        if blocks:
+            updates[key] = blocks
+            data["update:" + key] = _rows(
+                _increment_values(graph, key, name, value_type),
+                _block_rows(blocks, saved, _INCREMENT_BLOCK))
+        # new rows
+        if sizes[kind] > saved:
+            if key == "edges":
+                data[key] = graph._edges_from(saved).astype(edge_dtype)
+            elif key.startswith("eattr:"):
+                data[key] = _column_values(new_edges[name], value_type)
+            else:
+                data[key] = _increment_values(
+                    graph, key, name, value_type)[saved:]
+        for member, rows in data.items():
+            if isinstance(rows, list):
+                objects[member] = rows
+            else:
+                arrays[member] = rows
+    info  = {
+        "nodes": sizes["node"],
+        "edges": sizes["edge"],
+        "name": graph.name,
+        "edge_attributes": [[name, eattr.value_type(name)]
+                            for name in eattr._stored_keys()],
+        "node_attributes": [[name, graph.get_attribute_type(name, "node")]
+                            for name in graph.nodes_attributes],
+        "block": _INCREMENT_BLOCK,
+        "updates": updates,
+    }
+    if pop != state["population"]:
+        info["population"] = pop
+    count  = state["count"] + 1
+    prefix = "increments/{}/".format(count)
+    with zipfile.ZipFile(filename, "a", zipfile.ZIP_STORED,
+                         allowZip64=True) as archive:
+        archive.writestr(prefix + "info.json", json.dumps(info))
+        _write_arrays(archive, arrays, prefix)
+        if objects:
+            archive.writestr(prefix + "objects.pkl",
+                             pickle.dumps(objects, protocol=2))
+    return {"sizes": sizes, "columns": list(columns), "population": pop,
+            "count": count, "stamp": _file_stamp(filename)}
+
+
+def _file_stamp(filename):
+    '''
+    Size and modification time of `filename` (None if it does not exist),
+    used to check that a file was not modified between two checkpoints.
+    '''
+    if not os.path.isfile(filename):
+        return None
+    stat = os.stat(filename)
+    return (stat.st_size, getattr(stat, "st_mtime_ns", stat.st_mtime))
+
+
+def _increment_values(graph, key, name, value_type):
+    ''' All the values of column `key` (except "edges") of `graph`. '''
+    if key == "positions":
+        return np.asarray(graph.get_positions(), dtype=float)
+    elif key.startswith("eattr:"):
+        values = graph.get_edge_attributes(name=name)
+    else:
+        values = graph.get_node_attributes(name=name)
+    return _column_values(values, value_type)
+
+
+def _column_values(values, value_type):
+    '''
+    Values of an attribute as stored by the incremental saves: numbers and
+    strings are arrays, other objects are lists.
+    '''
+    values = np.asarray(values)
+    if value_type == "string":
+        return values.astype(str)
+    elif values.dtype.kind not in "biuf":
+        return list(values)
+    return values
+
+
+def _written_blocks(rows, stop):
+    '''
+    Blocks containing the `rows` below `stop`, where `rows` are recorded by
+    :func:`BaseProperty._written` (None for all rows).
+    '''
+    if rows is None:
+        return list(range((stop + _INCREMENT_BLOCK - 1) // _INCREMENT_BLOCK))
+    blocks = set()
+    for ids in rows:
+        if isinstance(ids, slice):
+            first, last = ids.start, min(ids.stop, stop) - 1
+            if first <= last:
+                blocks.update(range(first // _INCREMENT_BLOCK,
+                                    last // _INCREMENT_BLOCK + 1))
+        else:
+            ids = ids[ids < stop]
+            blocks.update(np.unique(ids // _INCREMENT_BLOCK).tolist())
+    return sorted(blocks)
+
+
+def _block_rows(blocks, stop, block_size=_INCREMENT_BLOCK):
+    ''' Ids of the rows contained in `blocks`. '''
+    return np.concatenate([
+        np.arange(b*block_size, min((b + 1)*block_size, stop))
+        for b in blocks])
+
+
+def _rows(values, ids):
+    ''' Rows `ids` of an array or of a list. '''
+    if isinstance(values, list):
+        return [values[i] for i in ids]
+    return values[ids]
+
+
+def _read_increments(archive):
+    '''
+    Read the increments appended to a binary archive by
+    :func:`_save_increment`, in order, as ``(info, data)`` tuples where
+    `data` contains the rows of the new edges and nodes ("<key>") and the
+    modified blocks ("update:<key>").
+    '''
+    increments = {}
+    for member in archive.infolist():
+        parts = member.filename.split("/", 2)
+        if parts[0] != "increments" or len(parts) < 3:
+            continue
+        info, data = increments.setdefault(int(parts[1]), ({}, {}))
+        if parts[2] == "info.json":
+            info.update(json.loads(archive.read(member).decode()))
+        elif parts[2] == "objects.pkl":
+            data.update(pickle.loads(archive.read(member)))
+        elif parts[2].endswith(".npy"):
+            num_sep = 2 if parts[2].startswith("update/") else 1
+            key = parts[2][:-4].replace("/", ":", num_sep)
+            with archive.open(member) as f:
+                data[key] = np.lib.format.read_array(f, allow_pickle=False)
+    return [increments[k] for k in sorted(increments)]
+
+
+def _replay_increments(arrays, meta, increments):
+    '''
+    Apply the `increments` read by :func:`_read_increments` to the `arrays`
+    and `meta` of a binary file, then rebuild the index and the types.
+    '''
+    objects = meta["objects"]
+    columns = OrderedDict(edges=arrays["edges"])
+    if "positions" in arrays:
+        columns["positions"] = arrays["positions"]
+    for kind in ("edge", "node"):
+        for name in meta[kind + "_attributes"]:
+            key = kind[0] + "attr:" + name
+            columns[key] = arrays[key] if key in arrays \
+                           else objects[(kind, name)]
+    for info, data in increments:
+        sizes = {"edge": meta["edges"], "node": meta["nodes"]}
+        keys  = ["edges"]
+        if "positions" in columns or "positions" in data:
+            keys.append("positions")
+        for kind in ("edge", "node"):
+            meta[kind + "_attributes"] = OrderedDict(info[kind + "_attributes"])
+            keys.extend(kind[0] + "attr:" + name
+                        for name in meta[kind + "_attributes"])
+        for key in keys:
+            size   = sizes["edge" if key.startswith("e") else "node"]
+            column = columns.get(key, None)
+            new    = data.get(key, None)
+            update = data.get("update:" + key, None)
+            if column is None:
+                # attribute created since the previous checkpoint, its
+                # existing rows are all in `update`
+                ref = update if update is not None else new
+                if isinstance(ref, list):
+                    column = [None]*size
+                elif ref is not None:
+                    column = np.zeros((size,) + ref.shape[1:],
+                                      dtype=ref.dtype)
+                else:
+                    column = np.zeros(size)
+            if new is not None:
+                column = column + list(new) if isinstance(column, list) \
+                         else np.concatenate((column, new))
+            if update is not None:
+                rows = _block_rows(info["updates"][key], size, info["block"])
+                if isinstance(column, list):
+                    column = list(column)
+                    for i, value in zip(rows, update):
+                        column[i] = value
+                else:
+                    # copy (arrays can be memory-mapped) and widen strings
+                    column = column.astype(
+                        np.result_type(column.dtype, update.dtype))
+                    column[rows] = update
+            columns[key] = column
+        for key in list(columns):
+            if key not in keys:
+                del columns[key]
+        meta["nodes"], meta["edges"] = info["nodes"], info["edges"]
+        meta["name"] = info["name"]
+        if "population" in info:
+            meta["population"] = _LazyPopulation(info["population"])
+    # store the final columns
+    for key in list(arrays):
+        if key == "positions" or key.startswith(("eattr:", "nattr:")):
+            del arrays[key]
+    objects.clear()
+    for key, column in columns.items():
+        if isinstance(column, list):
+            kind = "edge" if key.startswith("e") else "node"
+            objects[(kind, key[6:])] = column
+        else:
+            arrays[key] = column
+    _rebuild_index(arrays, meta)
+
+
+def _rebuild_index(arrays, meta):
+    '''
+    Compute the CSR index, the target index if present, and the types of a
+    binary file after its edges and attributes were modified.
+    '''
+    from nngt.core.shared_graph import _csr_index
+    num_nodes = meta["nodes"]
+    edges     = arrays["edges"]
+    idx_dtype = arrays["indptr"].dtype
+    if max(num_nodes, meta["edges"]) >= np.iinfo(idx_dtype).max:
+        idx_dtype = np.dtype(np.int64)
+    indptr, indices, order, meta["canonical"] = _csr_index(
+        edges, num_nodes, idx_dtype)
+    arrays["indptr"]   = indptr
+    arrays["indices"]  = indices.astype(idx_dtype)
+    arrays["csr_eids"] = order
+    if "csr_weight" in arrays and "eattr:weight" in arrays:
+        arrays["csr_weight"] = arrays["eattr:weight"][order]
+    if "csc_indptr" in arrays:
+        _target_index(arrays, num_nodes)
+    # types, as given by the graph classes
+    pop = meta["population"]
+    if pop is not None:
+        node_types = pop._get_neuron_types().astype(np.int8)
+        edge_types = np.where(node_types[edges[:, 0]] < 0, -1, 1)
+    else:
+        node_types = np.ones(num_nodes, dtype=np.int8)
+        edge_types = np.ones(len(edges), dtype=np.int8)
+        if "nattr:type" in arrays:
+            node_types = np.sign(arrays["nattr:type"])
+        if "eattr:type" in arrays:
+            edge_types = np.sign(arrays["eattr:type"])
+    arrays["node_types"] = node_types.astype(np.int8)
+    arrays["edge_types"] = edge_types.astype(np.int8)
+
+
 # ---------- #
 # Formatting #
 # ---------- #
@@ -648,6 +2711,13 @@ di_get_edges = {
 
 di_format = {
     "neighbour": _neighbour_list,
-    "edge_list": _edge_list
+    "edge_list": _edge_list,
+    "graphml": _graphml,
+    "gml": _gml,
+}
+
+di_parse = {
+    "graphml": _parse_graphml,
+    "gml": _parse_gml,
 }
 
@@ -112,6 +112,143 @@ class TestAttributes(TestBasis):
             '''Error on graph {}: unequal 'ud2' attribute for tolerance {}.
             '''.format(g.name, self.tolerance))
 
+    def test_partial_update(self):
+        '''
+        Check that setting an attribute for some edges only modifies these
+        edges and that reading it for a list of edges gives the same values.
+        '''
+        g = nngt.generation.erdos_renyi(avg_deg=20, nodes=100)
+        g.set_edge_attribute("ud3", val=1., value_type="double")
+        edges = g.edges_array
+        g.set_edge_attribute("ud3", values=np.full(10, 2.),
+                             edges=edges[20:30])
+        ref_result = np.ones(g.edge_nb())
+        ref_result[20:30] = 2.
+        self.assertTrue(np.allclose(g.get_edge_attributes(name="ud3"),
+                                    ref_result))
+        self.assertTrue(np.allclose(
+            g.get_edge_attributes(edges=edges[15:35], name="ud3"),
+            ref_result[15:35]))
+        attr = g.get_edge_attributes(edges=edges[15:35])
+        self.assertTrue(np.allclose(attr["ud3"], ref_result[15:35]))
+        self.assertTrue(np.allclose(attr["weight"],
+                                    g.get_weights()[15:35]))
+
+    @unittest.skipIf(nngt.get_config("backend") != "networkx",
+                     "Requires networkx.")
+    def test_networkx_dicts(self):
+        '''
+        Check that the edge dicts used by networkx contain the current values
+        of the attributes when networkx functions are called.
+        '''
+        g = nngt.generation.erdos_renyi(avg_deg=5, nodes=50)
+        g.set_weights(2.)
+        edges = g.edges_array
+        g.new_edge_attribute("ud4", "double")
+        g.set_edge_attribute("ud4", values=np.full(5, 3.), edges=edges[:5])
+        g.new_edge(0, 0, attributes={"weight": 4.})
+        # weighted degrees are computed by networkx from the edge dicts
+        self.assertEqual(g.get_degrees("out", use_weights=True)[0],
+                         2*(g.get_degrees("out")[0] - 1) + 4.)
+        for (u, v), w, a in zip(edges.tolist(), g.get_weights(),
+                                g.get_edge_attributes(name="ud4")):
+            self.assertEqual(g[u][v]["weight"], w)
+            self.assertTrue(np.isclose(g[u][v]["ud4"], a, equal_nan=True))
+        self.assertEqual(g[0][0]["weight"], 4.)
+        self.assertTrue(np.isnan(g[0][0]["ud4"]))
+        # analysis functions
+        g.set_weights(3., elist=edges[:3])
+        closeness = nngt.analysis.closeness(g, use_weights=True)
+        self.assertEqual(len(closeness), g.node_nb())
+        for u, v in edges[:3].tolist():
+            self.assertEqual(g[u][v]["weight"], 3.)
+
+    def test_computed_attributes(self):
+        '''
+        Check that computed attributes are evaluated on access and follow the
+        modifications of the graph.
+        '''
+        g = nngt.generation.erdos_renyi(avg_deg=20, nodes=100)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        weights = g.get_weights()
+        self.assertTrue(g.edges_attributes.is_computed("bweight"))
+        self.assertTrue(np.allclose(g.get_edge_attributes(name="bweight"),
+                                    weights.max() - weights))
+        attr = g.get_edge_attributes(edges=slice(0, 10))
+        self.assertTrue(np.allclose(attr["bweight"],
+                                    weights.max() - weights[:10]))
+        self.assertRaises(nngt.lib.InvalidArgument, g.set_edge_attribute,
+                          "bweight", val=1.)
+        # user-defined attribute with cache
+        num_calls = []
+
+        def double_weight(graph, edges):
+            if edges is None:
+                num_calls.append(1)
+            return 2*graph.get_edge_attributes(edges=edges, name="weight")
+
+        g.new_computed_edge_attribute("dw", "double", double_weight,
+                                      cache=True)
+        self.assertIn("dw", g.edges_attributes)
+        self.assertTrue(np.allclose(g.get_edge_attributes(name="dw"),
+                                    2*weights))
+        g.get_edge_attributes(name="dw")
+        self.assertEqual(len(num_calls), 1)
+        # modifying the weights invalidates the cache
+        g.set_weights(1.)
+        self.assertTrue(np.allclose(g.get_edge_attributes(name="dw"), 2.))
+        self.assertEqual(len(num_calls), 2)
+
+    def test_types(self):
+        '''
+        Check the types of the edges when setting inhibitory nodes.
+        '''
+        g = nngt.generation.erdos_renyi(avg_deg=50, nodes=200)
+        edges = g.edges_array
+        # all edges from inhibitory nodes
+        inhib = np.arange(0, 200, 4)
+        types = g.set_types(-1, nodes=inhib)
+        ref_result = np.where(np.in1d(edges[:, 0], inhib), -1., 1.)
+        self.assertTrue(np.array_equal(types, ref_result))
+        self.assertTrue(np.array_equal(
+            g.get_edge_attributes(name="type"), ref_result))
+        # fraction of the edges of each inhibitory node
+        types = g.set_types(-1, nodes=inhib, fraction=0.5)
+        self.assertTrue(np.all(types[~np.in1d(edges[:, 0], inhib)] == 1.))
+        for n in inhib:
+            out_edges = edges[:, 0] == n
+            self.assertEqual(np.sum(types[out_edges] < 0),
+                             int(0.5*np.sum(out_edges)))
+        # fraction of all edges
+        types = g.set_types(-1, fraction=0.2)
+        self.assertEqual(np.sum(types < 0), int(0.2*g.edge_nb()))
+
+    def test_typed_degrees(self):
+        '''
+        Check the inhibitory weight factor and the degrees restricted to a
+        synaptic type.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(200, iratio=0.2)
+        net = nngt.Network(population=pop, inh_weight_factor=3.)
+        nngt.generation.connect_nodes(
+            net, range(200), range(200), "erdos_renyi", avg_deg=20,
+            weights=2.)
+        edges   = net.edges_array
+        inhib   = np.in1d(edges[:, 0], pop["inhibitory"].ids)
+        weights = net.get_edge_attributes(name="weight")
+        self.assertTrue(np.allclose(weights[inhib], 6.))
+        self.assertTrue(np.allclose(weights[~inhib], 2.))
+        self.assertTrue(np.array_equal(net.get_edge_types(),
+                                       np.where(inhib, -1., 1.)))
+        # typed degrees
+        in_inhib = net.get_degrees("in", syn_type="inhibitory")
+        ref_result = np.bincount(edges[inhib, 1], minlength=200)
+        self.assertTrue(np.array_equal(in_inhib, ref_result))
+        out_exc = net.get_degrees("out", syn_type=1, use_weights=True)
+        ref_result = np.bincount(edges[~inhib, 0], minlength=200) * 2.
+        self.assertTrue(np.allclose(out_exc, ref_result))
+
     @foreach_graph
     def test_weights(self, graph, instructions, **kwargs):
         '''
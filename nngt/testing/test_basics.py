@@ -64,6 +64,45 @@ class TestBasics(unittest.TestCase):
             '''Error on graph {}: last position is ({}, {}) vs (0, 0) expected.
             '''.format(g.name, *g.get_positions(n)))
 
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_dtype_policy(self):
+        '''
+        Check that the dtypes of the graph are used for edges and attributes
+        and reported by `memory_usage`.
+        '''
+        g = nngt.generation.erdos_renyi(
+            nodes=100, avg_deg=10, index_dtype=np.int32,
+            attr_dtype=np.float32)
+        num_edges = g.edge_nb()
+        self.assertEqual(g.edges_array.dtype, np.int32)
+        self.assertEqual(g.get_weights().dtype, np.float32)
+        usage = g.memory_usage()
+        self.assertEqual(usage["edges"], 8*num_edges)
+        self.assertEqual(usage["edge_attributes"]["weight"], 4*num_edges)
+        # computed attributes take no memory
+        self.assertEqual(usage["edge_attributes"]["bweight"], 0)
+        deep = g.memory_usage(deep=True)
+        self.assertTrue(deep["total"] >= deep["edge_attributes"]["weight"] > 0)
+        self.assertRaises(nngt.lib.InvalidArgument, nngt.Graph,
+                          index_dtype=float)
+        # node ids must fit in the index type
+        self.assertRaises(nngt.lib.InvalidArgument, nngt.Graph, nodes=200,
+                          index_dtype=np.int8)
+        small = nngt.Graph(100, index_dtype=np.int8)
+        small.new_node(100)
+        self.assertRaises(
+            nngt.lib.InvalidArgument, nngt.generation.connect_nodes, small,
+            range(200), range(200), "erdos_renyi", avg_deg=5)
+        # the edges are generated in the index type
+        from nngt.generation.connect_algorithms import (_erdos_renyi,
+                                                        _fixed_degree)
+        edges = _erdos_renyi(range(100), range(100), edges=500,
+                             index_dtype=np.int32)
+        self.assertEqual(edges.dtype, np.int32)
+        edges = _fixed_degree(range(100), range(100), degree=5,
+                              index_dtype=np.int32)
+        self.assertEqual(edges.dtype, np.int32)
+
 
 # ---------- #
 # Test suite #
@@ -11,7 +11,11 @@
 Test the main methods of the :mod:`~nngt.generation` module.
 """
 
+import os
+import shutil
+import tempfile
 import unittest
+
 import numpy as np
 import scipy.signal as sps
 
@@ -165,6 +169,10 @@ def _distance_rule_exp(graph, instruct):
     return res
 
 
+def _edge_number(graph):
+    return graph.edge_nb()
+
+
 # ---------- #
 # Test class #
 # ---------- #
@@ -195,10 +203,18 @@ class TestGeneration(TestBasis):
 
     tolerance = 0.08
     
+    cache_folder = None
+
     @property
     def test_name(self):
         return "test_generation"
 
+    def tearDown(self):
+        if self.cache_folder is not None:
+            nngt.set_config(self.cache_config, silent=True)
+            shutil.rmtree(self.cache_folder, ignore_errors=True)
+            self.cache_folder = None
+
     @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
     def gen_graph(self, graph_name):
         di_instructions = self.parser.get_graph_options(graph_name)
@@ -236,6 +252,166 @@ class TestGeneration(TestBasis):
                 "Test for graph {} failed:\nref = {} vs exp {}\
                 ".format(graph.name, ref_result, computed_result))
 
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_connect_pathways(self):
+        '''
+        Check that all pathways are generated and added at once with the
+        correct attributes.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(500, iratio=0.2)
+        net = nngt.Network(population=pop)
+        exc = pop["excitatory"].ids
+        inh = pop["inhibitory"].ids
+        pathways = [
+            ("excitatory", "excitatory", "fixed_degree",
+             {"degree": 10, "degree_type": "in"}),
+            ("excitatory", "inhibitory", "fixed_degree",
+             {"degree": 5, "degree_type": "in"}, 2.),
+            ("inhibitory", ("excitatory", "inhibitory"), "fixed_degree",
+             {"degree": 3, "degree_type": "out"}, None, 3.),
+        ]
+        nngt.generation.connect_pathways(net, pathways)
+        num_edges = 10*len(exc) + 5*len(inh) + 3*len(inh)
+        self.assertEqual(net.edge_nb(), num_edges)
+        # check sources and targets
+        edges = net.edges_array
+        self.assertTrue(np.all(np.in1d(edges[:10*len(exc)], exc)))
+        ei = edges[10*len(exc):10*len(exc) + 5*len(inh)]
+        self.assertTrue(np.all(np.in1d(ei[:, 0], exc)))
+        self.assertTrue(np.all(np.in1d(ei[:, 1], inh)))
+        # check attributes
+        weights = net.get_edge_attributes(name="weight")
+        self.assertTrue(
+            np.allclose(weights[10*len(exc):10*len(exc) + 5*len(inh)], 2.))
+        delays = net.get_edge_attributes(name="delay")
+        self.assertTrue(np.allclose(delays[-3*len(inh):], 3.))
+        # distance-based weights require positions
+        net = nngt.Network(population=nngt.NeuralPop.exc_and_inhib(100))
+        weights = {"distribution": "lin_corr", "correl_attribute": "distance",
+                   "lower": 1., "upper": 2.}
+        self.assertRaises(
+            nngt.lib.InvalidArgument, nngt.generation.connect_pathways, net,
+            [("excitatory", "inhibitory", "erdos_renyi", {"avg_deg": 5},
+              weights)])
+        self.assertEqual(net.edge_nb(), 0)
+
+    def test_degree_disjoint_groups(self):
+        '''
+        Check that fixed and gaussian degrees are set for the right nodes
+        when the sources and the targets are different.
+        '''
+        sources, targets = np.arange(30), np.arange(30, 100)
+        models = (("fixed_degree", {"degree": 5}),
+                  ("gaussian_degree", {"avg": 5, "std": 0.}))
+        for model, params in models:
+            for degree_type, fixed in (("out", sources), ("in", targets)):
+                g = nngt.Graph(100)
+                nngt.generation.connect_nodes(
+                    g, sources, targets, model, degree_type=degree_type,
+                    **params)
+                edges = g.edges_array
+                self.assertEqual(g.edge_nb(), 5*len(fixed))
+                self.assertTrue(np.all(np.in1d(edges[:, 0], sources)))
+                self.assertTrue(np.all(np.in1d(edges[:, 1], targets)))
+                degrees = g.get_degrees(degree_type)
+                self.assertTrue(np.all(degrees[fixed] == 5))
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_generate_to_file(self):
+        '''
+        Check chunked generation into a file and loading from it.
+        '''
+        num_nodes, degree = 1000, 20
+        fd, filename = tempfile.mkstemp(suffix=".npy")
+        os.close(fd)
+        num_edges = nngt.generation.generate_to_file(
+            filename, "fixed_degree", num_nodes, chunk_size=128,
+            degree=degree, degree_type="in")
+        self.assertEqual(num_edges, num_nodes*degree)
+        edges = np.load(filename, mmap_mode="r")
+        self.assertEqual(edges.dtype, np.int32)
+        self.assertEqual(edges.shape, (num_nodes*degree, 2))
+        # no self-loops and constant in-degree
+        self.assertFalse(np.any(edges[:, 0] == edges[:, 1]))
+        self.assertTrue(np.all(
+            np.bincount(edges[:, 1], minlength=num_nodes) == degree))
+        del edges
+        g = nngt.Graph.from_edge_file(filename, chunk_size=5000)
+        self.assertEqual(g.node_nb(), num_nodes)
+        self.assertEqual(g.edge_nb(), num_nodes*degree)
+        os.remove(filename)
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_generate_ensemble(self):
+        '''
+        Check that ensemble generation is reproducible and independent of the
+        number of processes.
+        '''
+        instructions = [
+            {"graph_type": "erdos_renyi", "nodes": 200, "edges": e}
+            for e in (500, 1000, 2000)
+        ]
+        nngt.seed(0)
+        ens1 = nngt.generation.generate_ensemble(
+            instructions, n_jobs=1, return_arrays=True)
+        ens2 = nngt.generation.generate_ensemble(
+            instructions, n_jobs=2, return_arrays=True)
+        for data1, data2 in zip(ens1, ens2):
+            self.assertTrue(np.array_equal(data1["edges"], data2["edges"]))
+        # reduction inside the workers
+        num_edges = nngt.generation.generate_ensemble(
+            instructions, n_jobs=2, reduce=_edge_number)
+        self.assertEqual(num_edges, [500, 1000, 2000])
+        # rebuilt graphs
+        graphs = nngt.generation.generate_ensemble(instructions)
+        self.assertEqual([g.edge_nb() for g in graphs], [500, 1000, 2000])
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_generation_cache(self):
+        '''
+        Check that cached graphs are identical to generated ones and that the
+        random number generator ends in the same state.
+        '''
+        self.cache_config = {
+            "generation_cache": nngt.get_config("generation_cache"),
+            "cache_folder": nngt.get_config("cache_folder"),
+        }
+        self.cache_folder = tempfile.mkdtemp()
+        nngt.set_config({"generation_cache": True,
+                         "cache_folder": self.cache_folder}, silent=True)
+        instructions = {"graph_type": "fixed_degree", "nodes": 300,
+                        "degree": 20, "degree_type": "in",
+                        "weights": {"distribution": "uniform", "lower": 1.,
+                                    "upper": 3.}}
+        nngt.seed(42)
+        g1 = nngt.generate(instructions)
+        draw1 = np.random.uniform()
+        nngt.seed(42)
+        g2 = nngt.generate(instructions)  # loaded from cache
+        draw2 = np.random.uniform()
+        self.assertTrue(np.array_equal(g1.edges_array, g2.edges_array))
+        self.assertTrue(np.allclose(g1.get_weights(), g2.get_weights()))
+        self.assertEqual(draw1, draw2)
+        # networks, and entries which are readable without pickle
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        instructions = {"graph_type": "erdos_renyi", "nodes": 100,
+                        "avg_deg": 10, "population": pop}
+        nngt.seed(42)
+        n1 = nngt.generate(instructions)
+        nngt.seed(42)
+        n2 = nngt.generate(instructions)
+        self.assertTrue(np.array_equal(n1.edges_array, n2.edges_array))
+        self.assertEqual(list(n2.population), list(pop))
+        self.assertTrue(np.array_equal(n1.get_edge_types(),
+                                       n2.get_edge_types()))
+        self.assertEqual(len(os.listdir(self.cache_folder)), 2)
+        for fname in os.listdir(self.cache_folder):
+            with np.load(os.path.join(self.cache_folder, fname),
+                         allow_pickle=False) as entry:
+                self.assertIn("header", entry.files)
+        nngt.lib.clear_cache()
+        self.assertEqual(os.listdir(self.cache_folder), [])
+
 
 # ---------- #
 # Test suite #
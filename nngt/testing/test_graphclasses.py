@@ -11,6 +11,9 @@
 Test the main methods of the :class:`~nngt.Graph` class and its subclasses.
 """
 
+import gc
+import pickle
+import sys
 import unittest
 
 import numpy as np
@@ -64,6 +67,45 @@ class TestGraphClasses(TestBasis):
             "AdjMat test failed for graph {}:\nref = {} vs exp {}\
             ".format(graph.name, ref_result, computed_result))
 
+    def test_from_csr(self):
+        '''
+        Check that graphs created from CSR arrays have the edges in CSR order
+        with the data as weights, and that undirected graphs require a
+        symmetric matrix.
+        '''
+        mat = ssp.random(100, 100, density=0.05, format="csr")
+        g   = nngt.Graph.from_csr(mat.indptr, mat.indices, mat.data)
+        self.assertEqual(g.node_nb(), 100)
+        self.assertTrue(np.array_equal(g.edges_array,
+                                       np.array(mat.nonzero()).T))
+        self.assertTrue(np.allclose(g.get_weights(), mat.data))
+        self.assertEqual((g.adjacency_matrix(types=False) != mat).nnz, 0)
+        # same graph from the matrix
+        h = nngt.Graph.from_matrix(mat.tocoo())
+        self.assertTrue(np.array_equal(h.edges_array, g.edges_array))
+        self.assertTrue(np.allclose(h.get_weights(), g.get_weights()))
+        # weighted degrees follow the new weights
+        g.set_weights(2.)
+        self.assertTrue(np.allclose(
+            g.get_degrees("in", use_weights=True),
+            2*np.bincount(mat.indices, minlength=100)))
+        # symmetry
+        self.assertRaises(nngt.lib.InvalidArgument, nngt.Graph.from_csr,
+                          mat.indptr, mat.indices, mat.data, directed=False)
+        sym = (mat + mat.T).tocsr()
+        u   = nngt.Graph.from_csr(sym.indptr, sym.indices, sym.data,
+                                  directed=False)
+        self.assertFalse(u.is_directed())
+        self.assertEqual(u.edge_nb(), sym.nnz)
+        # unit weights without data and no duplicate targets in a row
+        w = nngt.Graph.from_csr(mat.indptr, mat.indices)
+        self.assertTrue(np.array_equal(w.get_weights(),
+                                       np.ones(len(mat.indices))))
+        self.assertRaises(nngt.lib.InvalidArgument, nngt.Graph.from_csr,
+                          [0, 2, 2], [1, 1], [1., 2.])
+        d = nngt.Graph.from_csr([0, 1, 2], [1, 1], [1., 2.])
+        self.assertTrue(np.array_equal(d.edges_array, [[0, 1], [1, 1]]))
+
     @foreach_graph
     @unittest.skipIf(
         nngt._config["backend"] == "graph-tool"
@@ -86,6 +128,247 @@ class TestGraphClasses(TestBasis):
             "Copy test failed for graph {}:\nref = {} vs exp {}\
             ".format(graph.name, ref_result, computed_result))
 
+    def test_copy_attributes(self):
+        '''
+        Check that copies keep the edge attributes and that a copy sharing
+        its topology is not affected by the modifications of the original.
+        '''
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=10)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        num_edges = g.edge_nb()
+        for share in (False, True):
+            copied = g.copy(share=share)
+            self.assertTrue(np.array_equal(copied.edges_array, g.edges_array))
+            self.assertTrue(np.allclose(copied.get_weights(),
+                                        g.get_weights()))
+            copied.set_weights(2.)
+            self.assertFalse(np.allclose(g.get_weights(), 2.))
+        # modify the original after sharing
+        shared = g.copy(share=True)
+        edges  = g.edges_array
+        # erdos_renyi graphs have no self-loops
+        g.new_edge(0, 0)
+        g.new_node()
+        self.assertEqual(g.edge_nb(), num_edges + 1)
+        self.assertEqual(shared.edge_nb(), num_edges)
+        self.assertEqual(shared.node_nb(), 100)
+        self.assertTrue(np.array_equal(shared.edges_array, edges))
+
+    def test_copy_network(self):
+        '''
+        Check that network copies have the right class and that a shared
+        population is copied before it is handed out.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        copied = net.copy()
+        self.assertIs(type(copied), nngt.Network)
+        self.assertIsNot(copied._population, net._population)
+        shared = net.copy(share=True)
+        self.assertIs(type(shared), nngt.Network)
+        self.assertIs(shared._population, net._population)
+        self.assertTrue(np.array_equal(shared.get_edge_types(),
+                                       net.get_edge_types()))
+        # accessing the population gives each network its own copy
+        self.assertIsNot(shared.population, pop)
+        self.assertIsNot(shared.population, net.population)
+        self.assertEqual(set(shared.population), set(net.population))
+        shared.new_node(2, groups="excitatory")
+        self.assertEqual(shared.population.size, 102)
+        self.assertEqual(net.population.size, 100)
+
+    def test_pickle(self):
+        '''
+        Check that pickled graphs and networks are identical after loading.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=10)
+        for graph in (g, net):
+            loaded = pickle.loads(pickle.dumps(graph, -1))
+            self.assertIs(type(loaded), type(graph))
+            self.assertTrue(np.array_equal(loaded.edges_array,
+                                           graph.edges_array))
+            for name in graph.edges_attributes:
+                self.assertTrue(np.allclose(
+                    loaded.get_edge_attributes(name=name),
+                    graph.get_edge_attributes(name=name)))
+            self.assertTrue(np.array_equal(loaded.degree_list(),
+                                           graph.degree_list()))
+            self.assertEqual(
+                (loaded.adjacency_matrix() != graph.adjacency_matrix()).nnz,
+                0)
+        self.assertEqual(list(loaded.population), list(net.population))
+        self.assertTrue(np.array_equal(loaded.get_edge_types(),
+                                       net.get_edge_types()))
+        # a loaded graph can still be modified
+        loaded = pickle.loads(pickle.dumps(g, -1))
+        loaded.new_node()
+        loaded.new_edge(0, 100)
+        self.assertEqual(loaded.edge_nb(), g.edge_nb() + 1)
+        self.assertEqual(loaded.get_degrees("out")[0],
+                         g.get_degrees("out")[0] + 1)
+        # edges added in bulk before the adjacency matrix is built
+        loaded = pickle.loads(pickle.dumps(g, -1))
+        loaded.new_edges([(0, 0)], attributes={"weight": [3.]})
+        self.assertEqual(loaded.edge_nb(), g.edge_nb() + 1)
+        self.assertEqual(loaded.get_weights()[-1], 3.)
+        adj = loaded.adjacency_matrix()
+        self.assertEqual(adj[0, 0], 3.)
+        self.assertEqual((adj[1:] != g.adjacency_matrix()[1:]).nnz, 0)
+
+    def test_to_backend(self):
+        '''
+        Check that a graph converted to the installed graph libraries keeps
+        its edges, in the same order, and its attributes, without changing
+        the backend.
+        '''
+        backend = nngt.get_config("backend")
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.set_weights(distribution="uniform",
+                        parameters={"lower": 1., "upper": 3.})
+        edges   = net.edges_array
+        weights = net.get_weights()
+
+        self.assertRaises(nngt.lib.InvalidArgument, net.to_backend, "nngt")
+
+        try:
+            import igraph
+            g = net.to_backend("igraph")
+            self.assertIsInstance(g, igraph.Graph)
+            self.assertEqual(g.vcount(), net.node_nb())
+            self.assertTrue(np.array_equal(g.get_edgelist(), edges))
+            self.assertTrue(np.allclose(g.es["weight"], weights))
+        except ImportError:
+            pass
+
+        try:
+            import networkx as nx
+            g = net.to_backend("networkx")
+            self.assertIsInstance(g, nx.DiGraph)
+            self.assertEqual(g.number_of_nodes(), net.node_nb())
+            self.assertEqual(
+                sorted(g.edges), sorted(tuple(e) for e in edges))
+            self.assertTrue(np.allclose(
+                [g[u][v]["weight"] for u, v in edges], weights))
+        except ImportError:
+            pass
+
+        try:
+            import graph_tool
+            g = net.to_backend("graph-tool")
+            self.assertIsInstance(g, graph_tool.Graph)
+            self.assertEqual(g.num_vertices(), net.node_nb())
+            gt_edges = g.get_edges([g.edge_index])
+            gt_edges = gt_edges[np.argsort(gt_edges[:, 2]), :2]
+            self.assertTrue(np.array_equal(gt_edges, edges))
+            self.assertTrue(np.allclose(g.ep["weight"].a, weights))
+        except ImportError:
+            pass
+
+        self.assertEqual(nngt.get_config("backend"), backend)
+
+    @unittest.skipIf(sys.version_info < (3, 8), 'Requires shared_memory')
+    def test_shared_memory(self):
+        '''
+        Check that a graph attached from shared memory gives the same edges,
+        attributes, degrees and adjacency matrix as the original graph.
+        '''
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=10)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        with g.to_shared_memory() as handle:
+            shared = nngt.Graph.from_shared_memory(
+                pickle.loads(pickle.dumps(handle)))
+            self.assertTrue(np.array_equal(shared.edges_array,
+                                           g.edges_array))
+            self.assertTrue(np.allclose(shared.get_weights(),
+                                        g.get_weights()))
+            self.assertFalse(shared.get_weights().flags.writeable)
+            self.assertTrue(np.array_equal(shared.get_degrees("in"),
+                                           g.get_degrees("in")))
+            edges = g.edges_array
+            ref   = ssp.csr_matrix((g.get_weights(), (edges[:, 0],
+                                   edges[:, 1])), shape=(100, 100))
+            self.assertEqual((shared.csr() != ref).nnz, 0)
+            materialized = shared.materialize()
+            self.assertTrue(np.allclose(materialized.get_weights(),
+                                        g.get_weights()))
+            # the arrays remain valid after the graph is closed and deleted
+            kept = shared.edges_array
+            shared.close()
+            del shared
+            gc.collect()
+            self.assertTrue(np.array_equal(kept, g.edges_array))
+
+    def test_view_adjacency(self):
+        '''
+        Check that a network, a view of all its nodes and its shared copy
+        give the same signed adjacency matrix.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.set_weights(distribution="uniform",
+                        parameters={"lower": 1., "upper": 3.})
+        adj = net.adjacency_matrix()
+        self.assertTrue(np.all(adj.data[np.in1d(
+            adj.nonzero()[0], pop["inhibitory"].ids)] < 0))
+        view = net.subgraph_view(nodes=range(100))
+        self.assertTrue(np.allclose(view.adjacency_matrix().toarray(),
+                                    adj.toarray()))
+        self.assertTrue(np.allclose(
+            view.adjacency_matrix(types=False).toarray(),
+            net.adjacency_matrix(types=False).toarray()))
+        if sys.version_info >= (3, 8):
+            with net.to_shared_memory() as handle:
+                shared = nngt.Graph.from_shared_memory(handle)
+                self.assertTrue(np.allclose(
+                    shared.adjacency_matrix().toarray(), adj.toarray()))
+                shared.close()
+
+    def test_subgraph_view(self):
+        '''
+        Check that a view restricted to some nodes and edges gives the same
+        edges, attributes and degrees as the materialized subgraph.
+        '''
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=10)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        edges   = g.edges_array
+        weights = g.get_weights()
+        nodes   = np.arange(0, 100, 2)
+        emask   = weights > 2.
+        view    = g.subgraph_view(nodes=nodes, edge_mask=emask)
+        keep    = emask & np.in1d(edges[:, 0], nodes) \
+            & np.in1d(edges[:, 1], nodes)
+        self.assertEqual(view.node_nb(), 50)
+        self.assertEqual(view.edge_nb(), np.sum(keep))
+        self.assertTrue(np.array_equal(view.edges_array, edges[keep] // 2))
+        self.assertTrue(np.allclose(view.get_weights(), weights[keep]))
+        self.assertTrue(np.allclose(view.get_edge_attributes(name="bweight"),
+                                    weights.max() - weights[keep]))
+        sub = view.materialize()
+        self.assertEqual(sub.edge_nb(), view.edge_nb())
+        self.assertTrue(np.allclose(sub.get_weights(), view.get_weights()))
+        for deg_type in ("in", "out", "total"):
+            self.assertTrue(np.array_equal(
+                view.get_degrees(deg_type), sub.get_degrees(deg_type)))
+        self.assertTrue(np.allclose(
+            view.adjacency_matrix().todense(),
+            sub.adjacency_matrix().todense()))
+        self.assertAlmostEqual(nngt.analysis.spectral_radius(view),
+                               nngt.analysis.spectral_radius(sub))
+
 
 # ---------- #
 # Test suite #
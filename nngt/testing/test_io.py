@@ -11,9 +11,17 @@
 Test the IO functions.
 """
 
+import codecs
 import os
+import pickle
+import sys
 import unittest
 
+try:
+    from unittest import mock
+except ImportError:  # Python 2
+    import mock
+
 import numpy as np
 
 import nngt
@@ -45,10 +53,11 @@ class TestIO(TestBasis):
                 os.remove(current_dir + graphname + '.el')
             except:
                 pass
-        try:
-            os.remove(current_dir + 'test.el')
-        except:
-            pass
+        for filename in ('test.el', 'test.nngt', 'test.graphml', 'test.gml'):
+            try:
+                os.remove(current_dir + filename)
+            except:
+                pass
     
     @property
     def test_name(self):
@@ -144,6 +153,358 @@ class TestIO(TestBasis):
 
         self.assertTrue(allclose)
 
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_neighbour_attributes(self):
+        '''
+        Check that the edge attributes are associated to the right edges
+        when saving to the "neighbour" format.
+        '''
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=5)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        g.new_edge_attribute("num", "int", values=np.arange(g.edge_nb()))
+        g.to_file(current_dir + 'test.el', fmt="neighbour")
+        h = nngt.Graph.from_file(current_dir + 'test.el', fmt="neighbour")
+        # edges are saved sorted by source, then target
+        edges = h.edges_array
+        order = np.lexsort((g.edges_array[:, 1], g.edges_array[:, 0]))
+        self.assertTrue(np.array_equal(edges, g.edges_array[order]))
+        self.assertTrue(np.array_equal(h.get_edge_attributes(name="num"),
+                                       order))
+        self.assertTrue(np.array_equal(h.get_weights(),
+                                       g.get_weights()[order]))
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_population_section(self):
+        '''
+        Check that the population is saved as a structured description and
+        only built when it is accessed.
+        '''
+        from nngt.lib.io_tools import _LazyPopulation
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.to_file(current_dir + 'test.el')
+        h = nngt.Graph.from_file(current_dir + 'test.el')
+        self.assertTrue(h.is_network())
+        # edge types do not require the population
+        self.assertTrue(np.array_equal(h.get_edge_types(),
+                                       net.get_edge_types()))
+        self.assertIsInstance(h._population, _LazyPopulation)
+        self.assertEqual(list(h.population), list(pop))
+        for name, group in pop.items():
+            self.assertTrue(np.array_equal(h.population[name].ids,
+                                           group.ids))
+            self.assertEqual(h.population[name].neuron_type,
+                             group.neuron_type)
+        # populations stored as a pickle are only decoded once
+        lazy = _LazyPopulation(codecs.encode(
+            pickle.dumps(pop, protocol=2), "base64").decode().replace(
+                '\n', '~'))
+        types = lazy._get_neuron_types()
+        self.assertEqual(lazy.size, 100)
+        self.assertTrue(np.array_equal(types, pop._get_neuron_types()))
+        self.assertIs(lazy.load(), lazy.load())
+        types[:] = 0
+        self.assertTrue(np.array_equal(lazy._get_neuron_types(),
+                                       pop._get_neuron_types()))
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_chunked_parser(self):
+        '''
+        Check that text files are parsed identically whatever the size of the
+        chunks, for the numeric and the line-by-line parsers.
+        '''
+        from nngt.lib import io_tools
+        edges   = np.array([(0, 1), (0, 3), (1, 2), (2, 0), (2, 3), (3, 1)])
+        weights = np.linspace(0.5, 3., len(edges))
+        header  = ("@directed=True\n@edge_attributes=['weight', 'label']\n"
+                   "@edge_attr_types=['double', '{}']\n"
+                   "@size=4\n\n")
+        for label_type in ("int", "string"):
+            elist = "\n".join(
+                "{} {} {!r};{}".format(s, t, w, i)
+                for i, ((s, t), w) in enumerate(zip(edges, weights)))
+            nlist = "\n".join(
+                "{} ".format(s) + " ".join(
+                    "{};{!r};{}".format(t, w, i)
+                    for i, ((u, t), w) in enumerate(zip(edges, weights))
+                    if u == s) for s in range(4))
+            for fmt, data in (("edge_list", elist), ("neighbour", nlist)):
+                with open(current_dir + 'test.el', "w") as f:
+                    f.write(header.format(label_type) + data + "\n")
+                for chunk_size in (5, 1 << 22):
+                    with mock.patch.object(io_tools, "_CHUNK_SIZE",
+                                           chunk_size):
+                        g = nngt.Graph.from_file(current_dir + 'test.el',
+                                                 fmt=fmt)
+                    self.assertTrue(np.array_equal(g.edges_array, edges))
+                    self.assertTrue(np.allclose(g.get_weights(), weights))
+                    labels = g.get_edge_attributes(name="label")
+                    if label_type == "int":
+                        self.assertTrue(np.array_equal(labels, range(6)))
+                    else:
+                        self.assertEqual(list(labels),
+                                         [str(i) for i in range(6)])
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    @unittest.skipIf(sys.version_info < (3, 8), 'Requires shared_memory')
+    def test_parallel_loading(self):
+        '''
+        Check that a file loaded with several processes gives the same edges,
+        in the same order, as the serial loader.
+        '''
+        from nngt.lib import io_tools
+        filename = network_dir + 'p2p-Gnutella04.txt'
+        g = nngt.Graph.from_file(filename, fmt="edge_list", separator="\t")
+        # use small chunks to get several ranges
+        with mock.patch.object(io_tools, "_CHUNK_SIZE", 1 << 12):
+            h = nngt.Graph.from_file(filename, fmt="edge_list",
+                                     separator="\t", n_jobs=2)
+        self.assertEqual(h.node_nb(), g.node_nb())
+        self.assertTrue(np.array_equal(h.edges_array, g.edges_array))
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_compression(self):
+        '''
+        Check that compressed text and binary files are loaded identically,
+        the compression being given by the extension or by `compression`.
+        '''
+        g = nngt.generation.erdos_renyi(nodes=100, avg_deg=10)
+        g.set_weights(distribution="uniform",
+                      parameters={"lower": 1., "upper": 3.})
+        files = (
+            ('test.el.gz', {}), ('test.el.bz2', {}),
+            ('test.el', {"compression": "xz", "compression_level": 1}),
+            ('test.nngt', {"compression": "gzip"}),
+        )
+        for filename, kwargs in files:
+            g.to_file(current_dir + filename, **kwargs)
+            h = nngt.Graph.from_file(current_dir + filename)
+            self.assertTrue(np.array_equal(h.edges_array, g.edges_array))
+            self.assertTrue(np.allclose(h.get_weights(), g.get_weights()))
+        for filename in ('test.el.gz', 'test.el.bz2'):
+            os.remove(current_dir + filename)
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_binary_format(self):
+        '''
+        Check that a network saved in the binary format is identical after
+        loading, and that the memory-mapped view gives the same data.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.set_weights(distribution="uniform",
+                        parameters={"lower": 1., "upper": 3.})
+        net.to_file(current_dir + 'test.nngt')
+        h = nngt.Graph.from_file(current_dir + 'test.nngt')
+        self.assertTrue(np.array_equal(h.edges_array, net.edges_array))
+        self.assertTrue(np.allclose(h.get_weights(), net.get_weights()))
+        self.assertTrue(np.array_equal(h.get_edge_types(),
+                                       net.get_edge_types()))
+        self.assertEqual(list(h.population), list(net.population))
+        # memory-mapped view
+        view = nngt.Graph.from_file(current_dir + 'test.nngt', mmap=True)
+        self.assertTrue(np.array_equal(view.edges_array, net.edges_array))
+        self.assertTrue(np.allclose(view.get_weights(), net.get_weights()))
+        self.assertTrue(np.array_equal(view.get_degrees("in"),
+                                       net.get_degrees("in")))
+        materialized = view.materialize()
+        self.assertEqual(list(materialized.population), list(net.population))
+        self.assertTrue(np.allclose(materialized.get_weights(),
+                                    net.get_weights()))
+        view.close()
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_load_subgraph(self):
+        '''
+        Check that the subgraph loaded from a binary file is the same as the
+        subgraph of the original network, with or without target index.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.set_weights(distribution="uniform",
+                        parameters={"lower": 1., "upper": 3.})
+        edges = net.edges_array
+        types = net.get_edge_types()
+        inhib = pop["inhibitory"].ids
+        nodes = np.arange(0, 100, 3)
+        for target_index in (False, True):
+            net.to_file(current_dir + 'test.nngt', target_index=target_index)
+            for kwargs, selected in (
+                    ({"nodes": nodes}, nodes),
+                    ({"groups": "inhibitory"}, inhib),
+                    ({"nodes": nodes, "groups": ["inhibitory"]},
+                     np.intersect1d(nodes, inhib))):
+                h   = nngt.load_subgraph(current_dir + 'test.nngt', **kwargs)
+                ref = net.subgraph_view(nodes=selected).materialize()
+                self.assertEqual(h.node_nb(), len(selected))
+                self.assertTrue(np.array_equal(h.edges_array,
+                                               ref.edges_array))
+                self.assertTrue(np.allclose(h.get_weights(),
+                                            ref.get_weights()))
+                # the view does not keep the population
+                keep = np.in1d(edges[:, 0], selected) \
+                    & np.in1d(edges[:, 1], selected)
+                self.assertTrue(np.array_equal(h.get_edge_types(),
+                                               types[keep]))
+                self.assertEqual(h.population.size, len(selected))
+        # groups without nodes are removed
+        h = nngt.load_subgraph(current_dir + 'test.nngt', groups="inhibitory")
+        self.assertEqual(list(h.population), ["inhibitory"])
+        self.assertRaises(nngt.lib.InvalidArgument, nngt.load_subgraph,
+                          current_dir + 'test.nngt', groups="unknown")
+        # subgraph without edges
+        g = nngt.Graph(3)
+        g.new_edge(0, 1)
+        g.to_file(current_dir + 'test.nngt')
+        h = nngt.load_subgraph(current_dir + 'test.nngt', nodes=[2])
+        self.assertEqual(h.edges_array.shape, (0, 2))
+        self.assertEqual(len(h.get_edge_types()), 0)
+
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_graphml_gml(self):
+        '''
+        Check that networks saved to GraphML and GML are identical after
+        loading, and that files written by other tools (default values,
+        comments, nested lists, string node ids) are read.
+        '''
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.set_weights(distribution="uniform",
+                        parameters={"lower": 1., "upper": 3.})
+        labels = [u'a&<b"\u00e9{}'.format(i) for i in range(100)]
+        net.new_node_attribute("label", "string", values=labels)
+        for ext in ("graphml", "gml"):
+            net.to_file(current_dir + 'test.' + ext)
+            h = nngt.Graph.from_file(current_dir + 'test.' + ext)
+            self.assertTrue(h.is_network())
+            self.assertEqual(h.name, net.name)
+            self.assertTrue(np.array_equal(h.edges_array, net.edges_array))
+            self.assertTrue(np.allclose(h.get_weights(), net.get_weights()))
+            self.assertTrue(np.array_equal(h.get_edge_types(),
+                                           net.get_edge_types()))
+            self.assertEqual(list(h.get_node_attributes(name="label")),
+                             labels)
+        # GML files are ASCII, as required by other tools
+        with open(current_dir + 'test.gml', 'rb') as f:
+            data = f.read()
+        data.decode("ascii")
+        self.assertIn(b"&#233;", data)
+        # GraphML from another tool
+        graphml = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+            '<key id="d0" for="edge" attr.name="weight" attr.type="double">'
+            '<default>2.5</default></key>\n'
+            '<key id="d1" for="node" attr.name="size" attr.type="int"/>\n'
+            '<graph edgedefault="directed">\n'
+            '<node id="b"><data key="d1">3</data></node>\n'
+            '<node id="a"/>\n'
+            '<edge source="a" target="b"><data key="d0">1.5</data></edge>\n'
+            '<edge source="b" target="a"/>\n'
+            '</graph>\n</graphml>\n')
+        with open(current_dir + 'test.graphml', 'w') as f:
+            f.write(graphml)
+        h = nngt.Graph.from_file(current_dir + 'test.graphml')
+        self.assertTrue(np.array_equal(h.edges_array, [[1, 0], [0, 1]]))
+        self.assertTrue(np.allclose(h.get_weights(), [1.5, 2.5]))
+        self.assertTrue(np.array_equal(
+            h.get_node_attributes(name="size"), [3, 0]))
+        # GML from another tool
+        gml = (
+            '# comment\ngraph [\n  directed 1\n'
+            '  node [ id 10 label "n [10]" graphics [ x 1.0 ] ]\n'
+            '  node [ id 20 ]\n'
+            '  edge [ source 20 target 10 weight 2 ]\n'
+            '  edge [ source 10 target 20 weight 0.5 ]\n]\n')
+        with open(current_dir + 'test.gml', 'w') as f:
+            f.write(gml)
+        h = nngt.Graph.from_file(current_dir + 'test.gml')
+        self.assertTrue(np.array_equal(h.edges_array, [[1, 0], [0, 1]]))
+        self.assertTrue(np.allclose(h.get_weights(), [2., 0.5]))
+        self.assertEqual(list(h.get_node_attributes(name="label")),
+                         ["n [10]", ""])
+
+    @unittest.skipIf(nngt.get_config('mpi'), 'Not checking for MPI')
+    def test_save_increment(self):
+        '''
+        Check that a growing network checkpointed with `save_increment` is
+        identical after loading, with modified and new attributes, after a
+        `to_file` on the same path, and after compaction.
+        '''
+        from nngt.lib import io_tools
+        filename = current_dir + 'test.nngt'
+        pop = nngt.NeuralPop.exc_and_inhib(100, iratio=0.2)
+        net = nngt.Network(population=pop)
+        nngt.generation.connect_nodes(net, range(100), range(100),
+                                      "erdos_renyi", avg_deg=10)
+        net.new_edge_attribute("label", "string", val="init")
+        net.new_node_attribute("size", "double", val=1.)
+        net.save_increment(filename)
+        size = os.path.getsize(filename)
+        for step in range(3):
+            num_nodes = net.node_nb()
+            net.new_node(10, groups="inhibitory" if step else "excitatory",
+                         attributes={"size": np.ones(10)})
+            new_edges = [(num_nodes + i, i) for i in range(10)]
+            net.new_edges(new_edges, attributes={
+                "weight": np.full(10, 2.), "label": ["s{}".format(step)]*10})
+            # partial writes to existing edges and nodes
+            net.set_weights(step + 3., elist=net.edges_array[:5])
+            net.set_edge_attribute("label", val="m{}".format(step),
+                                   edges=net.edges_array[[3, 700]])
+            net.set_node_attribute("size", val=step + 2., nodes=[4])
+            if step == 1:
+                net.new_edge_attribute("delay", "double", val=1.5)
+            # small blocks, so that only the written ones are appended
+            with mock.patch.object(io_tools, "_INCREMENT_BLOCK", 64):
+                net.save_increment(filename)
+        # only the changes were appended
+        self.assertLess(os.path.getsize(filename), 2*size)
+        for check in ("increments", "to_file", "compact"):
+            if check == "to_file":
+                # the file is saved again instead of being appended to
+                net.to_file(filename)
+                net.set_node_attribute("size", val=9., nodes=[1])
+                net.save_increment(filename)
+            elif check == "compact":
+                net.save_increment(filename, compact=True)
+            h = nngt.Graph.from_file(filename)
+            self.assertEqual(h.node_nb(), net.node_nb())
+            self.assertTrue(np.array_equal(h.edges_array, net.edges_array))
+            for name in ("weight", "delay", "label"):
+                self.assertEqual(
+                    list(h.get_edge_attributes(name=name)),
+                    list(net.get_edge_attributes(name=name)))
+            self.assertTrue(np.array_equal(
+                h.get_node_attributes(name="size"),
+                net.get_node_attributes(name="size")))
+            self.assertTrue(np.array_equal(h.get_edge_types(),
+                                           net.get_edge_types()))
+            mapped = nngt.core.MappedGraph(filename)
+            self.assertEqual((mapped.csr() != net.adjacency_matrix(
+                types=False)).nnz, 0)
+        # removed edges require a compaction, even if as many edges are
+        # created again
+        g = nngt.Graph(10, weighted=False)
+        g.new_edges([(0, 1), (1, 2)])
+        g.save_increment(filename)
+        g.clear_all_edges()
+        if not g.edge_nb():
+            g.new_edges([(2, 3), (3, 4)])
+        self.assertRaises(nngt.lib.InvalidArgument, g.save_increment,
+                          filename)
+
+
 
 # ---------- #
 # Test suite #